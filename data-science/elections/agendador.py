@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Executor de um grafo de tarefas com dependências declaradas. Cada tarefa é
+#   {"funcao": callable, "dependencias": [nomes de outras tarefas]}
+# e recebe, como argumentos posicionais, os resultados das dependências na
+# ordem declarada. Uma tarefa começa assim que todas as suas dependências
+# terminam; tarefas independentes rodam em paralelo (threads: o trabalho
+# pesado já acontece em pandas/pyarrow ou em pools de processos próprios).
+
+
+def resolver_dependencias(tarefas, alvos):
+    necessarias = set()
+    pendentes = list(alvos)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome in necessarias:
+            continue
+        if nome not in tarefas:
+            raise KeyError(f"Tarefa desconhecida: '{nome}'")
+        necessarias.add(nome)
+        pendentes.extend(tarefas[nome]["dependencias"])
+    return necessarias
+
+
+def executar(tarefas, alvos, max_workers=None):
+    necessarias = resolver_dependencias(tarefas, alvos)
+    resultados = {}
+    falhas = {}
+    em_execucao = {}
+
+    def prontas():
+        return [
+            nome for nome in sorted(necessarias)
+            if nome not in resultados and nome not in falhas and nome not in em_execucao.values()
+            and all(dependencia in resultados for dependencia in tarefas[nome]["dependencias"])
+        ]
+
+    def propagar_falhas():
+        # Tarefas cujas dependências falharam não podem mais rodar
+        mudou = True
+        while mudou:
+            mudou = False
+            for nome in necessarias:
+                if nome in resultados or nome in falhas:
+                    continue
+                dependencias_falhas = [d for d in tarefas[nome]["dependencias"] if d in falhas]
+                if dependencias_falhas:
+                    falhas[nome] = f"dependência com falha: {', '.join(dependencias_falhas)}"
+                    mudou = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for nome in prontas():
+                tarefa = tarefas[nome]
+                argumentos = [resultados[dependencia] for dependencia in tarefa["dependencias"]]
+                em_execucao[executor.submit(tarefa["funcao"], *argumentos)] = nome
+            if not em_execucao:
+                break
+            concluidas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+            for futuro in concluidas:
+                nome = em_execucao.pop(futuro)
+                try:
+                    resultados[nome] = futuro.result()
+                except Exception as e:
+                    print(f"Erro na tarefa '{nome}': {e}")
+                    falhas[nome] = str(e)
+            propagar_falhas()
+
+    for nome, motivo in sorted(falhas.items()):
+        if motivo.startswith("dependência"):
+            print(f"Tarefa '{nome}' não executada ({motivo})")
+    return resultados, falhas
@@ -0,0 +1,272 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from cache_dados import CACHE_DIR, caminho_cache_valido, impressao_arquivo
+from instrumentacao import avisar
+from particoes import dividir_predicados, filtrar_linhas
+from redes_sociais import assinatura_classificacao, classificar_urls
+from schemas import opcoes_read_csv, aplicar_schema
+
+UFS_PARA_REGIOES = {
+    "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
+    "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
+    "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
+    "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
+    "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
+    "PR": "Sul", "RS": "Sul", "SC": "Sul"
+}
+
+CARGOS_IMPORTANTES = ['prefeito', 'vice-prefeito', 'vereador']
+
+# Quantos parciais acumular antes de reduzi-los a um só
+MAX_PARCIAIS = 32
+
+CAMINHO_CUBO = os.path.join("output", "cubo_candidatos.parquet")
+DIMENSOES_CUBO = ['SG_UF', 'REGIAO', 'SG_PARTIDO', 'DS_CARGO', 'DS_SIT_TOT_TURNO']
+
+
+def adicionar_regiao(df):
+    return df.assign(REGIAO=df['SG_UF'].map(UFS_PARA_REGIOES))
+
+
+def classificar_rede_social(df):
+    return df.assign(TIPO_REDE=classificar_urls(df['DS_URL']))
+
+
+# Contagens de base dos insights 3, 4, 5 e 7. Cada uma declara o dataset de
+# origem, as colunas que precisa ler, um preparo opcional (por chunk) e as
+# chaves do group-by. O mesmo contrato serve para o DataFrame completo e para
+# o modo em streaming. "versao" (opcional) entra na chave dos parciais em
+# cache e deve mudar junto com o comportamento do preparo.
+AGREGACOES_CONTAGEM = {
+    # Cubo de candidaturas no menor grão usado pelos insights; a região é
+    # derivada da UF depois da agregação (ver montar_cubo). As chaves nulas
+    # são mantidas para que os roll-ups descartem exatamente as mesmas linhas
+    # que um group-by direto descartaria.
+    "cubo_candidatos": {
+        "dataset": "candidatos",
+        "colunas": ['SG_UF', 'SG_PARTIDO', 'DS_CARGO', 'DS_SIT_TOT_TURNO'],
+        "preparar": None,
+        "chaves": ['SG_UF', 'SG_PARTIDO', 'DS_CARGO', 'DS_SIT_TOT_TURNO'],
+        "nome": 'NUM_CANDIDATOS',
+        "dropna": False,
+    },
+    "redes_por_partido_uf": {
+        "dataset": "candidatos_redes_sociais",
+        "colunas": ['SG_UF', 'DS_URL'],
+        "preparar": classificar_rede_social,
+        "chaves": ['SG_UF', 'TIPO_REDE'],
+        "nome": 'NUM_CANDIDATOS',
+        "versao": assinatura_classificacao(),
+    },
+}
+
+
+def _contar_parcial(df, especificacao):
+    if especificacao["preparar"] is not None:
+        df = especificacao["preparar"](df)
+    return df.groupby(especificacao["chaves"], observed=True, dropna=especificacao.get("dropna", True)).size()
+
+
+def _somar_parciais(parciais):
+    # Os chunks trazem categorias diferentes, então o índice combinado vira
+    # object; a soma por todos os níveis reordena as chaves como o group-by
+    combinado = pd.concat(parciais)
+    return combinado.groupby(level=list(range(combinado.index.nlevels)), dropna=False).sum()
+
+
+def _como_tabela(contagem, especificacao):
+    return contagem.astype('int64').reset_index(name=especificacao["nome"])
+
+
+def contar(df, especificacao):
+    return _como_tabela(_contar_parcial(df, especificacao), especificacao)
+
+
+def iterar_chunks(arquivo, colunas, schema, chunksize, usar_cache=True, predicados=None):
+    # Usa o Parquet do cache quando estiver em dia (com os predicados de
+    # texto aplicados pelo scanner do pyarrow); senão lê o CSV em pedaços.
+    # Os predicados numéricos valem depois da conversão pelo schema.
+    texto, numericos = dividir_predicados(predicados, schema)
+    colunas_numericas = [coluna for coluna, _, _ in numericos if coluna not in colunas]
+    schema_reduzido = {coluna: schema[coluna] for coluna in list(colunas) + colunas_numericas}
+
+    def finalizar(chunk):
+        chunk = filtrar_linhas(aplicar_schema(chunk, schema_reduzido), numericos)
+        return chunk[[coluna for coluna in colunas if coluna in chunk.columns]]
+
+    caminho_parquet = caminho_cache_valido(arquivo) if usar_cache else None
+    if caminho_parquet is not None:
+        dataset = ds.dataset(caminho_parquet, format="parquet")
+        existentes = [coluna for coluna in schema_reduzido if coluna in dataset.schema.names]
+        filtro = pq.filters_to_expression(texto) if texto else None
+        for lote in dataset.to_batches(columns=existentes, filter=filtro, batch_size=chunksize):
+            if lote.num_rows:
+                chunk = finalizar(lote.to_pandas())
+                if not chunk.empty:
+                    yield chunk
+        return
+
+    colunas_predicados = [coluna for coluna, _, _ in texto if coluna not in schema_reduzido]
+    # Colunas fora do schema são lidas como texto, como no cache
+    schema_leitura = {**schema_reduzido, **{coluna: schema.get(coluna, "texto") for coluna in colunas_predicados}}
+    leitor = pd.read_csv(arquivo, sep=';', encoding='latin1', chunksize=chunksize, **opcoes_read_csv(schema_leitura))
+    with leitor:
+        for chunk in leitor:
+            chunk = filtrar_linhas(chunk, texto)
+            if not chunk.empty:
+                chunk = finalizar(chunk)
+                if not chunk.empty:
+                    yield chunk
+
+
+def _contar_arquivo(arquivo, especificacoes, schema, chunksize, usar_cache=True, predicados=None):
+    # Contagens de um arquivo inteiro; um erro no meio da leitura propaga,
+    # para que nenhum total parcial do arquivo seja usado
+    colunas = sorted({coluna for especificacao in especificacoes.values() for coluna in especificacao["colunas"]})
+    parciais = {nome: [] for nome in especificacoes}
+    for chunk in iterar_chunks(arquivo, colunas, schema, chunksize, usar_cache=usar_cache, predicados=predicados):
+        for nome, especificacao in especificacoes.items():
+            parciais[nome].append(_contar_parcial(chunk, especificacao))
+            if len(parciais[nome]) >= MAX_PARCIAIS:
+                parciais[nome] = [_somar_parciais(parciais[nome])]
+    return {nome: _somar_parciais(lista) for nome, lista in parciais.items() if lista}
+
+
+def contar_em_chunks(arquivos, especificacoes, schema, chunksize=500_000, usar_cache=True, predicados=None):
+    # Uma única passada pelos arquivos alimenta todas as contagens pedidas;
+    # só os parciais (pequenos) ficam em memória. Um arquivo com erro fica
+    # inteiro de fora (como na carga, que o trata como vazio), nunca pela metade.
+    parciais = {nome: [] for nome in especificacoes}
+
+    for arquivo in arquivos:
+        try:
+            contagens = _contar_arquivo(arquivo, especificacoes, schema, chunksize, usar_cache, predicados)
+        except Exception as e:
+            avisar(f"Erro ao agregar o arquivo '{arquivo}' (arquivo descartado das contagens): {e}")
+            continue
+        for nome, contagem in contagens.items():
+            parciais[nome].append(contagem)
+            if len(parciais[nome]) >= MAX_PARCIAIS:
+                parciais[nome] = [_somar_parciais(parciais[nome])]
+
+    resultados = {}
+    for nome, especificacao in especificacoes.items():
+        if parciais[nome]:
+            resultados[nome] = _como_tabela(_somar_parciais(parciais[nome]), especificacao)
+        else:
+            resultados[nome] = pd.DataFrame(columns=especificacao["chaves"] + [especificacao["nome"]])
+    return resultados
+
+
+def _assinatura_especificacao(especificacao):
+    preparar = especificacao["preparar"]
+    return hashlib.sha256(json.dumps({
+        "colunas": especificacao["colunas"],
+        "preparar": preparar.__name__ if preparar is not None else None,
+        "chaves": especificacao["chaves"],
+        "nome": especificacao["nome"],
+        "dropna": especificacao.get("dropna", True),
+        "versao": especificacao.get("versao"),
+    }, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _caminho_parcial(nome, especificacao, sha256, predicados, cache_dir):
+    assinatura = _assinatura_especificacao(especificacao)
+    if predicados:
+        assinatura += "-" + hashlib.sha256(json.dumps(predicados, default=str).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(cache_dir, "parciais", f"{nome}-{assinatura}-{sha256[:16]}.parquet")
+
+
+def contar_por_arquivo(arquivos, especificacoes, schema, chunksize=500_000, usar_cache=True, predicados=None,
+                       cache_dir=CACHE_DIR):
+    # Cada arquivo do TSE cobre uma UF: a contagem parcial de cada arquivo
+    # fica em cache pelo hash do conteúdo, e uma atualização de uma UF só
+    # recalcula o parcial daquele arquivo antes de somar tudo de novo.
+    parciais = {nome: [] for nome in especificacoes}
+    reaproveitados = 0
+    for arquivo in arquivos:
+        sha256 = impressao_arquivo(arquivo, cache_dir)
+        caminhos = {
+            nome: _caminho_parcial(nome, especificacao, sha256, predicados, cache_dir)
+            for nome, especificacao in especificacoes.items()
+        }
+        pendentes = {nome: especificacoes[nome] for nome, caminho in caminhos.items() if not os.path.exists(caminho)}
+        if len(pendentes) < len(especificacoes):
+            reaproveitados += 1
+        try:
+            contagens = _contar_arquivo(
+                arquivo, pendentes, schema, chunksize, usar_cache=usar_cache, predicados=predicados
+            ) if pendentes else {}
+        except Exception as e:
+            # Nada deste arquivo vai para o cache nem para os totais: um
+            # parcial truncado seria reaproveitado enquanto o hash não mudasse
+            avisar(f"Erro ao agregar o arquivo '{arquivo}' (arquivo descartado das contagens): {e}")
+            continue
+        tabelas = {nome: _como_tabela(contagens[nome], especificacao)
+                   for nome, especificacao in pendentes.items() if nome in contagens}
+        for nome, tabela in tabelas.items():
+            os.makedirs(os.path.dirname(caminhos[nome]), exist_ok=True)
+            tabela.to_parquet(caminhos[nome], index=False)
+
+        for nome, especificacao in especificacoes.items():
+            if nome in pendentes and nome not in tabelas:
+                # Arquivo sem linhas (após os predicados): nada a somar
+                continue
+            tabela = tabelas[nome] if nome in tabelas else pd.read_parquet(caminhos[nome])
+            if not tabela.empty:
+                parciais[nome].append(tabela.set_index(especificacao["chaves"])[especificacao["nome"]])
+
+    print(f"Contagens {', '.join(especificacoes)}: {reaproveitados} de {len(arquivos)} arquivos com parcial em cache")
+    resultados = {}
+    for nome, especificacao in especificacoes.items():
+        if parciais[nome]:
+            resultados[nome] = _como_tabela(_somar_parciais(parciais[nome]), especificacao)
+        else:
+            resultados[nome] = pd.DataFrame(columns=especificacao["chaves"] + [especificacao["nome"]])
+    return resultados
+
+
+def montar_cubo(contagem_candidatos):
+    cubo = adicionar_regiao(contagem_candidatos)[DIMENSOES_CUBO + ['NUM_CANDIDATOS']]
+    # Mesmo schema no modo em memória (chaves category) e em streaming (object)
+    for coluna in DIMENSOES_CUBO:
+        cubo[coluna] = cubo[coluna].astype('category')
+    return cubo
+
+
+def rollup(cubo, chaves, nome='NUM_CANDIDATOS', filtro=None):
+    if filtro is not None:
+        cubo = cubo[filtro(cubo)]
+    return cubo.groupby(chaves, observed=True)['NUM_CANDIDATOS'].sum().astype('int64').reset_index(name=nome)
+
+
+def _cargos_importantes(cubo):
+    # Sem distinção de maiúsculas: o TSE grava "PREFEITO", "VEREADOR"
+    return cubo['DS_CARGO'].astype(str).str.lower().isin(CARGOS_IMPORTANTES)
+
+
+# Contagens dos insights 3, 4 e 5 como roll-ups do cubo
+ROLLUPS_CUBO = {
+    "partidos_por_uf": {"chaves": ['SG_UF', 'SG_PARTIDO'], "nome": 'NUM_CANDIDATOS', "filtro": None},
+    "candidatos_por_regiao": {"chaves": ['REGIAO', 'SG_PARTIDO'], "nome": 'NUM_CANDIDATOS', "filtro": None},
+    "partido_dominante_uf": {"chaves": ['SG_UF', 'SG_PARTIDO'], "nome": 'TOTAL_CANDIDATOS', "filtro": _cargos_importantes},
+}
+
+
+def rollup_nomeado(nome, cubo):
+    especificacao = ROLLUPS_CUBO[nome]
+    return rollup(cubo, especificacao["chaves"], nome=especificacao["nome"], filtro=especificacao["filtro"])
+
+
+def salvar_cubo(cubo, caminho=CAMINHO_CUBO):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    cubo.to_parquet(caminho, index=False)
+
+
+def carregar_cubo(caminho=CAMINHO_CUBO):
+    return pd.read_parquet(caminho)
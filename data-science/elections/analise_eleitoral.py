@@ -1,444 +1,852 @@
 import os
+import heapq
+import hashlib
+import argparse
+import multiprocessing
+import tempfile
 import pandas as pd
-import fitz
-import nltk
-import folium
-import seaborn as sns
-import matplotlib.ticker as mticker
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+import pyarrow as pa
 
 from glob import glob
-from nltk.corpus import stopwords
+from functools import lru_cache, partial
 from collections import Counter
-from wordcloud import WordCloud
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from cache_dados import carregar_com_cache, cache_valido, limpar_cache
+from comparativo import (
+    RESUMOS_ANUAIS, carregar_resumos_ano, comparar, gravar_comparacao, gravar_resumos_ano, resumir
+)
+from cache_propostas import abrir_cache_propostas, hash_pdf, buscar_extracao, gravar_extracao
+from indice_propostas import CAMINHO_INDICE, atualizar_indice
+from agregacoes import (
+    AGREGACOES_CONTAGEM, CAMINHO_CUBO, ROLLUPS_CUBO, adicionar_regiao, carregar_cubo, contar, contar_em_chunks,
+    contar_por_arquivo, montar_cubo, rollup_nomeado, salvar_cubo
+)
+from agendador import executar
+from base_analitica import CAMINHO_BASE, publicar_base
+from graficos import GRAFICOS, agendar_grafico, aguardar_graficos, configurar_renderizacao
+from instrumentacao import (
+    MODOS_PERFIL, avisar, gravar_relatorio, iniciar_relatorio, instrumentar, instrumentar_tarefas,
+    registrar_sem_execucao, rss_pico_mb
+)
+from manifesto_execucao import (
+    calcular_impressoes, carregar_manifesto, combinar, etapa_em_dia, gravar_manifesto, impressao_arquivos,
+    impressao_codigo, registrar_etapa
+)
+from dimensoes import filtrar_candidatos, juntar_candidatos, montar_dimensao_candidatos, total_por_candidato
+from municipios import (
+    CAMINHO_CORRESPONDENCIA_TSE, CAMINHO_MUNICIPIOS, carregar_correspondencia_tse, carregar_municipios,
+    geojson_pontos, localizar_municipios, municipios_nao_localizados, salvar_geojson
+)
+from particoes import arquivos_do_dataset, dividir_predicados, filtrar_linhas, listar_particoes, predicados_de_particao
+from schemas import SCHEMAS, opcoes_read_csv, aplicar_schema, remover_categorias_nao_usadas, uso_memoria_mb
+
+# Stop words em português (a lista do corpus stopwords do NLTK), versionadas
+# no repositório: nenhuma execução depende de download
+PATH_STOPWORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados_referencia", "stopwords_pt.txt")
 
 def ensure_output_directory():
     if not os.path.exists("output"):
         os.makedirs("output")
 
-ensure_output_directory()
-
-def ensure_stopwords():
-    nltk_data_path = os.path.join(os.path.expanduser("~"), "AppData", "Roaming", "nltk_data", "corpora", "stopwords")
-    if not os.path.exists(nltk_data_path):
-        nltk.download('stopwords')
-    return set(stopwords.words('portuguese'))
-
-stop_words = ensure_stopwords()
-
-def extract_text_from_pdf(file_path):
+@lru_cache(maxsize=1)
+def load_stopwords(path=PATH_STOPWORDS):
+    with open(path, encoding="utf-8") as f:
+        return frozenset(linha.strip() for linha in f if linha.strip())
+
+def count_pdf_terms(file_path):
+    # Conta os termos página a página, sem montar o texto completo do PDF.
+    # Stop words não são removidas aqui: o cache não depende da lista usada.
+    import fitz
+
+    termos = Counter()
+    with fitz.open(file_path) as pdf:
+        for page in pdf:
+            termos.update(word for word in page.get_text().lower().split() if word.isalpha())
+    return termos
+
+def process_pdf_file(item):
+    # Executado nos workers: devolve só a contagem compacta do documento
+    sha256, file_path = item
     try:
-        text = ""
-        with fitz.open(file_path) as pdf:
-            for page_num in range(pdf.page_count):
-                text += pdf[page_num].get_text()
-        return text
+        return sha256, file_path, dict(count_pdf_terms(file_path)), None
     except Exception as e:
-        print(f"Erro ao extrair texto do PDF '{file_path}': {e}")
-        return ""
-
-def process_pdf_file(file_name, path_propostas):
-    if file_name.endswith(".pdf"):
-        return extract_text_from_pdf(os.path.join(path_propostas, file_name))
-    return ""
+        return sha256, file_path, {}, str(e)
 
-def load_file(file):
+def read_csv_file(file, schema=None):
+    # Sem schema (ex.: ao preencher o cache), todas as colunas são lidas como
+    # texto: tipos inferidos perderiam zeros à esquerda de códigos como SG_UE
+    opcoes = opcoes_read_csv(schema) if schema is not None else {"dtype": str}
     try:
-        return pd.read_csv(file, sep=';', encoding='latin1')
+        return pd.read_csv(file, sep=';', encoding='latin1', low_memory=False, **opcoes)
     except Exception as e:
-        print(f"Erro ao carregar o arquivo '{file}': {e}")
+        avisar(f"Erro ao carregar o arquivo '{file}': {e}")
     return pd.DataFrame()
 
-def load_data_from_folder(folder_path, file_pattern="*.csv"):
-    all_files = glob(os.path.join(folder_path, file_pattern))
-    
-    with ProcessPoolExecutor() as executor:
-        df_list = list(executor.map(load_file, all_files))
-
-    return pd.concat(df_list, ignore_index=True) if df_list else pd.DataFrame()
+def read_csv_filtered(file, schema=None, predicates=None):
+    # Colunas dos predicados fora do schema são lidas (como texto, igual ao
+    # cache) só para o filtro; aplicar_schema as descarta depois
+    if schema is not None:
+        extras = {coluna: "texto" for coluna, _, _ in predicates or [] if coluna not in schema}
+        schema = {**schema, **extras}
+    return filtrar_linhas(read_csv_file(file, schema), predicates)
+
+def load_file(file, schema=None, use_cache=True, rebuild_cache=False, predicates=None):
+    # Predicados de texto filtram o arquivo cru; os numéricos, as colunas já
+    # convertidas pelo schema (o cache guarda tudo como texto)
+    texto, numericos = dividir_predicados(predicates, schema)
+    if not use_cache:
+        return filtrar_linhas(aplicar_schema(read_csv_filtered(file, schema, texto), schema), numericos)
+    # O cache guarda o arquivo completo; a projeção e os predicados de texto
+    # são aplicados na leitura do Parquet
+    colunas = list(schema) if schema is not None else None
+    try:
+        df = carregar_com_cache(file, read_csv_file, recriar=rebuild_cache, colunas=colunas, filtros=texto)
+    except Exception as e:
+        avisar(f"Erro ao usar o cache do arquivo '{file}': {e}")
+        df = read_csv_filtered(file, schema, texto)
+    return filtrar_linhas(aplicar_schema(df, schema), numericos)
+
+# As cargas e o insight 8 rodam em threads do agendador: processos criados
+# com fork herdariam travas (ex.: de import) presas por outras threads
+CONTEXTO_PROCESSOS = multiprocessing.get_context("spawn")
+
+# Abaixo deste volume de CSV (sem cache) o custo de subir processos não compensa
+PROCESS_POOL_MIN_BYTES = 64 * 1024 * 1024
+
+def load_file_to_arrow(file, output_dir, schema=None, use_cache=True, rebuild_cache=False, predicates=None):
+    # Executado no processo filho: em vez de serializar o DataFrame com pickle,
+    # grava uma tabela Arrow IPC que o processo pai mapeia em memória.
+    df = load_file(file, schema=schema, use_cache=use_cache, rebuild_cache=rebuild_cache, predicates=predicates)
+    if df.empty:
+        return None
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    del df
+    # Partições em pastas (ano=2024/uf=SC/part.csv) repetem o nome do arquivo:
+    # o nome do IPC vem do caminho completo, único por entrada
+    chave = hashlib.sha1(os.path.abspath(file).encode("utf-8")).hexdigest()
+    ipc_path = os.path.join(output_dir, f"{chave}.arrow")
+    with pa.OSFile(ipc_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return ipc_path
+
+def read_arrow_files(ipc_paths):
+    tables = []
+    for ipc_path in ipc_paths:
+        with pa.memory_map(ipc_path, "r") as source:
+            tables.append(pa.ipc.open_file(source).read_all())
+    if not tables:
+        return pd.DataFrame()
+    table = pa.concat_tables(tables, promote_options="permissive")
+    del tables
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def choose_executor(all_files, use_cache=True, rebuild_cache=False):
+    if len(all_files) <= 1:
+        return "serial"
+    # Leituras de Parquet liberam o GIL e já são multithread no pyarrow
+    if use_cache and not rebuild_cache and all(cache_valido(file) for file in all_files):
+        return "thread"
+    total_bytes = sum(os.path.getsize(file) for file in all_files)
+    return "process" if total_bytes >= PROCESS_POOL_MIN_BYTES else "thread"
+
+def load_data_from_folder(folder_path, file_pattern="*.csv", schema=None, use_cache=True, rebuild_cache=False,
+                          executor="auto", uf=None, ano=None, predicates=None):
+    # executor: "auto", "serial", "thread", "process" (Arrow IPC em arquivos mapeados)
+    # ou "pickle" (processos devolvendo DataFrames serializados, o caminho antigo)
+    # uf/ano escolhem as partições lidas; predicates são filtros de coluna no
+    # formato do pyarrow, ex.: [("DS_CARGO", "==", "prefeito")]
+    all_files = arquivos_do_dataset(folder_path, file_pattern, uf=uf, ano=ano)
+    if not all_files:
+        return pd.DataFrame()
+    predicates = predicados_de_particao(schema, uf) + list(predicates or [])
+
+    if executor == "auto":
+        executor = choose_executor(all_files, use_cache=use_cache, rebuild_cache=rebuild_cache)
+    loader = partial(load_file, schema=schema, use_cache=use_cache, rebuild_cache=rebuild_cache,
+                     predicates=predicates)
+
+    if executor == "process":
+        # /dev/shm mantém os arquivos IPC em memória compartilhada quando disponível
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.TemporaryDirectory(prefix="tse_arrow_", dir=shm_dir) as output_dir:
+            with ProcessPoolExecutor(mp_context=CONTEXTO_PROCESSOS) as pool:
+                ipc_paths = list(pool.map(
+                    partial(load_file_to_arrow, output_dir=output_dir, schema=schema,
+                            use_cache=use_cache, rebuild_cache=rebuild_cache, predicates=predicates),
+                    all_files
+                ))
+            df = read_arrow_files([ipc_path for ipc_path in ipc_paths if ipc_path])
+        return aplicar_schema(df, schema)
+
+    if executor == "serial":
+        df_list = [loader(file) for file in all_files]
+    elif executor == "thread":
+        with ThreadPoolExecutor() as pool:
+            df_list = list(pool.map(loader, all_files))
+    elif executor == "pickle":
+        with ProcessPoolExecutor(mp_context=CONTEXTO_PROCESSOS) as pool:
+            df_list = list(pool.map(loader, all_files))
+    else:
+        raise ValueError(f"Executor de carga desconhecido: '{executor}'")
+
+    df_list = [df for df in df_list if not df.empty]
+    if not df_list:
+        return pd.DataFrame()
+    # Categorias diferentes entre arquivos viram object no concat; o schema é reaplicado
+    return aplicar_schema(pd.concat(df_list, ignore_index=True), schema)
+
+def report_memory(etapa, datasets=None):
+    pico = rss_pico_mb()
+    pico_texto = f"{pico:.1f} MB" if pico is not None else "indisponível"
+    print(f"Pico de memória {etapa}: {pico_texto}")
+    for nome, df in (datasets or {}).items():
+        print(f"  {nome}: {len(df)} linhas, {uso_memoria_mb(df):.1f} MB")
 
 
 # Funções para cada insight
 
-def insight_1_economia_influencia_eleicao(dados_candidatos, dados_bens):
+def insight_1_economia_influencia_eleicao(dimensao_candidatos, dados_bens):
     print("\nInsight 1: Economia e Influência na Eleição")
     
-    try:
-        prefeitos_eleitos = dados_candidatos[
-            (dados_candidatos['DS_CARGO'].str.lower() == 'prefeito') &
-            (dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito')
-        ][['SQ_CANDIDATO', 'NM_CANDIDATO']]
-
-        if prefeitos_eleitos.empty:
-            print("Nenhum prefeito eleito encontrado nos dados de candidatos.")
-            return
-        
-        dados_bens['VR_BEM_CANDIDATO'] = pd.to_numeric(
-            dados_bens['VR_BEM_CANDIDATO'].replace(',', '.', regex=True), errors='coerce'
-        )
-
-        bens_eleitos = dados_bens[dados_bens['SQ_CANDIDATO'].isin(prefeitos_eleitos['SQ_CANDIDATO'])]
-        total_bens_por_candidato = bens_eleitos.groupby('SQ_CANDIDATO')['VR_BEM_CANDIDATO'].sum().reset_index()
-
-        if total_bens_por_candidato.empty:
-            print("Nenhum bem declarado encontrado para os prefeitos eleitos.")
-            return
-
-        top_10_bens = total_bens_por_candidato.nlargest(10, 'VR_BEM_CANDIDATO')
-        top_10_bens = top_10_bens.merge(prefeitos_eleitos, on='SQ_CANDIDATO')
-        top_10_bens.to_csv("output/total_bens_prefeitos_eleitos.csv", index=False)
-
-        plt.figure(figsize=(12, 8))
-        sns.barplot(
-            data=top_10_bens, 
-            x='NM_CANDIDATO', 
-            y='VR_BEM_CANDIDATO', 
-            color='blue'
-        )
-        plt.title("Top 10 Prefeitos Eleitos com Maior Total de Bens Declarados")
-        plt.xlabel("Nome do Candidato")
-        plt.ylabel("Total de Bens Declarados (R$)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        plt.savefig("output/total_bens_prefeitos_eleitos.png")
-        plt.show()
-        plt.close()
+    prefeitos_eleitos = filtrar_candidatos(dimensao_candidatos, cargo='prefeito', situacao='eleito')
+
+    if prefeitos_eleitos.empty:
+        print("Nenhum prefeito eleito encontrado nos dados de candidatos.")
+        return
+
+    bens_eleitos = dados_bens[dados_bens['SQ_CANDIDATO'].isin(prefeitos_eleitos.index)]
+    total_bens_por_candidato = total_por_candidato(bens_eleitos, 'VR_BEM_CANDIDATO').reset_index()
+
+    if total_bens_por_candidato.empty:
+        print("Nenhum bem declarado encontrado para os prefeitos eleitos.")
+        return
+
+    # Uma linha por candidato: a dimensão tem SQ_CANDIDATO único
+    top_10_bens = total_bens_por_candidato.nlargest(10, 'VR_BEM_CANDIDATO')
+    top_10_bens = juntar_candidatos(top_10_bens, prefeitos_eleitos, ['NM_CANDIDATO'])
+    top_10_bens.to_csv("output/total_bens_prefeitos_eleitos.csv", index=False)
+
+    agendar_grafico("total_bens_prefeitos_eleitos", top_10_bens)
 
-    except Exception as e:
-        print(f"Erro no insight 1 - economia_influencia_eleicao: {e}")
 
 
-def insight_2_coligacoes_disputas_vitoria(dados_candidatos, dados_coligacoes):
+def insight_2_coligacoes_disputas_vitoria(dimensao_candidatos, dados_coligacoes):
     print("Insight 2: Coligações e Disputas de Vitória")
-    try:
-        dados_coligacoes['NUMERO_PARTIDOS'] = dados_coligacoes['DS_COMPOSICAO_FEDERACAO'].str.count(',') + 1
-        
-        coligacoes_eleitos = dados_candidatos[dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito']
-        coligacoes_resultados = coligacoes_eleitos.groupby(['SQ_COLIGACAO', 'SG_UF']).size().reset_index(name='NUM_ELEITOS')
-
-        coligacoes_detalhadas = dados_coligacoes.merge(coligacoes_resultados, on='SQ_COLIGACAO', how='left')
-        coligacoes_detalhadas['NUM_ELEITOS'] = coligacoes_detalhadas['NUM_ELEITOS'].fillna(0)
-        coligacoes_detalhadas = coligacoes_detalhadas.sort_values(by=['NUMERO_PARTIDOS', 'NUM_ELEITOS'], ascending=[False, False])
-        coligacoes_detalhadas.to_csv("output/coligacoes_detalhadas.csv", index=False)
-        
-        plt.figure(figsize=(14, 8))
-        
-        scatter = sns.scatterplot(
-            data=coligacoes_detalhadas, 
-            x='NUMERO_PARTIDOS', 
-            y='NUM_ELEITOS', 
-            size='NUM_ELEITOS', 
-            hue='SG_UF_x', 
-            sizes=(40, 400),
-            alpha=0.7, 
-            legend='full'
-        )
-
-        plt.title("Coligações: Número de Eleitos por Número de Partidos e UF")
-        plt.xlabel("Número de Partidos na Coligação")
-        plt.ylabel("Número de Eleitos")
-        scatter.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-
-        plt.savefig("output/coligacoes_eleitos.png")
-        plt.show()
-        
-    except Exception as e:
-        print(f"Erro no insight 2 - coligacoes_disputas_vitoria: {e}")
+    dados_coligacoes = dados_coligacoes.assign(
+        NUMERO_PARTIDOS=dados_coligacoes['DS_COMPOSICAO_FEDERACAO'].str.count(',') + 1
+    )
+    
+    coligacoes_eleitos = filtrar_candidatos(dimensao_candidatos, situacao='eleito')
+    coligacoes_resultados = (
+        coligacoes_eleitos.groupby(['SQ_COLIGACAO', 'SG_UF'], observed=True).size()
+        .rename('NUM_ELEITOS').reset_index(level='SG_UF')
+    )
+
+    # Join pelo índice SQ_COLIGACAO dos resultados (mesmos sufixos do merge)
+    coligacoes_detalhadas = dados_coligacoes.join(
+        coligacoes_resultados, on='SQ_COLIGACAO', how='left', lsuffix='_x', rsuffix='_y'
+    )
+    coligacoes_detalhadas['NUM_ELEITOS'] = coligacoes_detalhadas['NUM_ELEITOS'].fillna(0)
+    coligacoes_detalhadas = coligacoes_detalhadas.sort_values(by=['NUMERO_PARTIDOS', 'NUM_ELEITOS'], ascending=[False, False])
+    coligacoes_detalhadas.to_csv("output/coligacoes_detalhadas.csv", index=False)
+    
+    agendar_grafico("coligacoes_eleitos", coligacoes_detalhadas)
 
 
 
-def insight_3_maior_partido_uf(dados_candidatos):
+
+def insight_3_maior_partido_uf(partidos_por_uf):
     print("Insight 3: Maior Partido por UF")
-    try:
-        partidos_por_uf = dados_candidatos.groupby(['SG_UF', 'SG_PARTIDO']).size().reset_index(name='NUM_CANDIDATOS')
-        maior_partido_por_uf = partidos_por_uf.loc[partidos_por_uf.groupby('SG_UF')['NUM_CANDIDATOS'].idxmax()]
-        maior_partido_por_uf.to_csv("output/maior_partido_por_uf.csv", index=False)
-
-        plt.figure(figsize=(10, 8))
-        sns.barplot(data=maior_partido_por_uf, y='SG_UF', x='NUM_CANDIDATOS', hue='SG_PARTIDO', dodge=False)
-        plt.title("Partido com Maior Quantidade de Candidatos por UF")
-        plt.xlabel("Número de Candidatos")
-        plt.ylabel("UF")
-        plt.legend(title="Partido")
-        plt.savefig("output/partido_maior_por_uf.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 3 - maior_partido_uf: {e}")
+    maior_partido_por_uf = partidos_por_uf.loc[partidos_por_uf.groupby('SG_UF', observed=True)['NUM_CANDIDATOS'].idxmax()]
+    maior_partido_por_uf = remover_categorias_nao_usadas(maior_partido_por_uf)
+    maior_partido_por_uf.to_csv("output/maior_partido_por_uf.csv", index=False)
+
+    agendar_grafico("partido_maior_por_uf", maior_partido_por_uf)
 
-def insight_4_tendencia_regional_partido(dados_candidatos):
+def insight_4_tendencia_regional_partido(candidatos_por_regiao):
     print("Insight 4: Tendência Regional por Partido")
-    try:
-        ufs_para_regioes = {
-            "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
-            "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
-            "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
-            "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
-            "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
-            "PR": "Sul", "RS": "Sul", "SC": "Sul"
-        }
-        dados_candidatos['REGIAO'] = dados_candidatos['SG_UF'].map(ufs_para_regioes)
-        candidatos_por_regiao = dados_candidatos.groupby(['REGIAO', 'SG_PARTIDO']).size().reset_index(name='NUM_CANDIDATOS')
-        candidatos_por_regiao.to_csv("output/distribuicao_partido_regiao.csv", index=False)
-
-        plt.figure(figsize=(12, 6))
-        sns.barplot(data=candidatos_por_regiao, x='REGIAO', y='NUM_CANDIDATOS', hue='SG_PARTIDO')
-        plt.title("Distribuição de Candidaturas por Partido e Região")
-        plt.xlabel("Região")
-        plt.ylabel("Número de Candidatos")
-        plt.legend(title="Partido", bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.savefig("output/distribuicao_partido_regiao.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 4 - tendencia_regional_partido: {e}")
+    candidatos_por_regiao = remover_categorias_nao_usadas(candidatos_por_regiao)
+    candidatos_por_regiao.to_csv("output/distribuicao_partido_regiao.csv", index=False)
 
-def insight_5_partido_dominante_cargo(dados_candidatos):
-    print("Insight 5: Partido Dominante por Cargo")
-    try:
-        cargos_importantes = ['prefeito', 'vice-prefeito', 'vereador']
-        dados_cargos = dados_candidatos[dados_candidatos['DS_CARGO'].isin(cargos_importantes)]
-        partido_dominante_uf = dados_cargos.groupby(['SG_UF', 'SG_PARTIDO']).size().reset_index(name='TOTAL_CANDIDATOS')
-        partido_dominante_uf = partido_dominante_uf.loc[partido_dominante_uf.groupby('SG_UF')['TOTAL_CANDIDATOS'].idxmax()]
-        partido_dominante_uf.to_csv("output/partido_dominante_uf.csv", index=False)
-
-        plt.figure(figsize=(10, 8))
-        sns.barplot(data=partido_dominante_uf, y='SG_UF', x='TOTAL_CANDIDATOS', hue='SG_PARTIDO', dodge=False)
-        plt.title("Partido Dominante por UF (Prefeito, Vice e Vereadores)")
-        plt.xlabel("Total de Candidatos")
-        plt.ylabel("UF")
-        plt.legend(title="Partido")
-        plt.savefig("output/partido_dominante_por_uf.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 5 - partido_dominante_cargo: {e}")
+    agendar_grafico("distribuicao_partido_regiao", candidatos_por_regiao)
 
-def insight_6_candidatos_indigenas_quilombolas(dados_candidatos, dados_info_complementar):
-    print("Insight 6: Candidatos Indígenas e Quilombolas")
-    try:
-        ufs_para_regioes = {
-            "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
-            "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
-            "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
-            "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
-            "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
-            "PR": "Sul", "RS": "Sul", "SC": "Sul"
-        }
-        candidatos_indigenas = dados_info_complementar[dados_info_complementar['CD_ETNIA_INDIGENA'] != 0]
-        candidatos_quilombolas = dados_info_complementar[dados_info_complementar['ST_QUILOMBOLA'] == 'S']
-        candidatos_indigenas['REGIAO'] = candidatos_indigenas['SG_UF'].map(ufs_para_regioes)
-        candidatos_quilombolas['REGIAO'] = candidatos_quilombolas['SG_UF'].map(ufs_para_regioes)
+def insight_5_partido_dominante_cargo(partido_dominante_uf):
+    print("Insight 5: Partido Dominante por Cargo")
+    partido_dominante_uf = partido_dominante_uf.loc[partido_dominante_uf.groupby('SG_UF', observed=True)['TOTAL_CANDIDATOS'].idxmax()]
+    partido_dominante_uf = remover_categorias_nao_usadas(partido_dominante_uf)
+    partido_dominante_uf.to_csv("output/partido_dominante_uf.csv", index=False)
 
-        indigenas_por_regiao = candidatos_indigenas.groupby('REGIAO').size().reset_index(name='NUM_INDIGENAS')
-        quilombolas_por_regiao = candidatos_quilombolas.groupby('REGIAO').size().reset_index(name='NUM_QUILOMBOLAS')
+    agendar_grafico("partido_dominante_por_uf", partido_dominante_uf)
 
-        indigenas_por_regiao.to_csv("output/indigenas_por_regiao.csv", index=False)
-        quilombolas_por_regiao.to_csv("output/quilombolas_por_regiao.csv", index=False)
+def insight_6_candidatos_indigenas_quilombolas(dados_info_complementar, dimensao_candidatos):
+    print("Insight 6: Candidatos Indígenas e Quilombolas")
+    # A UF (e a região) vem da candidatura, pela chave SQ_CANDIDATO
+    dados_info_complementar = juntar_candidatos(
+        dados_info_complementar.drop(columns=['SG_UF'], errors='ignore'), dimensao_candidatos, ['SG_UF']
+    )
+    candidatos_indigenas = adicionar_regiao(dados_info_complementar[dados_info_complementar['CD_ETNIA_INDIGENA'] != 0])
+    candidatos_quilombolas = adicionar_regiao(dados_info_complementar[dados_info_complementar['ST_QUILOMBOLA'] == 'S'])
 
-        fig, ax = plt.subplots(1, 2, figsize=(14, 6))
-        sns.barplot(data=indigenas_por_regiao, x='REGIAO', y='NUM_INDIGENAS', ax=ax[0], palette="Blues")
-        ax[0].set_title("Número de Candidatos Indígenas por Região")
+    indigenas_por_regiao = candidatos_indigenas.groupby('REGIAO', observed=True).size().reset_index(name='NUM_INDIGENAS')
+    quilombolas_por_regiao = candidatos_quilombolas.groupby('REGIAO', observed=True).size().reset_index(name='NUM_QUILOMBOLAS')
+    indigenas_por_regiao = remover_categorias_nao_usadas(indigenas_por_regiao)
+    quilombolas_por_regiao = remover_categorias_nao_usadas(quilombolas_por_regiao)
 
-        sns.barplot(data=quilombolas_por_regiao, x='REGIAO', y='NUM_QUILOMBOLAS', ax=ax[1], palette="Greens")
-        ax[1].set_title("Número de Candidatos Quilombolas por Região")
+    indigenas_por_regiao.to_csv("output/indigenas_por_regiao.csv", index=False)
+    quilombolas_por_regiao.to_csv("output/quilombolas_por_regiao.csv", index=False)
 
-        plt.tight_layout()
-        plt.savefig("output/indigenas_quilombolas_regiao.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 6 - candidatos_indigenas_quilombolas: {e}")
+    agendar_grafico("indigenas_quilombolas_regiao", (indigenas_por_regiao, quilombolas_por_regiao))
 
-def insight_7_rede_social_preferida(dados_redes_sociais):
+def insight_7_rede_social_preferida(redes_por_partido_uf):
     print("Insight 7: Rede Social Preferida")
-    try:
-        dados_redes_sociais['TIPO_REDE'] = dados_redes_sociais['DS_URL'].str.extract(r'(facebook|instagram|twitter|youtube|linkedin)', expand=False).fillna('outros')
-        redes_por_partido_uf = dados_redes_sociais.groupby(['SG_UF', 'TIPO_REDE']).size().reset_index(name='NUM_CANDIDATOS')
-        redes_por_partido_uf.to_csv("output/redes_por_partido_uf.csv", index=False)
-
-        plt.figure(figsize=(12, 6))
-        sns.countplot(data=dados_redes_sociais, x='SG_UF', hue='TIPO_REDE', order=sorted(dados_redes_sociais['SG_UF'].unique()))
-        plt.title("Rede Social Preferida dos Candidatos por UF")
-        plt.xlabel("UF")
-        plt.ylabel("Número de Candidatos")
-        plt.legend(title="Rede Social", bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.savefig("output/rede_social_uf.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 7 - rede_social_preferida: {e}")
+    redes_por_partido_uf = remover_categorias_nao_usadas(redes_por_partido_uf)
+    redes_por_partido_uf.to_csv("output/redes_por_partido_uf.csv", index=False)
 
-def insight_8_termos_propostas_governo(stop_words, path_propostas='./data/candidatos_propostas_governo/SC/'):
-    try:
-        all_terms = []
-        with ProcessPoolExecutor() as executor:
-            results = list(executor.map(
-                process_pdf_file, os.listdir(path_propostas), [path_propostas] * len(os.listdir(path_propostas))
-            ))
-        for text in results:
-            tokens = [word for word in text.lower().split() if word.isalpha() and word not in stop_words]
-            all_terms.extend(tokens)
-        termos_frequentes = Counter(all_terms).most_common(10)
-        pd.DataFrame(termos_frequentes, columns=['Termo', 'Frequência']).to_csv("output/termos_propostas.csv", index=False)
-
-        text = ' '.join([term for term, _ in termos_frequentes])
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title("Principais Termos nas Propostas de Governo")
-        plt.savefig("output/nuvem_termos_propostas.png")
-        plt.close()
-    except Exception as e:
-        print(f"Erro no insight 8 - termos_propostas: {e}")
+    agendar_grafico("rede_social_uf", redes_por_partido_uf)
 
-def insight_9_mapa_resultados_eleicao(dados_candidatos, dados_municipios):
-    try:
-        candidatos_eleitos = dados_candidatos[
-            (dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito') &
-            (dados_candidatos['DS_CARGO'].str.lower() == 'prefeito')
-        ].copy()
-        
-        candidatos_eleitos.loc[:, 'NM_UE'] = candidatos_eleitos['NM_UE'].str.lower()
-        candidatos_eleitos.loc[:, 'SG_UF'] = candidatos_eleitos['SG_UF'].str.lower()
-        dados_municipios.loc[:, 'MUNICIPIO'] = dados_municipios['MUNICIPIO'].str.lower()
-        dados_municipios.loc[:, 'SG_UF'] = dados_municipios['SG_UF'].str.lower()
-        
-        resultados_municipios = pd.merge(
-            candidatos_eleitos[['NM_UE', 'SG_PARTIDO', 'SG_UF']],
-            dados_municipios[['MUNICIPIO', 'LATITUDE', 'LONGITUDE', 'SG_UF']],
-            left_on=['NM_UE', 'SG_UF'],
-            right_on=['MUNICIPIO', 'SG_UF'],
-            how='inner'
-        )
-
-        resultados_municipios = resultados_municipios.rename(columns={
-            'NM_UE': 'MUNICIPIO',
-            'SG_PARTIDO': 'PARTIDO_VENCEDOR'
-        })
-
-        resultados_municipios = resultados_municipios[['MUNICIPIO', 'LATITUDE', 'LONGITUDE', 'PARTIDO_VENCEDOR']]
-        
-        mapa_brasil = folium.Map(location=[-15.7801, -47.9292], zoom_start=4)
-
-        partidos_unicos = resultados_municipios['PARTIDO_VENCEDOR'].unique()
-        num_partidos = len(partidos_unicos)
-        
-        colormap = plt.get_cmap('Set1', num_partidos)
-        cores_partidos = {partido: mcolors.to_hex(colormap(i / num_partidos)) for i, partido in enumerate(partidos_unicos)}
-
-        for _, row in resultados_municipios.iterrows():
-            folium.CircleMarker(
-                location=(row['LATITUDE'], row['LONGITUDE']),
-                radius=6,
-                color=cores_partidos.get(row['PARTIDO_VENCEDOR'], 'gray'),
-                fill=True,
-                fill_opacity=0.7,
-                popup=row['MUNICIPIO']
-            ).add_to(mapa_brasil)
-
-        mapa_brasil.save("output/resultado_eleicoes_mapa.html")
-        print("Mapa gerado e salvo como 'output/resultado_eleicoes_mapa.html'")
-        
-    except Exception as e:
-        print(f"Erro no insight 9 - mapa_resultados_eleicao: {e}")
+PATH_PROPOSTAS = './data/candidatos_propostas_governo/SC/'
 
+# Commits no cache de propostas a cada N documentos extraídos
+PDF_CACHE_COMMIT_EVERY = 500
 
-def main():
+def count_proposal_terms(path_propostas, retry_failures=False, processes=None):
+    # Map/reduce em streaming: só os PDFs novos ou alterados (hash de conteúdo
+    # desconhecido) vão para os workers, e cada contagem é somada ao total e
+    # gravada no cache assim que chega. Nenhum texto completo passa pelo pai.
+    arquivos = [file_name for file_name in os.listdir(path_propostas) if file_name.endswith(".pdf")]
+    total_termos = Counter()
+    conexao = abrir_cache_propostas()
+    try:
+        hashes = [hash_pdf(conexao, os.path.join(path_propostas, file_name)) for file_name in arquivos]
+        # Arquivos com o mesmo conteúdo contam uma vez cada, como antes
+        copias = Counter(hashes)
+
+        pendentes = {}
+        acertos = falhas_conhecidas = 0
+        for file_name, sha256 in zip(arquivos, hashes):
+            if sha256 in pendentes:
+                continue
+            extracao = buscar_extracao(conexao, sha256)
+            if extracao is None or (retry_failures and extracao[0] == "erro"):
+                pendentes[sha256] = os.path.join(path_propostas, file_name)
+                continue
+            acertos += 1
+            falhas_conhecidas += extracao[0] == "erro"
+            total_termos.update(extracao[1])
+
+        novas_falhas = 0
+        if pendentes:
+            processes = processes or os.cpu_count() or 1
+            chunksize = max(1, len(pendentes) // (processes * 4))
+            with CONTEXTO_PROCESSOS.Pool(processes) as pool:
+                resultados = pool.imap_unordered(process_pdf_file, pendentes.items(), chunksize=chunksize)
+                for processados, (sha256, file_path, termos, erro) in enumerate(resultados, start=1):
+                    if erro:
+                        avisar(f"Erro ao extrair texto do PDF '{file_path}': {erro}")
+                        novas_falhas += 1
+                    gravar_extracao(conexao, sha256, termos=termos, erro=erro)
+                    for _ in range(copias[sha256]):
+                        total_termos.update(termos)
+                    if processados % PDF_CACHE_COMMIT_EVERY == 0:
+                        conexao.commit()
+        conexao.commit()
+    finally:
+        conexao.close()
+
+    print(f"Cache de propostas: {acertos} acertos ({falhas_conhecidas} falhas já registradas), "
+          f"{len(pendentes)} extraídos ({novas_falhas} com erro), {len(arquivos)} PDFs no total")
+    return total_termos
+
+def insight_8_termos_propostas_governo(stop_words, path_propostas=PATH_PROPOSTAS,
+                                       retry_failures=False):
+    total_termos = count_proposal_terms(path_propostas, retry_failures=retry_failures)
+    # Empates em ordem alfabética: a ordem de chegada dos workers não é fixa
+    termos_frequentes = heapq.nsmallest(
+        10,
+        ((termo, frequencia) for termo, frequencia in total_termos.items() if termo not in stop_words),
+        key=lambda item: (-item[1], item[0])
+    )
+    pd.DataFrame(termos_frequentes, columns=['Termo', 'Frequência']).to_csv("output/termos_propostas.csv", index=False)
+
+    agendar_grafico("nuvem_termos_propostas", [term for term, _ in termos_frequentes])
+
+def insight_9_mapa_resultados_eleicao(dimensao_candidatos, dados_municipios):
+    import folium
+    import matplotlib
+    import matplotlib.colors as mcolors
+
+    candidatos_eleitos = filtrar_candidatos(dimensao_candidatos, cargo='prefeito', situacao='eleito')
+
+    # Município pelo código do TSE (SG_UE) ou, na falta dele, por UF + nome sem acentos
+    correspondencia = carregar_correspondencia_tse()
+    if correspondencia is None:
+        print("Mapa: sem correspondência TSE -> IBGE; municípios localizados por UF + nome "
+              "(gere-a com dados_referencia/gerar_correspondencia_tse.py)")
+    resultados_municipios = localizar_municipios(
+        candidatos_eleitos[['SG_UE', 'SG_UF', 'NM_UE', 'SG_PARTIDO']],
+        dados_municipios,
+        correspondencia
+    )
+    print(f"Mapa: {len(resultados_municipios)} de {len(candidatos_eleitos)} prefeitos eleitos com município localizado")
+    nao_localizados = municipios_nao_localizados(candidatos_eleitos, resultados_municipios)
+    if not nao_localizados.empty:
+        nomes = [f"{nome}/{uf}" for nome, uf in zip(nao_localizados['NM_UE'].astype(str), nao_localizados['SG_UF'].astype(str))]
+        avisar(f"Aviso: {len(nomes)} município(s) sem coordenadas ficaram fora do mapa: {', '.join(sorted(nomes))}")
+    if resultados_municipios.empty:
+        print("Nenhum município localizado; mapa não gerado")
+        return
+
+    resultados_municipios = resultados_municipios.rename(columns={
+        'NM_UE': 'MUNICIPIO',
+        'SG_PARTIDO': 'PARTIDO_VENCEDOR'
+    })
 
-    data_paths = {
-        "candidatos": "./data/candidatos/",
-        "candidatos_bens": "./data/candidatos_bens/",
-        "candidatos_info_complementar": "./data/candidatos_info_complementar/",
-        "candidatos_redes_sociais": "./data/candidatos_redes_sociais/",
-        "coligacoes": "./data/coligacoes/",
-        "motivo_cassacao": "./data/motivo_cassacao/",
-        "vagas": "./data/vagas/"
-    }
+    resultados_municipios = resultados_municipios[['MUNICIPIO', 'LATITUDE', 'LONGITUDE', 'PARTIDO_VENCEDOR']]
+
+    partidos_unicos = resultados_municipios['PARTIDO_VENCEDOR'].astype(str).unique()
+    num_partidos = len(partidos_unicos)
+
+    colormap = matplotlib.colormaps['Set1'].resampled(max(num_partidos, 1))
+    cores_partidos = {partido: mcolors.to_hex(colormap(i / num_partidos)) for i, partido in enumerate(partidos_unicos)}
+    resultados_municipios = resultados_municipios.assign(
+        COR=resultados_municipios['PARTIDO_VENCEDOR'].astype(str).map(cores_partidos).fillna('gray')
+    )
+
+    # Uma única camada GeoJSON (desenhada em canvas) em vez de um
+    # CircleMarker por município: o HTML cresce pouco com o número de pontos
+    geojson = geojson_pontos(resultados_municipios, propriedades=('MUNICIPIO', 'PARTIDO_VENCEDOR', 'COR'))
+    salvar_geojson(geojson, "output/resultado_eleicoes_mapa.geojson")
+
+    mapa_brasil = folium.Map(location=[-15.7801, -47.9292], zoom_start=4, prefer_canvas=True)
+    folium.GeoJson(
+        geojson,
+        name="Prefeitos eleitos",
+        marker=folium.CircleMarker(radius=6, fill=True, fill_opacity=0.7, weight=1),
+        style_function=lambda feature: {
+            'color': feature['properties']['COR'],
+            'fillColor': feature['properties']['COR'],
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['MUNICIPIO', 'PARTIDO_VENCEDOR'], aliases=['Município', 'Partido']),
+    ).add_to(mapa_brasil)
+
+    mapa_brasil.save("output/resultado_eleicoes_mapa.html")
+    print("Mapa gerado e salvo como 'output/resultado_eleicoes_mapa.html'")
+    
 
-    dados_candidatos = load_data_from_folder(data_paths["candidatos"])
-    dados_bens = load_data_from_folder(data_paths["candidatos_bens"])
-    dados_info_complementar = load_data_from_folder(data_paths["candidatos_info_complementar"])
-    dados_redes_sociais = load_data_from_folder(data_paths["candidatos_redes_sociais"])
-    dados_coligacoes = load_data_from_folder(data_paths["coligacoes"])
-    dados_motivo_cassacao = load_data_from_folder(data_paths["motivo_cassacao"])
-    dados_vagas = load_data_from_folder(data_paths["vagas"])
 
-    try:
-        assert not dados_candidatos.empty, "Erro: dados de candidatos estão vazios!"
-        assert not dados_bens.empty, "Erro: dados de bens estão vazios!"
-        assert not dados_info_complementar.empty, "Erro: dados de informações complementares são vazios!"
-        assert not dados_redes_sociais.empty, "Erro: dados de redes sociais estão vazios!"
-        assert not dados_coligacoes.empty, "Erro: dados de coligações estão vazios!"
-        assert not dados_motivo_cassacao.empty, "Erro: dados de motivos de cassação estão vazios!"
-        assert not dados_vagas.empty, "Erro: dados de vagas estão vazios!"
-    except AssertionError as e:
-        print(e)
-
-    municipios_coordenadas = pd.DataFrame({
-        'MUNICIPIO': [
-            'São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Salvador', 'Fortaleza',
-            'Brasília', 'Curitiba', 'Manaus', 'Recife', 'Porto Alegre',
-            'Belém', 'Goiânia', 'São Luís', 'Maceió', 'Natal',
-            'Campo Grande', 'Teresina', 'João Pessoa', 'Aracaju', 'Cuiabá',
-            'Florianópolis', 'Macapá', 'Rio Branco', 'Palmas', 'Boa Vista'
-        ],
-        'SG_UF': [
-            'SP', 'RJ', 'MG', 'BA', 'CE', 'DF', 'PR', 'AM', 'PE', 'RS',
-            'PA', 'GO', 'MA', 'AL', 'RN', 'MS', 'PI', 'PB', 'SE', 'MT',
-            'SC', 'AP', 'AC', 'TO', 'RR'
-        ],
-        'LATITUDE': [
-            -23.5505, -22.9068, -19.9245, -12.9714, -3.7172,
-            -15.7942, -25.429, -3.119, -8.0476, -30.0346,
-            -1.4558, -16.6869, -2.5307, -9.6498, -5.7945,
-            -20.4697, -5.0919, -7.1195, -10.9472, -15.601,
-            -27.5954, 0.0355, -9.9754, -10.1842, 2.8235
+DATA_PATHS = {
+    "candidatos": "./data/candidatos/",
+    "candidatos_bens": "./data/candidatos_bens/",
+    "candidatos_info_complementar": "./data/candidatos_info_complementar/",
+    "candidatos_redes_sociais": "./data/candidatos_redes_sociais/",
+    "coligacoes": "./data/coligacoes/",
+    "motivo_cassacao": "./data/motivo_cassacao/",
+    "vagas": "./data/vagas/"
+}
+
+# Entradas declaradas de cada insight: nomes de datasets de DATA_PATHS ou de
+# agregados intermediários montados em build_tasks. Só o que algum insight
+# selecionado precisa é carregado. As saídas são os artefatos registrados no
+# manifesto de execução.
+INSIGHTS = {
+    "1": {
+        "funcao": insight_1_economia_influencia_eleicao,
+        "entradas": ["dimensao_candidatos", "candidatos_bens"],
+        "saidas": ["output/total_bens_prefeitos_eleitos.csv", "output/total_bens_prefeitos_eleitos.png"],
+    },
+    "2": {
+        "funcao": insight_2_coligacoes_disputas_vitoria,
+        "entradas": ["dimensao_candidatos", "coligacoes"],
+        "saidas": ["output/coligacoes_detalhadas.csv", "output/coligacoes_eleitos.png"],
+    },
+    "3": {
+        "funcao": insight_3_maior_partido_uf,
+        "entradas": ["partidos_por_uf"],
+        "saidas": ["output/maior_partido_por_uf.csv", "output/partido_maior_por_uf.png"],
+    },
+    "4": {
+        "funcao": insight_4_tendencia_regional_partido,
+        "entradas": ["candidatos_por_regiao"],
+        "saidas": ["output/distribuicao_partido_regiao.csv", "output/distribuicao_partido_regiao.png"],
+    },
+    "5": {
+        "funcao": insight_5_partido_dominante_cargo,
+        "entradas": ["partido_dominante_uf"],
+        "saidas": ["output/partido_dominante_uf.csv", "output/partido_dominante_por_uf.png"],
+    },
+    "6": {
+        "funcao": insight_6_candidatos_indigenas_quilombolas,
+        "entradas": ["candidatos_info_complementar", "dimensao_candidatos"],
+        "saidas": [
+            "output/indigenas_por_regiao.csv", "output/quilombolas_por_regiao.csv",
+            "output/indigenas_quilombolas_regiao.png",
         ],
-        'LONGITUDE': [
-            -46.6333, -43.1729, -43.9352, -38.5014, -38.5434,
-            -47.8822, -49.2671, -60.0217, -34.8783, -51.2177,
-            -48.4902, -49.2644, -44.3028, -35.7089, -35.211,
-            -54.6201, -42.8018, -34.845, -37.0731, -56.0979,
-            -48.548, -51.0664, -67.8243, -48.3277, -60.6758
-        ]
+    },
+    "7": {
+        "funcao": insight_7_rede_social_preferida,
+        "entradas": ["redes_por_partido_uf"],
+        "saidas": ["output/redes_por_partido_uf.csv", "output/rede_social_uf.png"],
+    },
+    "8": {
+        "funcao": insight_8_termos_propostas_governo,
+        "entradas": [],
+        "saidas": ["output/termos_propostas.csv", "output/nuvem_termos_propostas.png"],
+    },
+    "9": {
+        "funcao": insight_9_mapa_resultados_eleicao,
+        "entradas": ["dimensao_candidatos", "municipios"],
+        "saidas": ["output/resultado_eleicoes_mapa.html", "output/resultado_eleicoes_mapa.geojson"],
+    },
+}
+
+# Etapas opcionais que não são insights, mas podem ser selecionadas pela CLI
+EXTRA_STEPS = ["indice", "base"]
+
+# Artefatos das etapas que não são insights
+STEP_OUTPUTS = {"indice": [CAMINHO_INDICE], "base": [CAMINHO_BASE], "cubo": [CAMINHO_CUBO]}
+
+
+def load_dataset(nome, **opcoes_carga):
+    # opcoes_carga inclui os filtros de partição (uf, ano) da execução
+    df = load_data_from_folder(DATA_PATHS[nome], schema=SCHEMAS[nome], **opcoes_carga)
+    if df.empty:
+        print(f"Erro: dados de {nome} estão vazios!")
+    return df
+
+
+def dataset_files(nome, uf=None, ano=None):
+    return arquivos_do_dataset(DATA_PATHS[nome], uf=uf, ano=ano)
+
+
+def dataset_fingerprint(manifesto, nome, uf=None, ano=None):
+    return combinar(impressao_arquivos(manifesto, dataset_files(nome, uf, ano)), uf, ano)
+
+
+def stream_count_aggregates(nomes, chunksize=500_000, use_cache=True, uf=None, ano=None):
+    # Modo out-of-core: cada dataset é percorrido uma vez, em chunks. Com o
+    # cache ativo, os parciais de cada arquivo são reaproveitados entre
+    # execuções e só os arquivos alterados são lidos de novo.
+    contar_arquivos = contar_por_arquivo if use_cache else contar_em_chunks
+    contagens = {}
+    for dataset in sorted({AGREGACOES_CONTAGEM[nome]["dataset"] for nome in nomes}):
+        especificacoes = {
+            nome: AGREGACOES_CONTAGEM[nome] for nome in nomes
+            if AGREGACOES_CONTAGEM[nome]["dataset"] == dataset
+        }
+        contagens.update(contar_arquivos(
+            dataset_files(dataset, uf, ano), especificacoes, SCHEMAS[dataset], chunksize=chunksize,
+            usar_cache=use_cache, predicados=predicados_de_particao(SCHEMAS[dataset], uf)
+        ))
+    return contagens
+
+
+def build_cube(contagem_candidatos):
+    # Cubo UF x região x partido x cargo x situação, persistido para reuso
+    cubo = montar_cubo(contagem_candidatos)
+    salvar_cubo(cubo)
+    return cubo
+
+
+def publish_analytical_store(cubo, redes_por_partido_uf, dimensao_candidatos, bens_por_candidato):
+    # Agregados consultados pelos filtros do dashboard (ver base_analitica)
+    candidatos = adicionar_regiao(dimensao_candidatos.reset_index()).join(
+        bens_por_candidato.rename('TOTAL_BENS'), on='SQ_CANDIDATO'
+    )
+    publicar_base({
+        "cubo_candidatos": cubo,
+        "redes_por_uf": adicionar_regiao(redes_por_partido_uf),
+        "candidatos": candidatos,
     })
 
-    # Executa o insight 1 diretamente
-    insight_1_economia_influencia_eleicao(dados_candidatos, dados_bens)
-    print("Insight 1 processado com sucesso.")
 
-    # Executa o insight 2 diretamente
-    insight_2_coligacoes_disputas_vitoria(dados_candidatos, dados_coligacoes)
-    print("Insight 2 processado com sucesso.")
+def run_insight(numero, *entradas, **opcoes):
+    INSIGHTS[numero]["funcao"](*entradas, **opcoes)
+    print(f"Insight {numero} processado com sucesso.")
 
-    # Executa o insight 3 diretamente
-    insight_3_maior_partido_uf(dados_candidatos)
-    print("Insight 3 processado com sucesso.")
 
-    # Executa o insight 4 diretamente
-    insight_4_tendencia_regional_partido(dados_candidatos)
-    print("Insight 4 processado com sucesso.")
+def update_proposal_index(dados_candidatos, _insight_8=None):
+    # Usa as contagens que o insight 8 acabou de deixar no cache de extração
+    atualizar_indice(PATH_PROPOSTAS, load_stopwords(), dados_candidatos)
 
-    # Executa o insight 5 diretamente
-    insight_5_partido_dominante_cargo(dados_candidatos)
-    print("Insight 5 processado com sucesso.")
 
-    # Executa o insight 6 diretamente
-    insight_6_candidatos_indigenas_quilombolas(dados_candidatos, dados_info_complementar)
-    print("Insight 6 processado com sucesso.")
+def build_tasks(args, manifesto):
+    opcoes_carga = {
+        "use_cache": not args.sem_cache,
+        "rebuild_cache": args.recriar_cache,
+        "executor": args.executor_carga,
+    }
+    filtros = {"uf": args.uf, "ano": args.ano}
+    # "impressao" (opcional) devolve a impressão do que a etapa lê por conta
+    # própria; o resto vem das dependências (ver manifesto_execucao)
+    tarefas = {
+        nome: {
+            "funcao": partial(load_dataset, nome, **opcoes_carga, **filtros),
+            "dependencias": [],
+            "impressao": partial(dataset_fingerprint, manifesto, nome, **filtros),
+        }
+        for nome in DATA_PATHS
+    }
+    # A tabela de municípios e a correspondência TSE -> IBGE (se existir)
+    # entram na impressão: o mapa é refeito quando qualquer uma muda
+    tarefas["municipios"] = {
+        "funcao": carregar_municipios,
+        "dependencias": [],
+        "impressao": lambda: impressao_arquivos(manifesto, [
+            caminho for caminho in (CAMINHO_MUNICIPIOS, CAMINHO_CORRESPONDENCIA_TSE) if os.path.exists(caminho)
+        ]),
+    }
+    tarefas["dimensao_candidatos"] = {"funcao": montar_dimensao_candidatos, "dependencias": ["candidatos"]}
+
+    # Contagens de base dos insights 3, 4, 5 e 7: por arquivo, com parciais
+    # em cache; em memória ou em streaming quando o cache está desligado
+    for nome, especificacao in AGREGACOES_CONTAGEM.items():
+        if args.streaming or not args.sem_cache:
+            tarefas[f"contagem_{nome}"] = {
+                "funcao": lambda nome=nome: stream_count_aggregates(
+                    [nome], chunksize=args.chunksize, use_cache=not args.sem_cache, **filtros
+                )[nome],
+                "dependencias": [],
+                "impressao": partial(dataset_fingerprint, manifesto, especificacao["dataset"], **filtros),
+            }
+        else:
+            tarefas[f"contagem_{nome}"] = {
+                "funcao": partial(contar, especificacao=especificacao),
+                "dependencias": [especificacao["dataset"]],
+            }
+    tarefas["cubo"] = {"funcao": build_cube, "dependencias": ["contagem_cubo_candidatos"]}
+    for nome in ROLLUPS_CUBO:
+        tarefas[nome] = {"funcao": partial(rollup_nomeado, nome), "dependencias": ["cubo"]}
+    tarefas["redes_por_partido_uf"] = {
+        "funcao": lambda contagem: contagem, "dependencias": ["contagem_redes_por_partido_uf"]
+    }
 
-    # Executa o insight 7 diretamente
-    insight_7_rede_social_preferida(dados_redes_sociais)
-    print("Insight 7 processado com sucesso.")
+    stop_words = load_stopwords()
+    opcoes_insights = {"8": {"stop_words": stop_words, "retry_failures": args.reprocessar_falhas_pdf}}
+    for numero, insight in INSIGHTS.items():
+        tarefas[f"insight_{numero}"] = {
+            "funcao": partial(run_insight, numero, **opcoes_insights.get(numero, {})),
+            "dependencias": insight["entradas"],
+        }
+    tarefas["insight_8"]["impressao"] = lambda: combinar(
+        impressao_arquivos(manifesto, glob(os.path.join(PATH_PROPOSTAS, "*.pdf"))),
+        sorted(stop_words),
+        args.reprocessar_falhas_pdf,
+    )
+    tarefas["indice"] = {"funcao": update_proposal_index, "dependencias": ["candidatos", "insight_8"]}
+    tarefas["bens_por_candidato"] = {
+        "funcao": partial(total_por_candidato, coluna='VR_BEM_CANDIDATO'), "dependencias": ["candidatos_bens"]
+    }
+    tarefas["base"] = {
+        "funcao": publish_analytical_store,
+        "dependencias": ["cubo", "redes_por_partido_uf", "dimensao_candidatos", "bens_por_candidato"],
+    }
+    return tarefas
+
+
+def step_outputs(alvo):
+    if alvo.startswith("insight_"):
+        return INSIGHTS[alvo[len("insight_"):]]["saidas"]
+    return STEP_OUTPUTS[alvo]
+
+
+def plan_incremental_run(tarefas, alvos, manifesto, ignorar_manifesto=False):
+    # Descarta os alvos cujas entradas e artefatos não mudaram desde a última
+    # execução e troca o cálculo do cubo pela leitura do Parquet salvo quando
+    # ele continua válido. Devolve os alvos restantes e as impressões.
+    impressao_base = impressao_codigo(os.path.dirname(os.path.abspath(__file__)))
+    impressoes = calcular_impressoes(tarefas, alvos, impressao_base)
+    if ignorar_manifesto:
+        return alvos, impressoes
+
+    pendentes = []
+    for alvo in alvos:
+        if etapa_em_dia(manifesto, alvo, impressoes[alvo]):
+            print(f"Etapa '{alvo}' sem mudanças nas entradas; mantidas as saídas existentes.")
+            registrar_sem_execucao(alvo)
+            # Outras etapas podem depender desta só pela ordem (ex.: índice
+            # após o insight 8); em dia, ela não precisa rodar de novo
+            tarefas[alvo] = {"funcao": lambda: None, "dependencias": [], "pulada": True}
+        else:
+            pendentes.append(alvo)
+
+    if "cubo" in impressoes and etapa_em_dia(manifesto, "cubo", impressoes["cubo"]):
+        tarefas["cubo"] = {"funcao": carregar_cubo, "dependencias": [], "reaproveitado": True}
+    return pendentes, impressoes
+
+
+def available_years(pasta=DATA_PATHS["candidatos"]):
+    return sorted({particao["ano"] for particao in listar_particoes(pasta) if particao["ano"] is not None})
+
+
+def year_summary_tasks(args, manifesto, ano):
+    # O grafo normal filtrado por um ano, mais uma tarefa por resumo anual
+    tarefas = build_tasks(argparse.Namespace(**{**vars(args), "ano": [ano]}), manifesto)
+    # O cubo de um ano não substitui o cubo salvo pela execução normal
+    tarefas["cubo"] = {"funcao": montar_cubo, "dependencias": tarefas["cubo"]["dependencias"]}
+    for nome, especificacao in RESUMOS_ANUAIS.items():
+        tarefas[f"resumo_{nome}"] = {"funcao": partial(resumir, nome), "dependencias": especificacao["entradas"]}
+    return tarefas
+
+
+def run_comparison(args):
+    # Um ano por vez: os resumos de cada ano são calculados (ou reaproveitados,
+    # se as entradas do ano não mudaram), gravados e só eles seguem adiante;
+    # os dados brutos do ano são liberados antes de o próximo ser lido
+    anos = available_years() if args.comparar_anos == "todos" else args.comparar_anos
+    nomes = [nome for nome, especificacao in RESUMOS_ANUAIS.items() if especificacao["insight"] in args.insights]
+    if len(anos) < 2 or not nomes:
+        com_resumo = sorted({especificacao["insight"] for especificacao in RESUMOS_ANUAIS.values()})
+        print(f"Modo comparativo precisa de ao menos dois anos e um insight com resumo anual "
+              f"(anos: {anos}; insights com resumo: {', '.join(com_resumo)})")
+        return {}
+    for nome_dataset, pasta in DATA_PATHS.items():
+        sem_ano = [particao["caminho"] for particao in listar_particoes(pasta) if particao["ano"] is None]
+        if sem_ano:
+            avisar(f"Aviso: {len(sem_ano)} arquivo(s) de {nome_dataset} sem ano no nome ou na pasta entram em "
+                   f"todos os anos (ex.: '{sem_ano[0]}')")
+
+    print(f"Modo comparativo: anos {', '.join(map(str, anos))}; resumos {', '.join(nomes)}")
+    manifesto = carregar_manifesto()
+    impressao_base = impressao_codigo(os.path.dirname(os.path.abspath(__file__)))
+    resumos, falhas = {}, {}
+    for ano in anos:
+        tarefas = year_summary_tasks(args, manifesto, ano)
+        impressoes_tarefas = calcular_impressoes(tarefas, [f"resumo_{nome}" for nome in nomes], impressao_base)
+        impressoes = {nome: impressoes_tarefas[f"resumo_{nome}"] for nome in nomes}
+        resumos[ano] = {} if args.ignorar_manifesto else carregar_resumos_ano(ano, impressoes)
+        pendentes = [nome for nome in nomes if nome not in resumos[ano]]
+        for nome in resumos[ano]:
+            registrar_sem_execucao(f"{ano}_resumo_{nome}", status="reaproveitada")
+        print(f"Ano {ano}: {len(nomes) - len(pendentes)} resumo(s) reaproveitado(s), {len(pendentes)} a calcular")
+        if pendentes:
+            instrumentar_tarefas(tarefas, perfil_etapa=args.perfil, perfil_modo=args.perfil_modo, prefixo=f"{ano}_")
+            resultados, falhas_ano = executar(
+                tarefas, [f"resumo_{nome}" for nome in pendentes], max_workers=args.paralelismo
+            )
+            novos = {nome: resultados[f"resumo_{nome}"] for nome in pendentes if f"resumo_{nome}" in resultados}
+            del resultados
+            gravar_resumos_ano(ano, novos, impressoes)
+            resumos[ano].update(novos)
+            falhas.update({f"{ano}_{etapa}": motivo for etapa, motivo in falhas_ano.items()})
+            report_memory(f"após o ano {ano}")
+    gravar_manifesto(manifesto)
+
+    for nome in nomes:
+        por_ano = {ano: resumos[ano][nome] for ano in anos if nome in resumos[ano]}
+        if len(por_ano) < 2:
+            print(f"Comparação '{nome}' não gerada: resumo disponível em {len(por_ano)} ano(s)")
+            continue
+        caminho = gravar_comparacao(nome, comparar(nome, por_ano))
+        print(f"Comparação '{nome}' ({', '.join(map(str, por_ano))}) salva em '{caminho}'")
+    return falhas
+
+
+def parse_insights(valor):
+    if valor == "todos":
+        return list(INSIGHTS) + EXTRA_STEPS
+    selecionados = [item.strip() for item in valor.split(",") if item.strip()]
+    desconhecidos = [item for item in selecionados if item not in INSIGHTS and item not in EXTRA_STEPS]
+    if desconhecidos:
+        raise argparse.ArgumentTypeError(f"insights desconhecidos: {', '.join(desconhecidos)}")
+    return selecionados
+
+
+def parse_list(tipo):
+    def parse(valor):
+        return [tipo(item.strip()) for item in valor.split(",") if item.strip()]
+    return parse
+
+
+def parse_years(valor):
+    return "todos" if valor == "todos" else parse_list(int)(valor)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Análise das eleições municipais 2024")
+    parser.add_argument("--insights", type=parse_insights, default="todos",
+                        help="Lista separada por vírgulas (ex.: 1,3,5, 8,indice ou base); padrão: todos")
+    parser.add_argument("--paralelismo", type=int, default=None,
+                        help="Máximo de etapas executadas ao mesmo tempo (padrão: automático)")
+    parser.add_argument("--sem-cache", action="store_true", help="Lê os CSVs diretamente, sem o cache colunar")
+    parser.add_argument("--recriar-cache", action="store_true", help="Reconstrói o cache colunar de todos os arquivos lidos")
+    parser.add_argument("--limpar-cache", action="store_true", help="Remove o cache colunar antes de executar")
+    parser.add_argument("--reprocessar-falhas-pdf", action="store_true",
+                        help="Tenta de novo os PDFs de propostas cuja extração falhou em execuções anteriores")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Com --sem-cache, calcula as contagens dos insights 3, 4, 5 e 7 lendo os arquivos em chunks "
+                             "(com o cache ativo isso já é o padrão)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="Linhas por chunk no modo streaming")
+    parser.add_argument("--executor-carga", default="auto", choices=["auto", "serial", "thread", "process", "pickle"],
+                        help="Estratégia de paralelismo na carga dos CSVs")
+    parser.add_argument("--processos-graficos", type=int, default=None,
+                        help="Processos do pool de renderização de gráficos (padrão: até 4; 0 desenha sem pool)")
+    parser.add_argument("--recriar-graficos", action="store_true",
+                        help="Redesenha todos os gráficos, mesmo os com dados inalterados")
+    parser.add_argument("--uf", type=parse_list(str.upper), default=None,
+                        help="Lê só as partições destas UFs (ex.: SC ou SC,PR)")
+    parser.add_argument("--ano", type=parse_list(int), default=None,
+                        help="Lê só as partições destes anos (ex.: 2024)")
+    parser.add_argument("--comparar-anos", type=parse_years, default=None, metavar="ANOS",
+                        help="Modo comparativo: resumos por ano e variações entre os anos (ex.: 2016,2020,2024 "
+                             "ou todos), em output/comparativo/")
+    parser.add_argument("--ignorar-manifesto", action="store_true",
+                        help="Executa todas as etapas selecionadas, mesmo as que não mudaram desde a última execução")
+    parser.add_argument("--perfil", metavar="ETAPA",
+                        help="Gera o perfil de uma etapa (ex.: insight_8, candidatos, cubo) em output/perfil_<etapa>.*")
+    parser.add_argument("--perfil-modo", default="cprofile", choices=MODOS_PERFIL,
+                        help="cprofile (determinístico) ou amostragem (pilhas colapsadas, menor overhead)")
+    args = parser.parse_args()
+    if isinstance(args.insights, str):
+        args.insights = parse_insights(args.insights)
+    return args
 
-    # Executa o insight 8 diretamente
-    insight_8_termos_propostas_governo(dados_candidatos)
-    print("Insight 8 processado com sucesso.")
 
-    # Executa o insight 9 diretamente
-    insight_9_mapa_resultados_eleicao(dados_candidatos, municipios_coordenadas)
-    print("Insight 9 processado com sucesso.")
+def main():
+    args = parse_args()
+    ensure_output_directory()
+    if args.limpar_cache:
+        limpar_cache()
+    configurar_renderizacao(processos=args.processos_graficos, recriar=args.recriar_graficos)
+
+    iniciar_relatorio(vars(args))
+    report_memory("antes da carga")
+    if args.comparar_anos:
+        falhas = run_comparison(args)
+        report_memory("ao final")
+        gravar_relatorio(falhas)
+        return
+
+    manifesto = carregar_manifesto()
+    tarefas = build_tasks(args, manifesto)
+    alvos = [f"insight_{item}" if item in INSIGHTS else item for item in args.insights]
+    alvos, impressoes = plan_incremental_run(tarefas, alvos, manifesto, args.ignorar_manifesto)
+    if args.perfil and args.perfil not in tarefas:
+        print(f"Aviso: etapa '{args.perfil}' desconhecida para --perfil; opções: {', '.join(sorted(tarefas))}")
+    instrumentar_tarefas(tarefas, perfil_etapa=args.perfil, perfil_modo=args.perfil_modo)
+    resultados, falhas = executar(tarefas, alvos, max_workers=args.paralelismo)
+    graficos_com_erro = instrumentar("graficos", aguardar_graficos)()
+
+    executadas = [alvo for alvo in alvos if alvo in resultados]
+    if "cubo" in resultados and not tarefas["cubo"].get("reaproveitado"):
+        executadas.append("cubo")
+    # Um gráfico com erro deixa o PNG anterior no lugar: a etapa dona dele
+    # sai do manifesto e roda de novo na próxima execução
+    arquivos_com_erro = {GRAFICOS[nome]["arquivo"]: nome for nome in graficos_com_erro}
+    for etapa in executadas:
+        com_erro = [arquivos_com_erro[saida] for saida in step_outputs(etapa) if saida in arquivos_com_erro]
+        if com_erro:
+            falhas[etapa] = f"gráfico com erro: {', '.join(com_erro)}"
+            continue
+        registrar_etapa(manifesto, etapa, impressoes[etapa], step_outputs(etapa))
+    for etapa in falhas:
+        manifesto["etapas"].pop(etapa, None)
+    gravar_manifesto(manifesto)
+
+    report_memory("ao final", {
+        nome: resultados[nome] for nome in DATA_PATHS if nome in resultados
+    })
+    gravar_relatorio(falhas)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
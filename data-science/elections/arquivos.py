@@ -0,0 +1,29 @@
+import os
+import json
+
+
+# Gravação atômica: o conteúdo vai para um temporário com o PID no nome (dois
+# processos podem gravar o mesmo destino) e só então substitui o destino com
+# os.replace, de modo que leitores nunca veem um arquivo pela metade. Em caso
+# de erro o temporário é removido e o destino anterior fica intacto.
+def gravar_atomico(caminho, escrever):
+    # escrever(destino) grava o conteúdo no caminho temporário recebido
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def gravar_json(caminho, dados, **opcoes):
+    # opcoes: repassadas a json.dump (sort_keys, ensure_ascii, default...)
+    def escrever(destino):
+        with open(destino, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, indent=2, **opcoes)
+
+    gravar_atomico(caminho, escrever)
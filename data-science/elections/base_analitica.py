@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import pandas as pd
+
+from arquivos import gravar_atomico
+
+# Base analítica local (SQLite) com os agregados publicados pelo pipeline.
+# O dashboard filtra por UF, região, partido, cargo e situação consultando
+# estas tabelas, sem reler os CSVs do TSE. A base é reescrita por inteiro a
+# cada publicação, em um arquivo temporário trocado atomicamente no fim, então
+# quem está lendo nunca vê uma base pela metade.
+CAMINHO_BASE = os.path.join("output", "eleicoes.sqlite")
+
+# Tabelas publicadas: coluna do DataFrame -> (coluna SQL, tipo), colunas
+# indexadas e medidas que as consultas podem pedir
+TABELAS_BASE = {
+    "cubo_candidatos": {
+        "colunas": {
+            "SG_UF": ("sg_uf", "TEXT"),
+            "REGIAO": ("regiao", "TEXT"),
+            "SG_PARTIDO": ("sg_partido", "TEXT"),
+            "DS_CARGO": ("ds_cargo", "TEXT"),
+            "DS_SIT_TOT_TURNO": ("ds_sit_tot_turno", "TEXT"),
+            "NUM_CANDIDATOS": ("num_candidatos", "INTEGER"),
+        },
+        "indices": ["sg_uf", "regiao", "sg_partido", "ds_cargo"],
+        "medidas": {"num_candidatos": "SUM(num_candidatos)"},
+    },
+    "redes_por_uf": {
+        "colunas": {
+            "SG_UF": ("sg_uf", "TEXT"),
+            "REGIAO": ("regiao", "TEXT"),
+            "TIPO_REDE": ("tipo_rede", "TEXT"),
+            "NUM_CANDIDATOS": ("num_candidatos", "INTEGER"),
+        },
+        "indices": ["sg_uf", "regiao"],
+        "medidas": {"num_candidatos": "SUM(num_candidatos)"},
+    },
+    "candidatos": {
+        "colunas": {
+            "SQ_CANDIDATO": ("sq_candidato", "INTEGER PRIMARY KEY"),
+            "SG_UF": ("sg_uf", "TEXT"),
+            "REGIAO": ("regiao", "TEXT"),
+            "NM_UE": ("nm_ue", "TEXT"),
+            "SG_PARTIDO": ("sg_partido", "TEXT"),
+            "DS_CARGO": ("ds_cargo", "TEXT"),
+            "DS_SIT_TOT_TURNO": ("ds_sit_tot_turno", "TEXT"),
+            "NM_CANDIDATO": ("nm_candidato", "TEXT"),
+            "TOTAL_BENS": ("total_bens", "REAL"),
+        },
+        "indices": ["sg_uf", "regiao", "sg_partido", "ds_cargo"],
+        "medidas": {
+            "num_candidatos": "COUNT(*)",
+            "num_com_bens": "COUNT(total_bens)",
+            "media_bens": "AVG(total_bens)",
+            "total_bens": "SUM(total_bens)",
+        },
+    },
+}
+
+
+def _linhas(df, colunas):
+    # Categorias e NaN viram objetos Python / NULL para o sqlite3
+    df = df[colunas].astype(object)
+    return df.where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def _criar_tabela(conexao, nome, especificacao):
+    definicoes = ", ".join(f"{coluna} {tipo}" for coluna, tipo in especificacao["colunas"].values())
+    conexao.execute(f"CREATE TABLE {nome} ({definicoes})")
+    for coluna in especificacao["indices"]:
+        conexao.execute(f"CREATE INDEX idx_{nome}_{coluna} ON {nome} ({coluna})")
+
+
+def publicar_base(tabelas, caminho=CAMINHO_BASE):
+    # tabelas: nome -> DataFrame com as colunas declaradas em TABELAS_BASE
+    def escrever(destino):
+        conexao = sqlite3.connect(destino)
+        try:
+            with conexao:
+                for nome, df in tabelas.items():
+                    especificacao = TABELAS_BASE[nome]
+                    _criar_tabela(conexao, nome, especificacao)
+                    colunas = list(especificacao["colunas"])
+                    marcadores = ",".join("?" * len(colunas))
+                    conexao.executemany(f"INSERT INTO {nome} VALUES ({marcadores})", _linhas(df, colunas))
+            conexao.execute("ANALYZE")
+        finally:
+            conexao.close()
+
+    gravar_atomico(caminho, escrever)
+    print(f"Base analítica publicada em '{caminho}': "
+          + ", ".join(f"{nome} ({len(df)} linhas)" for nome, df in tabelas.items()))
+
+
+def abrir_base(caminho=CAMINHO_BASE):
+    # Somente leitura: o dashboard nunca altera a base
+    return sqlite3.connect(f"file:{os.path.abspath(caminho)}?mode=ro", uri=True, check_same_thread=False)
+
+
+def _validar_colunas(tabela, colunas):
+    validas = {coluna for coluna, _ in TABELAS_BASE[tabela]["colunas"].values()}
+    desconhecidas = [coluna for coluna in colunas if coluna not in validas]
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas em '{tabela}': {', '.join(desconhecidas)}")
+
+
+def filtros_aplicaveis(tabela, filtros):
+    # Descarta os filtros vazios e os de colunas que a tabela não tem
+    validas = {coluna for coluna, _ in TABELAS_BASE[tabela]["colunas"].values()}
+    return {coluna: list(valores) for coluna, valores in filtros.items() if valores and coluna in validas}
+
+
+def valores_distintos(conexao, tabela, coluna):
+    _validar_colunas(tabela, [coluna])
+    linhas = conexao.execute(
+        f"SELECT DISTINCT {coluna} FROM {tabela} WHERE {coluna} IS NOT NULL ORDER BY {coluna}"
+    ).fetchall()
+    return [valor for valor, in linhas]
+
+
+def agregar(conexao, tabela, grupos, medidas, filtros=None):
+    # SELECT grupos, medidas FROM tabela WHERE coluna IN (...) GROUP BY grupos
+    especificacao = TABELAS_BASE[tabela]
+    filtros = filtros_aplicaveis(tabela, filtros or {})
+    _validar_colunas(tabela, list(grupos))
+    expressoes = [f"{especificacao['medidas'][medida]} AS {medida}" for medida in medidas]
+
+    condicoes, parametros = [], []
+    for coluna, valores in filtros.items():
+        condicoes.append(f"{coluna} IN ({','.join('?' * len(valores))})")
+        parametros.extend(valores)
+    where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    group_by = f" GROUP BY {', '.join(grupos)} ORDER BY {', '.join(grupos)}" if grupos else ""
+    return pd.read_sql_query(
+        f"SELECT {', '.join(list(grupos) + expressoes)} FROM {tabela}{where}{group_by}",
+        conexao, params=parametros
+    )
@@ -0,0 +1,66 @@
+# Compara as estratégias de carga de load_data_from_folder.
+# Cada estratégia roda em um subprocesso próprio para que o pico de memória
+# de uma não contamine a medição da outra.
+#
+# Uso (a partir de data-science/elections):
+#   python benchmarks/bench_carregamento.py --dataset candidatos
+#   python benchmarks/bench_carregamento.py --dataset candidatos --sem-cache --repeticoes 3
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXECUTORES = ["pickle", "process", "thread", "serial"]
+
+
+def medir(pasta, dataset, executor, use_cache):
+    import resource
+    from analise_eleitoral import load_data_from_folder
+    from schemas import SCHEMAS
+
+    inicio = time.perf_counter()
+    df = load_data_from_folder(pasta, schema=SCHEMAS.get(dataset), use_cache=use_cache, executor=executor)
+    duracao = time.perf_counter() - inicio
+    return {
+        "executor": executor,
+        "segundos": round(duracao, 3),
+        "linhas": len(df),
+        "pico_pai_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "pico_filhos_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da carga de uma pasta de CSVs do TSE")
+    parser.add_argument("--dataset", default="candidatos")
+    parser.add_argument("--pasta", help="Padrão: ./data/<dataset>/")
+    parser.add_argument("--sem-cache", action="store_true")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--executores", default=",".join(EXECUTORES))
+    parser.add_argument("--_medir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    pasta = args.pasta or os.path.join("data", args.dataset)
+
+    if args._medir:
+        print(json.dumps(medir(pasta, args.dataset, args._medir, not args.sem_cache)))
+        return
+
+    print(f"{'executor':<10}{'segundos':>10}{'linhas':>10}{'pico pai':>12}{'pico filhos':>14}")
+    for executor in args.executores.split(","):
+        for _ in range(args.repeticoes):
+            comando = [sys.executable, __file__, "--dataset", args.dataset, "--pasta", pasta, "--_medir", executor]
+            if args.sem_cache:
+                comando.append("--sem-cache")
+            saida = subprocess.run(comando, capture_output=True, text=True, check=True).stdout
+            r = json.loads(saida.strip().splitlines()[-1])
+            print(f"{r['executor']:<10}{r['segundos']:>10}{r['linhas']:>10}"
+                  f"{r['pico_pai_mb']:>10} MB{r['pico_filhos_mb']:>11} MB")
+
+
+if __name__ == "__main__":
+    main()
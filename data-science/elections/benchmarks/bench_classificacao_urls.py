@@ -0,0 +1,106 @@
+# Compara a classificação de URLs de redes sociais por regex linha a linha
+# (a implementação anterior do insight 7) com a classificação por host sobre
+# as URLs distintas (redes_sociais.classificar_urls).
+#
+# Uso (a partir de data-science/elections):
+#   python benchmarks/bench_classificacao_urls.py
+#   python benchmarks/bench_classificacao_urls.py --linhas 5000000 --distintas 200000
+#   python benchmarks/bench_classificacao_urls.py --pasta data/candidatos_redes_sociais
+
+import os
+import sys
+import time
+import random
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redes_sociais import classificar_urls
+
+PADRAO_REGEX = r'(facebook|instagram|twitter|youtube|linkedin)'
+
+# URLs como os candidatos costumam digitá-las no TSE, com o rótulo esperado:
+# a regex antiga acerta todas, e a classificação por host não pode divergir
+CASOS_IRREGULARES = {
+    "www.facebook.com.br/{}": "facebook",
+    "https://instagram.com.br/{}": "instagram",
+    "https:/www.instagram.com/{}": "instagram",
+    "https//www.facebook.com/{}": "facebook",
+    "facebook/{}": "facebook",
+}
+
+MODELOS_URL = list(CASOS_IRREGULARES) + [
+    "https://www.instagram.com/{}", "https://instagram.com/{}/", "https://instagr.am/{}",
+    "https://www.facebook.com/{}", "https://m.facebook.com/{}", "http://fb.com/{}",
+    "https://twitter.com/{}", "https://x.com/{}", "https://www.youtube.com/@{}",
+    "https://www.tiktok.com/@{}", "https://wa.me/55489{:0>8}", "https://www.linkedin.com/in/{}",
+    "https://{}.com.br", "https://linktr.ee/{}",
+]
+
+
+def classificar_regex(urls):
+    return urls.str.extract(PADRAO_REGEX, expand=False).fillna('outros')
+
+
+def urls_sinteticas(linhas, distintas, semente=42):
+    aleatorio = random.Random(semente)
+    unicas = [aleatorio.choice(MODELOS_URL).format(f"candidato{i}") for i in range(distintas)]
+    # Poucos hosts e muitas repetições, como nos arquivos do TSE
+    return pd.Series(aleatorio.choices(unicas, k=linhas))
+
+
+def urls_da_pasta(pasta):
+    from glob import glob
+    arquivos = glob(os.path.join(pasta, "*.csv"))
+    return pd.concat(
+        [pd.read_csv(arquivo, sep=';', encoding='latin1', usecols=['DS_URL'], dtype=str)['DS_URL']
+         for arquivo in arquivos],
+        ignore_index=True,
+    )
+
+
+def medir(funcao, urls, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(urls)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), pd.Series(resultado, index=urls.index).astype(str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da classificação de URLs de redes sociais")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--distintas", type=int, default=50_000)
+    parser.add_argument("--pasta", help="Usa as URLs reais dos CSVs desta pasta em vez de dados sintéticos")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    urls = urls_da_pasta(args.pasta) if args.pasta else urls_sinteticas(args.linhas, args.distintas)
+    print(f"{len(urls)} URLs, {urls.nunique()} distintas")
+
+    tempo_regex, rotulos_regex = medir(classificar_regex, urls, args.repeticoes)
+    tempo_hosts, rotulos_hosts = medir(classificar_urls, urls, args.repeticoes)
+    print(f"{'método':<10}{'segundos':>10}")
+    print(f"{'regex':<10}{tempo_regex:>10.3f}")
+    print(f"{'hosts':<10}{tempo_hosts:>10.3f}")
+    print(f"Aceleração: {tempo_regex / tempo_hosts:.1f}x")
+
+    divergencias = pd.crosstab(rotulos_regex[rotulos_regex != rotulos_hosts],
+                               rotulos_hosts[rotulos_regex != rotulos_hosts])
+    if not divergencias.empty:
+        print("\nRótulos diferentes (linhas: regex, colunas: hosts):")
+        print(divergencias.to_string())
+
+    irregulares = pd.Series([modelo.format("candidato") for modelo in CASOS_IRREGULARES])
+    obtidos = pd.Series(classificar_urls(irregulares)).astype(str)
+    erros = [(url, esperado, obtido) for url, esperado, obtido
+             in zip(irregulares, CASOS_IRREGULARES.values(), obtidos) if esperado != obtido]
+    print(f"\nURLs irregulares: {len(irregulares) - len(erros)} de {len(irregulares)} classificadas como esperado")
+    for url, esperado, obtido in erros:
+        print(f"  {url}: esperado {esperado}, obtido {obtido}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# Mede cada etapa do pipeline (cargas com load_data_from_folder, contagens,
+# cubo, cada insight, gráficos e o mapa) sobre uma pasta de trabalho com os
+# dados sintéticos de gerar_dados_sinteticos.py. As etapas rodam em série
+# (um worker no agendador, gráficos desenhados na própria thread), então o
+# tempo e a memória de cada uma não se misturam com os das outras. Cada
+# repetição roda em um subprocesso novo; uma repetição extra, com
+# tracemalloc, mede o pico de memória alocada por etapa.
+#
+# O resultado é gravado em JSON com o commit, as versões e a impressão dos
+# dados de entrada, e pode ser comparado com o de outro commit:
+#
+# Uso (a partir de data-science/elections):
+#   python benchmarks/gerar_dados_sinteticos.py --ufs SC
+#   python benchmarks/bench_pipeline.py
+#   python benchmarks/bench_pipeline.py --repeticoes 5 --comparar benchmarks/resultados/<anterior>.json
+#   python benchmarks/bench_pipeline.py --etapas candidatos,insight_9 --frio -- --sem-cache
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import statistics
+import subprocess
+
+DIR_ELECTIONS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIR_ELECTIONS)
+
+from gerar_dados_sinteticos import DESTINO_PADRAO
+
+DIR_RESULTADOS = os.path.join("benchmarks", "resultados")
+
+
+def medir_etapas(etapas, opcoes_pipeline, memoria):
+    # Executado no subprocesso, com a pasta de trabalho como diretório atual
+    import resource
+    import tracemalloc
+    import pandas as pd
+
+    sys.argv = ["analise_eleitoral.py"] + opcoes_pipeline
+    import analise_eleitoral as pipeline
+    from agendador import executar
+    from graficos import configurar_renderizacao
+
+    args = pipeline.parse_args()
+    pipeline.ensure_output_directory()
+    configurar_renderizacao(processos=0, recriar=True)
+    tarefas = pipeline.build_tasks(args, pipeline.carregar_manifesto())
+    medicoes = {}
+
+    def medido(nome, funcao):
+        def executar_medindo(*entradas):
+            if memoria:
+                tracemalloc.reset_peak()
+                alocado_inicio = tracemalloc.get_traced_memory()[0]
+            inicio, inicio_cpu = time.perf_counter(), time.process_time()
+            resultado = funcao(*entradas)
+            medicao = {
+                "segundos": time.perf_counter() - inicio,
+                "cpu_segundos": time.process_time() - inicio_cpu,
+                "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            }
+            if memoria:
+                # Pico acima do que já estava alocado quando a etapa começou
+                medicao["pico_alocado_mb"] = (tracemalloc.get_traced_memory()[1] - alocado_inicio) / (1024 * 1024)
+            if isinstance(resultado, (pd.DataFrame, pd.Series)):
+                medicao["linhas"] = len(resultado)
+            medicoes[nome] = medicao
+            return resultado
+        return executar_medindo
+
+    for nome, tarefa in tarefas.items():
+        tarefa["funcao"] = medido(nome, tarefa["funcao"])
+    if memoria:
+        tracemalloc.start()
+    _, falhas = executar(tarefas, etapas, max_workers=1)
+    for nome in falhas:
+        medicoes.setdefault(nome, {})["erro"] = falhas[nome]
+    return medicoes
+
+
+def impressao_dados(pasta_dados):
+    # Nomes e tamanhos dos arquivos de entrada: resultados só são comparáveis
+    # quando foram medidos sobre os mesmos dados
+    digest = hashlib.sha256()
+    arquivos, total = 0, 0
+    for raiz, subpastas, nomes in os.walk(pasta_dados):
+        subpastas[:] = sorted(subpasta for subpasta in subpastas if not subpasta.startswith("."))
+        for nome in sorted(nomes):
+            caminho = os.path.join(raiz, nome)
+            tamanho = os.path.getsize(caminho)
+            digest.update(f"{os.path.relpath(caminho, pasta_dados)}:{tamanho}\n".encode("utf-8"))
+            arquivos += 1
+            total += tamanho
+    return {"arquivos": arquivos, "mb": round(total / (1024 * 1024), 1), "impressao": digest.hexdigest()[:16]}
+
+
+def commit_atual():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=DIR_ELECTIONS, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        alterado = subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=DIR_ELECTIONS,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-alterado" if alterado else "")
+
+
+def rodar_repeticao(trabalho, etapas, opcoes_pipeline, memoria, frio):
+    if frio:
+        shutil.rmtree(os.path.join(trabalho, "data", ".cache"), ignore_errors=True)
+        shutil.rmtree(os.path.join(trabalho, "output"), ignore_errors=True)
+    comando = [sys.executable, os.path.abspath(__file__), "--_medir", ",".join(etapas)]
+    if memoria:
+        comando.append("--_memoria")
+    comando += ["--"] + opcoes_pipeline
+    saida = subprocess.run(comando, cwd=trabalho, capture_output=True, text=True)
+    if saida.returncode != 0:
+        raise RuntimeError(f"Falha na repetição:\n{saida.stderr[-2000:]}")
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def resumir(repeticoes, medicao_memoria):
+    etapas = {}
+    # Ordem de execução (o agendador com um worker é determinístico)
+    for nome in dict.fromkeys(nome for repeticao in repeticoes for nome in repeticao):
+        medicoes = [repeticao[nome] for repeticao in repeticoes if "segundos" in repeticao.get(nome, {})]
+        resumo = {"erro": repeticoes[0][nome]["erro"]} if not medicoes else {
+            "segundos": round(min(m["segundos"] for m in medicoes), 4),
+            "segundos_mediana": round(statistics.median(m["segundos"] for m in medicoes), 4),
+            "cpu_segundos": round(min(m["cpu_segundos"] for m in medicoes), 4),
+            "rss_mb": round(max(m["rss_mb"] for m in medicoes), 1),
+        }
+        if medicoes and "linhas" in medicoes[0]:
+            resumo["linhas"] = medicoes[0]["linhas"]
+        if medicao_memoria and "pico_alocado_mb" in medicao_memoria.get(nome, {}):
+            resumo["pico_alocado_mb"] = round(medicao_memoria[nome]["pico_alocado_mb"], 1)
+        etapas[nome] = resumo
+    return etapas
+
+
+def imprimir(etapas, anterior=None):
+    print(f"{'etapa':<34}{'segundos':>10}{'mediana':>10}{'alocado MB':>12}{'RSS MB':>10}{'linhas':>10}"
+          + (f"{'anterior':>10}{'variação':>10}" if anterior else ""))
+    for nome, r in etapas.items():
+        if "erro" in r:
+            print(f"{nome:<34}  erro: {r['erro']}")
+            continue
+        linha = (f"{nome:<34}{r['segundos']:>10.3f}{r['segundos_mediana']:>10.3f}"
+                 f"{r.get('pico_alocado_mb', ''):>12}{r['rss_mb']:>10}{r.get('linhas', ''):>10}")
+        antes = (anterior or {}).get(nome, {}).get("segundos")
+        if antes:
+            linha += f"{antes:>10.3f}{(r['segundos'] - antes) / antes:>+10.0%}"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark das etapas do pipeline sobre dados sintéticos",
+        epilog="Argumentos depois de '--' são repassados ao pipeline (ex.: -- --sem-cache --uf SC)",
+    )
+    parser.add_argument("--trabalho", default=DESTINO_PADRAO,
+                        help="Pasta com data/ (gerada por gerar_dados_sinteticos.py); output/ é criado nela")
+    parser.add_argument("--etapas", help="Alvos separados por vírgulas (padrão: todos os insights e a base)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--frio", action="store_true",
+                        help="Apaga o cache e as saídas antes de cada repetição (sem aquecimento)")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não roda a repetição com tracemalloc")
+    parser.add_argument("--saida",
+                        help="Arquivo JSON do resultado (padrão: benchmarks/resultados/<commit>-<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar os tempos")
+    parser.add_argument("--_medir", help=argparse.SUPPRESS)
+    parser.add_argument("--_memoria", action="store_true", help=argparse.SUPPRESS)
+    args, opcoes_pipeline = parser.parse_known_args()
+    opcoes_pipeline = [opcao for opcao in opcoes_pipeline if opcao != "--"]
+
+    if args._medir:
+        print(json.dumps(medir_etapas(args._medir.split(","), opcoes_pipeline, args._memoria)))
+        return
+
+    trabalho = os.path.abspath(args.trabalho)
+    if not os.path.isdir(os.path.join(trabalho, "data")):
+        parser.error(f"'{trabalho}/data' não existe; gere os dados com benchmarks/gerar_dados_sinteticos.py")
+    etapas = args.etapas.split(",") if args.etapas else [f"insight_{numero}" for numero in range(1, 10)] + ["base"]
+
+    if not args.frio:
+        # Aquecimento: monta o cache colunar, os parciais e o cache de PDFs
+        print("Aquecimento...")
+        rodar_repeticao(trabalho, etapas, opcoes_pipeline, memoria=False, frio=False)
+    repeticoes = []
+    for numero in range(args.repeticoes):
+        print(f"Repetição {numero + 1} de {args.repeticoes}...")
+        repeticoes.append(rodar_repeticao(trabalho, etapas, opcoes_pipeline, memoria=False, frio=args.frio))
+    medicao_memoria = None
+    if not args.sem_memoria:
+        print("Repetição com tracemalloc...")
+        medicao_memoria = rodar_repeticao(trabalho, etapas, opcoes_pipeline, memoria=True, frio=args.frio)
+
+    import pandas as pd
+    resultado = {
+        "commit": commit_atual(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "maquina": {"sistema": platform.platform(), "cpus": os.cpu_count()},
+        "dados": impressao_dados(os.path.join(trabalho, "data")),
+        "opcoes": {"etapas": etapas, "repeticoes": args.repeticoes, "frio": args.frio, "pipeline": opcoes_pipeline},
+        "etapas": resumir(repeticoes, medicao_memoria),
+    }
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            referencia = json.load(arquivo)
+        if referencia.get("dados", {}).get("impressao") != resultado["dados"]["impressao"]:
+            print(f"Aviso: '{args.comparar}' foi medido sobre outros dados de entrada")
+        print(f"Comparando com {referencia.get('commit')} ({referencia.get('data')})")
+        anterior = {nome: r for nome, r in referencia["etapas"].items()}
+    imprimir(resultado["etapas"], anterior)
+
+    saida = args.saida or os.path.join(
+        DIR_RESULTADOS, f"{(resultado['commit'] or 'sem-commit')[:12]}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultado gravado em '{saida}'")
+
+
+if __name__ == "__main__":
+    main()
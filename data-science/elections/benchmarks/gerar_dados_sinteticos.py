@@ -0,0 +1,377 @@
+# Gera arquivos sintéticos com o mesmo layout dos dados abertos do TSE
+# (CSV separado por ";", latin1, todos os campos entre aspas, um arquivo por
+# UF e ano) para medir o pipeline sem os downloads reais. Os municípios são os
+# reais (dados_referencia/municipios.csv), com o número de candidatos, vagas,
+# coligações, bens, redes sociais e propostas em PDF sorteado em proporções
+# próximas às de uma eleição municipal. Cada UF/ano tem sua própria semente:
+# gerar SC sozinho ou junto com as demais UFs produz os mesmos arquivos de SC.
+#
+# DS_CARGO e DS_SIT_TOT_TURNO saem em maiúsculas, como nos arquivos do TSE
+# ("PREFEITO", "ELEITO POR QP"): os insights precisam tratar a grafia real.
+#
+# Uso (a partir de data-science/elections):
+#   python benchmarks/gerar_dados_sinteticos.py --ufs SC
+#   python benchmarks/gerar_dados_sinteticos.py --ufs todas --escala 0.25
+#   python benchmarks/gerar_dados_sinteticos.py --ufs SC,PR --anos 2016,2020,2024 --pdfs 500
+
+import os
+import sys
+import csv
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agregacoes import UFS_PARA_REGIOES
+from municipios import carregar_municipios
+
+DESTINO_PADRAO = os.path.join("benchmarks", "dados_sinteticos")
+
+# Ordem fixa: a posição da UF entra na semente e nos sequenciais
+UFS = sorted(UFS_PARA_REGIOES)
+
+# Nome do arquivo de cada dataset (pastas iguais às de DATA_PATHS)
+ARQUIVOS = {
+    "candidatos": "consulta_cand_{ano}_{uf}.csv",
+    "candidatos_bens": "bem_candidato_{ano}_{uf}.csv",
+    "candidatos_info_complementar": "consulta_cand_complementar_{ano}_{uf}.csv",
+    "candidatos_redes_sociais": "rede_social_candidato_{ano}_{uf}.csv",
+    "coligacoes": "consulta_coligacao_{ano}_{uf}.csv",
+    "motivo_cassacao": "motivo_cassacao_{ano}_{uf}.csv",
+    "vagas": "consulta_vagas_{ano}_{uf}.csv",
+}
+
+# Partidos e peso relativo no número de candidaturas
+PARTIDOS = {
+    "MDB": 11, "PL": 10, "PSD": 10, "PP": 9, "UNIÃO": 8, "REPUBLICANOS": 8, "PT": 7, "PSB": 6, "PDT": 5,
+    "PSDB": 5, "PODE": 5, "AVANTE": 3, "SOLIDARIEDADE": 3, "PRD": 3, "CIDADANIA": 2, "PV": 2, "PC do B": 2,
+    "NOVO": 2, "REDE": 1, "AGIR": 1, "MOBILIZA": 1, "DC": 1, "PMB": 1, "PSOL": 2, "PCO": 0.3, "PSTU": 0.3,
+    "UP": 0.3, "PCB": 0.3,
+}
+NUMEROS_PARTIDOS = {sigla: 10 + i for i, sigla in enumerate(PARTIDOS)}
+
+# Vagas de vereador (distribuição concentrada nos municípios pequenos)
+VAGAS_VEREADOR = np.array([9, 11, 13, 15, 17, 19, 21, 23, 29, 35, 41, 55])
+PESOS_VAGAS = np.array([52, 18, 10, 7, 4, 3, 2, 1.5, 1, 0.8, 0.4, 0.3])
+
+PRENOMES = [
+    "MARIA", "JOSE", "ANA", "JOAO", "ANTONIO", "FRANCISCO", "CARLOS", "PAULO", "PEDRO", "LUCAS", "LUIZ",
+    "MARCOS", "LUIS", "GABRIEL", "RAFAEL", "FRANCISCA", "DANIEL", "MARCELO", "BRUNO", "EDUARDO", "FELIPE",
+    "RAIMUNDO", "RODRIGO", "ANTONIA", "ADRIANA", "JULIANA", "MARCIA", "FERNANDA", "PATRICIA", "ALINE",
+]
+SOBRENOMES = [
+    "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA", "LIMA", "GOMES",
+    "COSTA", "RIBEIRO", "MARTINS", "CARVALHO", "ALMEIDA", "LOPES", "SOARES", "FERNANDES", "VIEIRA", "BARBOSA",
+    "ROCHA", "DIAS", "NASCIMENTO", "ANDRADE", "MOREIRA", "NUNES", "MARQUES", "MACHADO", "MENDES", "FREITAS",
+]
+OCUPACOES = ["EMPRESÁRIO", "AGRICULTOR", "COMERCIANTE", "SERVIDOR PÚBLICO MUNICIPAL", "PROFESSOR DE ENSINO MÉDIO",
+             "ADVOGADO", "VEREADOR", "APOSENTADO (EXCETO SERVIDOR PÚBLICO)", "DONA DE CASA", "OUTROS"]
+GRAUS_INSTRUCAO = ["ENSINO FUNDAMENTAL COMPLETO", "ENSINO MÉDIO COMPLETO", "SUPERIOR INCOMPLETO",
+                   "SUPERIOR COMPLETO"]
+CORES_RACA = ["BRANCA", "PARDA", "PRETA", "AMARELA", "INDÍGENA"]
+TIPOS_BEM = ["Apartamento", "Casa", "Terreno", "Veículo automotor terrestre", "Depósito bancário em conta corrente",
+             "Quotas ou quinhões de capital", "Aplicação de renda fixa", "Outros bens e direitos"]
+ETNIAS = ["GUARANI", "KAINGANG", "TERENA", "TIKUNA", "PATAXÓ", "XUKURU", "MAKUXI", "POTIGUARA", "TUPINIKIM",
+          "YANOMAMI", "XOKLENG", "MUNDURUKU"]
+MOTIVOS_CASSACAO = ["Abuso de poder econômico", "Captação ilícita de sufrágio", "Conduta vedada a agente público",
+                    "Fraude à cota de gênero"]
+
+# Redes sociais: modelos de URL e peso (o Instagram domina, como no TSE)
+MODELOS_URL = {
+    "https://www.instagram.com/{}": 40, "https://instagram.com/{}/": 8, "https://www.facebook.com/{}": 22,
+    "https://m.facebook.com/{}": 4, "http://fb.com/{}": 1, "https://twitter.com/{}": 3, "https://x.com/{}": 2,
+    "https://www.youtube.com/@{}": 3, "https://www.tiktok.com/@{}": 6, "https://wa.me/55{:0>10}": 3,
+    "https://www.linkedin.com/in/{}": 1, "https://{}.com.br": 5, "https://linktr.ee/{}": 2,
+}
+
+# Fração de candidatos indígenas / quilombolas por região
+TAXA_INDIGENAS = {"Norte": 0.02, "Centro-Oeste": 0.008}
+TAXA_QUILOMBOLAS = {"Nordeste": 0.02, "Norte": 0.012, "Sudeste": 0.006}
+
+# Vocabulário das propostas de governo (termos de política pública e palavras
+# comuns, inclusive stop words, para exercitar o filtro do insight 8)
+TERMOS_PROPOSTAS = [
+    "saúde", "educação", "segurança", "transporte", "infraestrutura", "desenvolvimento", "emprego", "renda",
+    "cultura", "esporte", "lazer", "meio", "ambiente", "saneamento", "habitação", "mobilidade", "turismo",
+    "agricultura", "tecnologia", "inovação", "assistência", "social", "juventude", "idosos", "mulheres",
+    "gestão", "transparência", "participação", "comunidade", "escolas", "creches", "unidades", "atendimento",
+    "programa", "projetos", "investimentos", "recursos", "município", "cidade", "população", "qualidade", "vida",
+    "ampliar", "garantir", "implantar", "fortalecer", "promover", "melhorar", "criar", "valorizar",
+]
+PALAVRAS_COMUNS = ["de", "a", "o", "que", "e", "do", "da", "em", "um", "para", "com", "não", "uma", "os", "no",
+                   "se", "na", "por", "mais", "as", "dos", "como", "mas", "ao", "das", "à", "seu", "sua", "nos"]
+
+
+def gerar_nomes(rng, quantidade):
+    prenomes = rng.choice(PRENOMES, quantidade)
+    meio = rng.choice(SOBRENOMES, quantidade)
+    fim = rng.choice(SOBRENOMES, quantidade)
+    return pd.Series(prenomes).str.cat([pd.Series(meio), pd.Series(fim)], sep=" ")
+
+
+def pesos_partidos(semente, ano):
+    # O peso de cada partido oscila de uma eleição para outra, para que as
+    # comparações entre anos tenham o que mostrar
+    rng = np.random.default_rng([semente, ano])
+    pesos = np.array(list(PARTIDOS.values())) * np.exp(rng.normal(0, 0.3, len(PARTIDOS)))
+    return pesos / pesos.sum()
+
+
+def posicao_no_grupo(grupos):
+    # Posição (0, 1, 2...) de cada linha dentro do seu grupo; grupos contíguos
+    inicio = np.r_[0, np.flatnonzero(np.diff(grupos)) + 1]
+    tamanhos = np.diff(np.r_[inicio, len(grupos)])
+    return np.arange(len(grupos)) - np.repeat(inicio, tamanhos)
+
+
+def sequenciais(ano, indice_uf, tipo, quantidade):
+    # SQ no formato do TSE (12 dígitos, prefixo do ano); únicos por ano e UF
+    return (ano % 100) * 10**10 + tipo * 10**9 + indice_uf * 10**7 + np.arange(1, quantidade + 1, dtype=np.int64)
+
+
+def gerar_uf(uf, ano, municipios, escala, semente):
+    indice_uf = UFS.index(uf)
+    rng = np.random.default_rng([semente, ano, indice_uf])
+    partidos = np.array(list(PARTIDOS))
+    pesos = pesos_partidos(semente, ano)
+
+    municipios = municipios[municipios["SG_UF"] == uf].sort_values("CD_MUNICIPIO_IBGE")
+    if escala < 1:
+        municipios = municipios.sample(n=max(1, round(len(municipios) * escala)), random_state=rng.integers(2**31))
+        municipios = municipios.sort_values("CD_MUNICIPIO_IBGE")
+    num_municipios = len(municipios)
+    # Código do município no TSE: 5 dígitos, único dentro da UF
+    sg_ue = (municipios["CD_MUNICIPIO_IBGE"].to_numpy() // 10 % 100000).astype(str)
+    nm_ue = municipios["NM_MUNICIPIO"].str.upper().to_numpy()
+    vagas = rng.choice(VAGAS_VEREADOR, num_municipios, p=PESOS_VAGAS / PESOS_VAGAS.sum())
+
+    # Prefeitos: de 1 a 8 chapas por município, partidos distintos; o
+    # primeiro sorteado vence. Cada chapa é uma coligação de 1 a 6 partidos.
+    chapas = np.clip(1 + rng.poisson(1.6, num_municipios), 1, 8)
+    municipio_chapa = np.repeat(np.arange(num_municipios), chapas)
+    ordem_chapa = posicao_no_grupo(municipio_chapa)
+    partido_chapa = np.concatenate([rng.choice(partidos, n, replace=False, p=pesos) for n in chapas])
+    sq_coligacao_chapa = sequenciais(ano, indice_uf, 1, len(municipio_chapa))
+    coligacoes = []
+    for sq, partido in zip(sq_coligacao_chapa, partido_chapa):
+        aliados = rng.choice(partidos, rng.integers(0, 6), replace=False, p=pesos)
+        coligacoes.append((sq, [partido] + [aliado for aliado in aliados if aliado != partido]))
+
+    # Segundo turno: alguns municípios com duas ou mais chapas
+    segundo_turno = (rng.random(num_municipios) < 0.02) & (chapas >= 2)
+    disputa_2t = segundo_turno[municipio_chapa] & (ordem_chapa < 2)
+    situacao_chapa = np.where(ordem_chapa == 0, "ELEITO", "NÃO ELEITO")
+    situacao_1t = np.where(disputa_2t, "2º turno", situacao_chapa)
+
+    # Vereadores: de 5 a 10 candidatos por vaga, cada partido isolado (sem
+    # coligação proporcional); os primeiros de cada município são eleitos
+    vereadores = np.round(vagas * rng.uniform(5, 10, num_municipios)).astype(int)
+    municipio_vereador = np.repeat(np.arange(num_municipios), vereadores)
+    ordem_vereador = posicao_no_grupo(municipio_vereador)
+    partido_vereador = rng.choice(partidos, len(municipio_vereador), p=pesos)
+    eleito = ordem_vereador < vagas[municipio_vereador]
+    situacao_vereador = np.where(
+        eleito,
+        np.where(rng.random(len(eleito)) < 0.8, "ELEITO POR QP", "ELEITO POR MÉDIA"),
+        np.where(rng.random(len(eleito)) < 0.93, "SUPLENTE", "NÃO ELEITO"),
+    )
+    chaves_proporcionais = pd.MultiIndex.from_arrays([municipio_vereador, partido_vereador]).unique().sort_values()
+    sq_proporcionais = pd.Series(
+        sequenciais(ano, indice_uf, 2, len(chaves_proporcionais)), index=chaves_proporcionais
+    )
+    sq_coligacao_vereador = sq_proporcionais.reindex(
+        pd.MultiIndex.from_arrays([municipio_vereador, partido_vereador])
+    ).to_numpy()
+    coligacoes.extend((sq, [partido]) for (_, partido), sq in sq_proporcionais.items())
+
+    # Candidaturas: prefeito e vice por chapa, depois os vereadores
+    municipio = np.concatenate([municipio_chapa, municipio_chapa, municipio_vereador])
+    cargo = np.repeat(["PREFEITO", "VICE-PREFEITO", "VEREADOR"], [len(municipio_chapa)] * 2 + [len(municipio_vereador)])
+    partido = np.concatenate([partido_chapa, partido_chapa, partido_vereador])
+    sq_coligacao = np.concatenate([sq_coligacao_chapa, sq_coligacao_chapa, sq_coligacao_vereador])
+    situacao = np.concatenate([situacao_1t, situacao_1t, situacao_vereador])
+    total = len(municipio)
+    sq_candidato = sequenciais(ano, indice_uf, 0, total)
+    nomes = gerar_nomes(rng, total)
+    regiao = UFS_PARA_REGIOES[uf]
+    # Número de urna: o do partido para prefeito e vice, partido + sequencial para vereador
+    numero_partido = pd.Series(partido).map(NUMEROS_PARTIDOS).to_numpy()
+    ordem = np.r_[np.zeros(2 * len(municipio_chapa), dtype=int), ordem_vereador % 1000]
+    numero_urna = np.where(cargo == "VEREADOR", numero_partido * 1000 + ordem, numero_partido)
+
+    candidatos = pd.DataFrame({
+        "DT_GERACAO": f"01/10/{ano}", "HH_GERACAO": "08:00:00", "ANO_ELEICAO": ano, "CD_TIPO_ELEICAO": 2,
+        "NM_TIPO_ELEICAO": "ELEIÇÃO ORDINÁRIA", "NR_TURNO": 1, "DS_ELEICAO": f"Eleições Municipais {ano}",
+        "TP_ABRANGENCIA": "MUNICIPAL", "SG_UF": uf, "SG_UE": sg_ue[municipio], "NM_UE": nm_ue[municipio],
+        "CD_CARGO": pd.Series(cargo).map({"PREFEITO": 11, "VICE-PREFEITO": 12, "VEREADOR": 13}).to_numpy(),
+        "DS_CARGO": cargo, "SQ_CANDIDATO": sq_candidato,
+        "NR_CANDIDATO": numero_urna, "NM_CANDIDATO": nomes, "NM_URNA_CANDIDATO": nomes.str.split(" ").str[0],
+        "NR_CPF_CANDIDATO": rng.integers(10**10, 10**11, total), "NR_PARTIDO": numero_partido,
+        "SG_PARTIDO": partido, "SQ_COLIGACAO": sq_coligacao,
+        "DT_NASCIMENTO": pd.to_datetime(rng.integers(-7300, 12000, total), unit="D").strftime("%d/%m/%Y"),
+        "DS_GENERO": rng.choice(["MASCULINO", "FEMININO"], total, p=[0.66, 0.34]),
+        "DS_GRAU_INSTRUCAO": rng.choice(GRAUS_INSTRUCAO, total),
+        "DS_COR_RACA": rng.choice(CORES_RACA, total, p=[0.5, 0.36, 0.12, 0.01, 0.01]),
+        "DS_OCUPACAO": rng.choice(OCUPACOES, total), "DS_SIT_TOT_TURNO": situacao,
+    })
+    # Linhas do segundo turno para as chapas que disputaram (mesmo SQ)
+    linhas_2t = np.flatnonzero(np.r_[disputa_2t, disputa_2t, np.zeros(len(municipio_vereador), dtype=bool)])
+    candidatos = pd.concat([
+        candidatos,
+        candidatos.iloc[linhas_2t].assign(NR_TURNO=2, DS_SIT_TOT_TURNO=situacao_chapa[linhas_2t % len(situacao_chapa)]),
+    ], ignore_index=True)
+
+    # Bens: ~70% dos candidatos declaram de 1 a 8 bens
+    declarantes = np.flatnonzero(rng.random(total) < 0.7)
+    num_bens = np.clip(rng.poisson(2.2, len(declarantes)), 1, 8)
+    dono = np.repeat(declarantes, num_bens)
+    valores = rng.lognormal(11, 1.5, len(dono))
+    bens = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SG_UE": sg_ue[municipio[dono]], "NM_UE": nm_ue[municipio[dono]],
+        "SQ_CANDIDATO": sq_candidato[dono], "NR_ORDEM_BEM_CANDIDATO": posicao_no_grupo(dono) + 1,
+        "DS_TIPO_BEM_CANDIDATO": rng.choice(TIPOS_BEM, len(dono)), "DS_BEM_CANDIDATO": "BEM DECLARADO",
+        "VR_BEM_CANDIDATO": [f"{valor:.2f}".replace(".", ",") for valor in valores],
+    })
+
+    etnia = np.where(rng.random(total) < TAXA_INDIGENAS.get(regiao, 0.003), rng.integers(1, len(ETNIAS) + 1, total), 0)
+    info_complementar = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SQ_CANDIDATO": sq_candidato, "CD_ETNIA_INDIGENA": etnia,
+        "DS_ETNIA_INDIGENA": np.where(etnia > 0, np.array(["#NULO#"] + ETNIAS)[etnia], "#NULO#"),
+        "ST_QUILOMBOLA": np.where(rng.random(total) < TAXA_QUILOMBOLAS.get(regiao, 0.004), "S", "N"),
+        "ST_DECLARAR_BENS": np.where(np.isin(np.arange(total), declarantes), "S", "N"),
+    })
+
+    # Redes sociais: ~65% dos candidatos informam de 1 a 3 URLs
+    com_redes = np.flatnonzero(rng.random(total) < 0.65)
+    num_redes = rng.integers(1, 4, len(com_redes))
+    dono = np.repeat(com_redes, num_redes)
+    pesos_urls = np.array(list(MODELOS_URL.values()))
+    modelos = rng.choice(list(MODELOS_URL), len(dono), p=pesos_urls / pesos_urls.sum())
+    redes = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SQ_CANDIDATO": sq_candidato[dono],
+        "NR_ORDEM_REDE_SOCIAL": posicao_no_grupo(dono) + 1,
+        "DS_URL": [modelo.format(sq) for modelo, sq in zip(modelos, sq_candidato[dono])],
+    })
+
+    coligacoes = pd.DataFrame(
+        [(sq, membros, membro) for sq, membros in coligacoes for membro in membros],
+        columns=["SQ_COLIGACAO", "MEMBROS", "SG_PARTIDO"],
+    )
+    coligacoes = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SQ_COLIGACAO": coligacoes["SQ_COLIGACAO"],
+        "TP_AGREMIACAO": np.where(coligacoes["MEMBROS"].str.len() > 1, "COLIGAÇÃO", "PARTIDO ISOLADO"),
+        "NR_PARTIDO": coligacoes["SG_PARTIDO"].map(NUMEROS_PARTIDOS), "SG_PARTIDO": coligacoes["SG_PARTIDO"],
+        "DS_COMPOSICAO_COLIGACAO": coligacoes["MEMBROS"].str.join(" / "),
+        "DS_COMPOSICAO_FEDERACAO": coligacoes["MEMBROS"].str.join(","),
+    })
+
+    cassados = rng.choice(total, max(1, total // 500), replace=False)
+    motivo_cassacao = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SQ_CANDIDATO": sq_candidato[cassados],
+        "DS_MOTIVO_CASSACAO": rng.choice(MOTIVOS_CASSACAO, len(cassados)),
+    })
+
+    vagas = pd.DataFrame({
+        "ANO_ELEICAO": ano, "SG_UF": uf, "SG_UE": np.repeat(sg_ue, 3), "NM_UE": np.repeat(nm_ue, 3),
+        "CD_CARGO": np.tile([11, 12, 13], num_municipios),
+        "DS_CARGO": np.tile(["PREFEITO", "VICE-PREFEITO", "VEREADOR"], num_municipios),
+        "QT_VAGA": np.column_stack([np.ones(num_municipios, int), np.ones(num_municipios, int), vagas]).ravel(),
+    })
+
+    prefeitos = candidatos[(candidatos["DS_CARGO"] == "PREFEITO") & (candidatos["NR_TURNO"] == 1)]["SQ_CANDIDATO"]
+    return {
+        "candidatos": candidatos,
+        "candidatos_bens": bens,
+        "candidatos_info_complementar": info_complementar,
+        "candidatos_redes_sociais": redes,
+        "coligacoes": coligacoes,
+        "motivo_cassacao": motivo_cassacao,
+        "vagas": vagas,
+    }, prefeitos.to_numpy()
+
+
+def gravar_csv(df, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    df.to_csv(caminho, sep=";", encoding="latin1", index=False, quoting=csv.QUOTE_ALL, errors="replace")
+
+
+def texto_proposta(rng, palavras):
+    # Termos de política com frequência de Zipf, misturados a palavras comuns
+    pesos = 1 / np.arange(1, len(TERMOS_PROPOSTAS) + 1)
+    termos = rng.choice(TERMOS_PROPOSTAS, palavras, p=pesos / pesos.sum())
+    comuns = rng.choice(PALAVRAS_COMUNS, palavras)
+    return " ".join(np.where(rng.random(palavras) < 0.55, termos, comuns))
+
+
+def gravar_propostas(pasta, sq_candidatos, quantidade, semente):
+    import fitz
+
+    os.makedirs(pasta, exist_ok=True)
+    rng = np.random.default_rng([semente, 8])
+    escolhidos = sq_candidatos if len(sq_candidatos) <= quantidade else rng.choice(sq_candidatos, quantidade,
+                                                                                      replace=False)
+    for sq in escolhidos:
+        documento = fitz.open()
+        for _ in range(rng.integers(2, 9)):
+            pagina = documento.new_page()
+            pagina.insert_textbox(pagina.rect + (50, 50, -50, -50), texto_proposta(rng, 350), fontsize=10)
+        documento.save(os.path.join(pasta, f"proposta_governo_{sq}.pdf"))
+        documento.close()
+    return len(escolhidos)
+
+
+def parse_ufs(valor):
+    if valor == "todas":
+        return UFS
+    ufs = [uf.strip().upper() for uf in valor.split(",") if uf.strip()]
+    desconhecidas = [uf for uf in ufs if uf not in UFS]
+    if desconhecidas:
+        raise argparse.ArgumentTypeError(f"UFs desconhecidas: {', '.join(desconhecidas)}")
+    return ufs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no layout dos arquivos do TSE")
+    parser.add_argument("--destino", default=DESTINO_PADRAO,
+                        help="Pasta de trabalho; os arquivos vão para <destino>/data/<dataset>/")
+    parser.add_argument("--ufs", type=parse_ufs, default=["SC"], help="Lista separada por vírgulas ou 'todas'")
+    parser.add_argument("--anos", default="2024", help="Anos separados por vírgulas (ex.: 2016,2020,2024)")
+    parser.add_argument("--escala", type=float, default=1.0,
+                        help="Fração dos municípios de cada UF (1.0 = todos, ~83 candidaturas por município)")
+    parser.add_argument("--pdfs", type=int, default=100,
+                        help="Propostas de governo em PDF (prefeitos de SC ou da primeira UF, último ano)")
+    parser.add_argument("--semente", type=int, default=2024)
+    args = parser.parse_args()
+    anos = sorted(int(ano) for ano in args.anos.split(",") if ano.strip())
+    if not 0 < args.escala <= 1:
+        parser.error("--escala deve estar entre 0 e 1")
+
+    municipios = carregar_municipios()
+    pasta_dados = os.path.join(args.destino, "data")
+    inicio = time.perf_counter()
+    linhas = {nome: 0 for nome in ARQUIVOS}
+    prefeitos_propostas = None
+    for ano in anos:
+        for uf in args.ufs:
+            tabelas, prefeitos = gerar_uf(uf, ano, municipios, args.escala, args.semente)
+            for nome, df in tabelas.items():
+                gravar_csv(df, os.path.join(pasta_dados, nome, ARQUIVOS[nome].format(ano=ano, uf=uf)))
+                linhas[nome] += len(df)
+            if uf == ("SC" if "SC" in args.ufs else args.ufs[0]) and ano == anos[-1]:
+                prefeitos_propostas = prefeitos
+            print(f"{uf} {ano}: {len(tabelas['candidatos'])} linhas de candidatos")
+
+    if args.pdfs and prefeitos_propostas is not None:
+        # O insight 8 lê as propostas de PATH_PROPOSTAS (pasta SC)
+        pasta_propostas = os.path.join(pasta_dados, "candidatos_propostas_governo", "SC")
+        gerados = gravar_propostas(pasta_propostas, prefeitos_propostas, args.pdfs, args.semente)
+        print(f"{gerados} propostas em PDF em '{pasta_propostas}'")
+
+    print(", ".join(f"{nome}: {total}" for nome, total in linhas.items()))
+    print(f"Dados gerados em '{pasta_dados}' em {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
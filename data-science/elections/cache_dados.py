@@ -0,0 +1,165 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+import pyarrow.parquet as pq
+
+from arquivos import gravar_atomico, gravar_json
+from instrumentacao import avisar
+from particoes import filtrar_linhas
+
+# Cache colunar (Parquet) dos CSVs do TSE. Cada arquivo de origem tem uma
+# entrada de metadados própria, o que permite que vários processos
+# atualizem o cache ao mesmo tempo sem disputar um índice único. O arquivo
+# completo é armazenado, com as colunas como texto; a projeção de colunas
+# acontece na leitura e os tipos vêm do schema de cada dataset.
+CACHE_DIR = os.path.join("data", ".cache")
+CACHE_VERSAO = 2
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _chave_caminho(caminho):
+    return hashlib.sha1(os.path.abspath(caminho).encode("utf-8")).hexdigest()
+
+
+def _caminho_metadados(caminho, cache_dir):
+    return os.path.join(cache_dir, "entradas", f"{_chave_caminho(caminho)}.json")
+
+
+def _ler_metadados(caminho_meta):
+    try:
+        with open(caminho_meta, "r", encoding="utf-8") as arquivo:
+            meta = json.load(arquivo)
+        return meta if meta.get("versao") == CACHE_VERSAO else None
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_metadados(caminho_meta, meta):
+    gravar_json(caminho_meta, meta, ensure_ascii=False)
+
+
+def _remover_dados_antigos(meta, cache_dir):
+    if meta and meta.get("arquivo_cache"):
+        antigo = os.path.join(cache_dir, "dados", meta["arquivo_cache"])
+        if os.path.exists(antigo):
+            os.remove(antigo)
+
+
+def _ler_parquet(caminho_dados, colunas, filtros=None):
+    # filtros no formato do pyarrow, aplicados na leitura (row groups e linhas)
+    filtros = filtros or None
+    if colunas is None:
+        return pd.read_parquet(caminho_dados, filters=filtros)
+    existentes = set(pq.read_schema(caminho_dados).names)
+    return pd.read_parquet(
+        caminho_dados, columns=[coluna for coluna in colunas if coluna in existentes], filters=filtros
+    )
+
+
+def _projetar(df, colunas):
+    if colunas is None:
+        return df
+    return df[[coluna for coluna in colunas if coluna in df.columns]]
+
+
+def carregar_com_cache(caminho, leitor, recriar=False, colunas=None, cache_dir=CACHE_DIR, filtros=None):
+    # Chave: caminho + tamanho + mtime + hash do conteúdo. Tamanho e mtime
+    # iguais dispensam o hash; se mudarem, o hash decide se o conteúdo mudou
+    # de fato (ex.: arquivo apenas copiado ou tocado).
+    stat = os.stat(caminho)
+    caminho_meta = _caminho_metadados(caminho, cache_dir)
+    meta = _ler_metadados(caminho_meta)
+
+    if meta and not recriar:
+        caminho_dados = os.path.join(cache_dir, "dados", meta["arquivo_cache"])
+        if os.path.exists(caminho_dados):
+            if meta["tamanho"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+                return _ler_parquet(caminho_dados, colunas, filtros)
+
+            if meta["tamanho"] == stat.st_size and meta["sha256"] == hash_arquivo(caminho):
+                meta["mtime_ns"] = stat.st_mtime_ns
+                _gravar_metadados(caminho_meta, meta)
+                return _ler_parquet(caminho_dados, colunas, filtros)
+
+    df = leitor(caminho)
+    if df.empty:
+        return df
+
+    sha256 = hash_arquivo(caminho)
+    arquivo_cache = f"{_chave_caminho(caminho)}-{sha256[:16]}.parquet"
+    try:
+        gravar_atomico(
+            os.path.join(cache_dir, "dados", arquivo_cache),
+            lambda destino: df.to_parquet(destino, index=False),
+        )
+    except Exception as e:
+        avisar(f"Aviso: não foi possível gravar o cache de '{caminho}': {e}")
+        return _projetar(filtrar_linhas(df, filtros), colunas)
+
+    if meta and meta.get("arquivo_cache") != arquivo_cache:
+        _remover_dados_antigos(meta, cache_dir)
+
+    _gravar_metadados(caminho_meta, {
+        "versao": CACHE_VERSAO,
+        "caminho": os.path.abspath(caminho),
+        "tamanho": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+        "arquivo_cache": arquivo_cache,
+    })
+    return _projetar(filtrar_linhas(df, filtros), colunas)
+
+
+def caminho_cache_valido(caminho, cache_dir=CACHE_DIR):
+    # Verificação barata (sem hash): devolve o Parquet do arquivo se o cache
+    # estiver em dia, ou None
+    meta = _ler_metadados(_caminho_metadados(caminho, cache_dir))
+    if meta is None:
+        return None
+    stat = os.stat(caminho)
+    caminho_dados = os.path.join(cache_dir, "dados", meta["arquivo_cache"])
+    if meta["tamanho"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns and os.path.exists(caminho_dados):
+        return caminho_dados
+    return None
+
+
+def impressao_arquivo(caminho, cache_dir=CACHE_DIR):
+    # Hash do conteúdo, reaproveitando o das entradas do cache colunar (ou o
+    # da última chamada) quando tamanho e mtime não mudaram
+    stat = os.stat(caminho)
+    for caminho_meta in (
+        _caminho_metadados(caminho, cache_dir),
+        os.path.join(cache_dir, "impressoes", f"{_chave_caminho(caminho)}.json"),
+    ):
+        meta = _ler_metadados(caminho_meta)
+        if meta and meta["tamanho"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+            return meta["sha256"]
+
+    sha256 = hash_arquivo(caminho)
+    _gravar_metadados(caminho_meta, {
+        "versao": CACHE_VERSAO,
+        "caminho": os.path.abspath(caminho),
+        "tamanho": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+    })
+    return sha256
+
+
+def cache_valido(caminho, cache_dir=CACHE_DIR):
+    return caminho_cache_valido(caminho, cache_dir) is not None
+
+
+def limpar_cache(cache_dir=CACHE_DIR):
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+        print(f"Cache removido: '{cache_dir}'")
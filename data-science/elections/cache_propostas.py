@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import sqlite3
+
+from cache_dados import CACHE_DIR, hash_arquivo
+
+# Cache das extrações de PDFs de propostas de governo, endereçado pelo hash
+# do conteúdo de cada PDF. Guarda a contagem de termos de cada documento (já
+# em minúsculas e só com palavras alfabéticas, mas sem remover stop words,
+# para que mudanças na lista não invalidem o cache) e também as falhas, para
+# que PDFs corrompidos não sejam reprocessados a cada execução.
+CAMINHO_CACHE_PROPOSTAS = os.path.join(CACHE_DIR, "propostas.sqlite")
+
+
+def abrir_cache_propostas(caminho=CAMINHO_CACHE_PROPOSTAS):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript("""
+        CREATE TABLE IF NOT EXISTS arquivos (
+            caminho TEXT PRIMARY KEY,
+            tamanho INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS extracoes (
+            sha256 TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            erro TEXT,
+            termos TEXT,
+            atualizado_em REAL NOT NULL
+        );
+    """)
+    return conexao
+
+
+def hash_pdf(conexao, caminho):
+    # Evita recalcular o hash de arquivos que não mudaram de tamanho/mtime
+    caminho = os.path.abspath(caminho)
+    stat = os.stat(caminho)
+    linha = conexao.execute(
+        "SELECT tamanho, mtime_ns, sha256 FROM arquivos WHERE caminho = ?", (caminho,)
+    ).fetchone()
+    if linha and linha[0] == stat.st_size and linha[1] == stat.st_mtime_ns:
+        return linha[2]
+
+    sha256 = hash_arquivo(caminho)
+    conexao.execute(
+        "INSERT OR REPLACE INTO arquivos (caminho, tamanho, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+        (caminho, stat.st_size, stat.st_mtime_ns, sha256)
+    )
+    return sha256
+
+
+def buscar_extracao(conexao, sha256):
+    # Devolve (status, termos, erro) ou None se o documento nunca foi processado
+    linha = conexao.execute(
+        "SELECT status, termos, erro FROM extracoes WHERE sha256 = ?", (sha256,)
+    ).fetchone()
+    if linha is None:
+        return None
+    status, termos, erro = linha
+    return status, (json.loads(termos) if termos else {}), erro
+
+
+def gravar_extracao(conexao, sha256, termos=None, erro=None):
+    conexao.execute(
+        "INSERT OR REPLACE INTO extracoes (sha256, status, erro, termos, atualizado_em) VALUES (?, ?, ?, ?, ?)",
+        (
+            sha256,
+            "erro" if erro else "ok",
+            erro,
+            json.dumps(termos or {}, ensure_ascii=False),
+            time.time(),
+        )
+    )
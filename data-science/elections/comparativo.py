@@ -0,0 +1,276 @@
+import os
+import json
+import pandas as pd
+
+from agregacoes import adicionar_regiao
+from arquivos import gravar_json
+from dimensoes import filtrar_candidatos, juntar_candidatos
+
+# Modo comparativo entre eleições. Para cada ano, os agregados dos insights
+# viram resumos compactos (uma linha por UF, região ou partido), gravados em
+# output/comparativo/ano=<ano>/. Os anos são processados um de cada vez: os
+# dados brutos de um ano são liberados antes de o próximo ser lido, e as
+# variações e tendências saem só dos resumos.
+DIR_COMPARATIVO = os.path.join("output", "comparativo")
+ARQUIVO_IMPRESSOES = "_impressoes.json"
+
+
+def _participacao(df, medida, grupo):
+    return df[medida] / df.groupby(grupo, observed=True)[medida].transform('sum')
+
+
+def _maior_por_grupo(df, grupo, medida):
+    # Mesmo critério dos insights 3 e 5 (idxmax: primeiro em caso de empate)
+    df = df.assign(PARTICIPACAO=_participacao(df, medida, grupo))
+    return df.loc[df.groupby(grupo, observed=True)[medida].idxmax()]
+
+
+def _maior_partido_uf(partidos_por_uf):
+    return _maior_por_grupo(partidos_por_uf, 'SG_UF', 'NUM_CANDIDATOS')
+
+
+def _partido_dominante_uf(partido_dominante_uf):
+    return _maior_por_grupo(partido_dominante_uf, 'SG_UF', 'TOTAL_CANDIDATOS')
+
+
+def _bens_prefeitos_eleitos(dimensao_candidatos, bens_por_candidato):
+    eleitos = filtrar_candidatos(dimensao_candidatos, cargo='prefeito', situacao='eleito')
+    eleitos = eleitos[['SG_UF']].join(bens_por_candidato.rename('TOTAL_BENS'))
+    return eleitos.groupby('SG_UF', observed=True).agg(
+        NUM_ELEITOS=('TOTAL_BENS', 'size'),
+        NUM_COM_BENS=('TOTAL_BENS', 'count'),
+        MEDIANA_BENS=('TOTAL_BENS', 'median'),
+        TOTAL_BENS=('TOTAL_BENS', 'sum'),
+    ).reset_index()
+
+
+def _coligacoes_por_uf(dimensao_candidatos, dados_coligacoes):
+    dados_coligacoes = dados_coligacoes.assign(
+        NUMERO_PARTIDOS=dados_coligacoes['DS_COMPOSICAO_FEDERACAO'].str.count(',') + 1
+    )
+    por_uf = dados_coligacoes.groupby('SG_UF', observed=True).agg(
+        NUM_COLIGACOES=('SQ_COLIGACAO', 'nunique'),
+        MEDIA_PARTIDOS=('NUMERO_PARTIDOS', 'mean'),
+    )
+    eleitos = filtrar_candidatos(dimensao_candidatos, situacao='eleito')
+    eleitos = eleitos[eleitos['SQ_COLIGACAO'].isin(dados_coligacoes['SQ_COLIGACAO'])]
+    por_uf['NUM_ELEITOS'] = eleitos.groupby('SG_UF', observed=True).size()
+    return por_uf.fillna({'NUM_ELEITOS': 0}).reset_index()
+
+
+def _partidos_por_regiao(candidatos_por_regiao):
+    return candidatos_por_regiao.assign(
+        PARTICIPACAO=_participacao(candidatos_por_regiao, 'NUM_CANDIDATOS', 'REGIAO')
+    )
+
+
+def _indigenas_quilombolas_regiao(dados_info_complementar, dimensao_candidatos):
+    # Participação sobre o total de candidaturas da região (dimensão)
+    total = adicionar_regiao(dimensao_candidatos[['SG_UF']]).groupby('REGIAO', observed=True).size()
+    info = adicionar_regiao(juntar_candidatos(
+        dados_info_complementar.drop(columns=['SG_UF'], errors='ignore'), dimensao_candidatos, ['SG_UF']
+    ))
+    resumo = pd.DataFrame({
+        'NUM_CANDIDATOS': total,
+        'NUM_INDIGENAS': (info['CD_ETNIA_INDIGENA'] != 0).groupby(info['REGIAO'], observed=True).sum(),
+        'NUM_QUILOMBOLAS': (info['ST_QUILOMBOLA'] == 'S').groupby(info['REGIAO'], observed=True).sum(),
+    }).fillna({'NUM_INDIGENAS': 0, 'NUM_QUILOMBOLAS': 0})
+    resumo['PCT_INDIGENAS'] = resumo['NUM_INDIGENAS'] / resumo['NUM_CANDIDATOS']
+    resumo['PCT_QUILOMBOLAS'] = resumo['NUM_QUILOMBOLAS'] / resumo['NUM_CANDIDATOS']
+    return resumo.rename_axis('REGIAO').reset_index()
+
+
+def _redes_por_uf(redes_por_partido_uf):
+    return redes_por_partido_uf.assign(
+        PARTICIPACAO=_participacao(redes_por_partido_uf, 'NUM_CANDIDATOS', 'SG_UF')
+    )
+
+
+def _prefeitos_por_partido_uf(dimensao_candidatos):
+    eleitos = filtrar_candidatos(dimensao_candidatos, cargo='prefeito', situacao='eleito')
+    contagem = eleitos.groupby(['SG_UF', 'SG_PARTIDO'], observed=True).size().reset_index(name='NUM_PREFEITOS')
+    return contagem.assign(PARTICIPACAO=_participacao(contagem, 'NUM_PREFEITOS', 'SG_UF'))
+
+
+# Resumo anual de cada insight: entradas (tarefas de build_tasks), chaves da
+# linha, medidas numéricas (comparadas por variação e tendência) e rótulos
+# (ex.: o partido dominante, comparado pelo número de trocas). "cobertura" é
+# a coluna que indica se o ano tem dados de uma linha: uma chave ausente num
+# ano coberto vale 0 nas medidas de "zeros". O insight 8 (propostas em PDF)
+# não tem partição por ano e fica de fora.
+RESUMOS_ANUAIS = {
+    "bens_prefeitos_eleitos": {
+        "insight": "1",
+        "funcao": _bens_prefeitos_eleitos,
+        "entradas": ["dimensao_candidatos", "bens_por_candidato"],
+        "chaves": ['SG_UF'],
+        "medidas": ['NUM_ELEITOS', 'NUM_COM_BENS', 'MEDIANA_BENS', 'TOTAL_BENS'],
+    },
+    "coligacoes_por_uf": {
+        "insight": "2",
+        "funcao": _coligacoes_por_uf,
+        "entradas": ["dimensao_candidatos", "coligacoes"],
+        "chaves": ['SG_UF'],
+        "medidas": ['NUM_COLIGACOES', 'MEDIA_PARTIDOS', 'NUM_ELEITOS'],
+    },
+    "maior_partido_uf": {
+        "insight": "3",
+        "funcao": _maior_partido_uf,
+        "entradas": ["partidos_por_uf"],
+        "chaves": ['SG_UF'],
+        "rotulos": ['SG_PARTIDO'],
+        "medidas": ['NUM_CANDIDATOS', 'PARTICIPACAO'],
+    },
+    "partidos_por_regiao": {
+        "insight": "4",
+        "funcao": _partidos_por_regiao,
+        "entradas": ["candidatos_por_regiao"],
+        "chaves": ['REGIAO', 'SG_PARTIDO'],
+        "medidas": ['NUM_CANDIDATOS', 'PARTICIPACAO'],
+        "cobertura": 'REGIAO',
+        "zeros": ['NUM_CANDIDATOS', 'PARTICIPACAO'],
+    },
+    "partido_dominante_uf": {
+        "insight": "5",
+        "funcao": _partido_dominante_uf,
+        "entradas": ["partido_dominante_uf"],
+        "chaves": ['SG_UF'],
+        "rotulos": ['SG_PARTIDO'],
+        "medidas": ['TOTAL_CANDIDATOS', 'PARTICIPACAO'],
+    },
+    "indigenas_quilombolas_regiao": {
+        "insight": "6",
+        "funcao": _indigenas_quilombolas_regiao,
+        "entradas": ["candidatos_info_complementar", "dimensao_candidatos"],
+        "chaves": ['REGIAO'],
+        "medidas": ['NUM_CANDIDATOS', 'NUM_INDIGENAS', 'NUM_QUILOMBOLAS', 'PCT_INDIGENAS', 'PCT_QUILOMBOLAS'],
+    },
+    "redes_por_uf": {
+        "insight": "7",
+        "funcao": _redes_por_uf,
+        "entradas": ["redes_por_partido_uf"],
+        "chaves": ['SG_UF', 'TIPO_REDE'],
+        "medidas": ['NUM_CANDIDATOS', 'PARTICIPACAO'],
+        "cobertura": 'SG_UF',
+        "zeros": ['NUM_CANDIDATOS', 'PARTICIPACAO'],
+    },
+    "prefeitos_por_partido_uf": {
+        "insight": "9",
+        "funcao": _prefeitos_por_partido_uf,
+        "entradas": ["dimensao_candidatos"],
+        "chaves": ['SG_UF', 'SG_PARTIDO'],
+        "medidas": ['NUM_PREFEITOS', 'PARTICIPACAO'],
+        "cobertura": 'SG_UF',
+        "zeros": ['NUM_PREFEITOS', 'PARTICIPACAO'],
+    },
+}
+
+
+def resumir(nome, *entradas):
+    especificacao = RESUMOS_ANUAIS[nome]
+    resumo = especificacao["funcao"](*entradas)
+    colunas = especificacao["chaves"] + especificacao.get("rotulos", []) + especificacao["medidas"]
+    return resumo[colunas].reset_index(drop=True)
+
+
+def _dir_ano(ano, diretorio=DIR_COMPARATIVO):
+    return os.path.join(diretorio, f"ano={ano}")
+
+
+def carregar_resumos_ano(ano, impressoes, diretorio=DIR_COMPARATIVO):
+    # Resumos do ano já gravados com a mesma impressão das entradas
+    pasta = _dir_ano(ano, diretorio)
+    try:
+        with open(os.path.join(pasta, ARQUIVO_IMPRESSOES), encoding="utf-8") as arquivo:
+            gravadas = json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+    return {
+        nome: pd.read_parquet(os.path.join(pasta, f"{nome}.parquet"))
+        for nome, impressao in impressoes.items()
+        if gravadas.get(nome) == impressao and os.path.exists(os.path.join(pasta, f"{nome}.parquet"))
+    }
+
+
+def gravar_resumos_ano(ano, resumos, impressoes, diretorio=DIR_COMPARATIVO):
+    # As impressões vão por último: um resumo só conta como gravado depois
+    # que o Parquet correspondente está completo
+    pasta = _dir_ano(ano, diretorio)
+    os.makedirs(pasta, exist_ok=True)
+    for nome, resumo in resumos.items():
+        resumo.to_parquet(os.path.join(pasta, f"{nome}.parquet"), index=False)
+    caminho = os.path.join(pasta, ARQUIVO_IMPRESSOES)
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            gravadas = json.load(arquivo)
+    except (OSError, ValueError):
+        gravadas = {}
+    gravadas.update({nome: impressoes[nome] for nome in resumos})
+    gravar_json(caminho, gravadas, sort_keys=True)
+
+
+def _tendencia(valores):
+    # Inclinação da reta de mínimos quadrados (por ano), só com os anos que
+    # têm valor; None quando a linha tem menos de dois anos
+    anos = pd.Series(valores.columns.astype(float), index=valores.columns)
+    presentes = valores.notna()
+    quantidade = presentes.sum(axis=1)
+    media_anos = presentes.mul(anos, axis=1).sum(axis=1) / quantidade
+    desvios = presentes.mul(anos, axis=1).sub(media_anos, axis=0).where(presentes)
+    covariancia = (desvios * valores.sub(valores.mean(axis=1), axis=0)).sum(axis=1)
+    variancia = (desvios ** 2).sum(axis=1)
+    return (covariancia / variancia).where(quantidade >= 2)
+
+
+def comparar(nome, resumos_por_ano):
+    # resumos_por_ano: ano -> resumo de um ano; devolve uma linha por chave
+    # com os valores de cada ano, as variações entre anos consecutivos (e
+    # entre o primeiro e o último) e a tendência de cada medida
+    especificacao = RESUMOS_ANUAIS[nome]
+    chaves, rotulos, medidas = especificacao["chaves"], especificacao.get("rotulos", []), especificacao["medidas"]
+    anos = sorted(resumos_por_ano)
+    longo = pd.concat(
+        [resumo.assign(ANO=ano) for ano, resumo in resumos_por_ano.items()], ignore_index=True
+    )
+    # Categorias diferentes em cada ano: as chaves são comparadas como texto
+    longo[chaves] = longo[chaves].astype(object)
+    largo = longo.set_index(chaves + ['ANO'])[rotulos + medidas].unstack('ANO')
+    largo = largo.reindex(columns=pd.MultiIndex.from_product([rotulos + medidas, anos]))
+
+    cobertura = especificacao.get("cobertura")
+    cobertos = {
+        ano: set(resumo[cobertura].astype(object)) for ano, resumo in resumos_por_ano.items()
+    } if cobertura else {}
+
+    saida = {}
+    for rotulo in rotulos:
+        valores = largo[rotulo]
+        for ano in anos:
+            saida[f"{rotulo}_{ano}"] = valores[ano]
+        trocas = sum(
+            (valores[anterior].notna() & valores[ano].notna() & (valores[anterior] != valores[ano])).astype(int)
+            for anterior, ano in zip(anos, anos[1:])
+        )
+        saida[f"TROCAS_{rotulo}"] = trocas
+    for medida in medidas:
+        valores = largo[medida].astype(float)
+        if medida in especificacao.get("zeros", []):
+            for ano in anos:
+                coberto = largo.index.get_level_values(cobertura).isin(cobertos[ano])
+                valores[ano] = valores[ano].mask(coberto & valores[ano].isna(), 0.0)
+        for ano in anos:
+            saida[f"{medida}_{ano}"] = valores[ano]
+        for anterior, ano in zip(anos, anos[1:]):
+            saida[f"DELTA_{medida}_{anterior}_{ano}"] = valores[ano] - valores[anterior]
+        if len(anos) > 2:
+            saida[f"DELTA_{medida}_{anos[0]}_{anos[-1]}"] = valores[anos[-1]] - valores[anos[0]]
+        saida[f"TENDENCIA_{medida}"] = _tendencia(valores)
+    # Contagens voltam a inteiros (anulável) onde todos os valores são inteiros
+    return pd.DataFrame(saida, index=largo.index).reset_index().convert_dtypes()
+
+
+def gravar_comparacao(nome, comparacao, diretorio=DIR_COMPARATIVO):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"{nome}.csv")
+    comparacao.to_csv(caminho, index=False)
+    return caminho
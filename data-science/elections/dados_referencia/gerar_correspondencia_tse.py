@@ -0,0 +1,63 @@
+# Gera dados_referencia/municipios_tse_ibge.csv: a correspondência entre o
+# código de município do TSE (SG_UE) e o código IBGE da tabela
+# municipios.csv. Fonte: os próprios arquivos de candidaturas do TSE
+# (consulta_cand_<ano>_<UF>.csv, no portal de dados abertos do TSE), que
+# trazem SG_UF, SG_UE e NM_UE de todos os municípios com eleição. Cada
+# código do TSE é casado uma única vez por UF + nome sem acentos; a partir
+# daí o mapa localiza os municípios pelo código, mesmo que o nome mude de
+# grafia entre eleições. Os códigos sem correspondência são listados para
+# conferência manual.
+#
+# Uso (a partir de data-science/elections):
+#   python dados_referencia/gerar_correspondencia_tse.py data/candidatos/
+
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from municipios import (
+    CAMINHO_CORRESPONDENCIA_TSE, carregar_municipios, localizar_municipios, municipios_nao_localizados
+)
+from particoes import listar_particoes
+
+
+def municipios_tse(pasta):
+    partes = []
+    for particao in listar_particoes(pasta):
+        partes.append(pd.read_csv(
+            particao["caminho"], sep=';', encoding='latin1', usecols=['SG_UF', 'SG_UE', 'NM_UE'], dtype=str
+        ).drop_duplicates())
+    municipios = pd.concat(partes, ignore_index=True).drop_duplicates()
+    # Só códigos numéricos: eleições gerais usam a UF ou "BR" em SG_UE
+    return municipios[municipios['SG_UE'].str.fullmatch(r"\d+")]
+
+
+def main():
+    pasta = sys.argv[1]
+    chaves = municipios_tse(pasta)
+    localizados = localizar_municipios(chaves, carregar_municipios())
+    correspondencia = (
+        localizados.assign(CD_MUNICIPIO_TSE=localizados['SG_UE'].astype(int))
+        .drop_duplicates(['CD_MUNICIPIO_TSE', 'CD_MUNICIPIO_IBGE'])
+        .sort_values('CD_MUNICIPIO_TSE')
+    )
+    ambiguos = correspondencia[correspondencia.duplicated('CD_MUNICIPIO_TSE', keep=False)]
+    if not ambiguos.empty:
+        print(f"{ambiguos['CD_MUNICIPIO_TSE'].nunique()} códigos do TSE com mais de um município IBGE "
+              f"(descartados): {', '.join(map(str, sorted(ambiguos['CD_MUNICIPIO_TSE'].unique())))}")
+        correspondencia = correspondencia.drop(ambiguos.index)
+
+    correspondencia[['CD_MUNICIPIO_TSE', 'CD_MUNICIPIO_IBGE', 'SG_UF', 'NM_UE']].to_csv(
+        CAMINHO_CORRESPONDENCIA_TSE, index=False, lineterminator="\n"
+    )
+    print(f"{len(correspondencia)} municípios gravados em '{CAMINHO_CORRESPONDENCIA_TSE}'")
+    sem_correspondencia = municipios_nao_localizados(chaves, localizados)
+    if not sem_correspondencia.empty:
+        nomes = sorted(f"{nome}/{uf} ({codigo})" for codigo, uf, nome in sem_correspondencia.itertuples(index=False))
+        print(f"{len(nomes)} sem correspondência: {', '.join(nomes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Gera dados_referencia/municipios.csv: código IBGE, UF, nome e coordenadas
+# da sede de cada município. Fontes:
+#   - códigos IBGE por UF e nome: brutils/data/cities_code.json (pacote
+#     brutils no PyPI, licença MIT)
+#   - coordenadas: geonamescache/data/cities500.json (pacote geonamescache
+#     no PyPI, dados GeoNames, licença CC BY 4.0)
+# O casamento é por UF + nome sem acentos/pontuação, com o nome principal
+# do GeoNames tendo prioridade sobre os alternativos e, depois, a maior
+# população (a sede costuma ser a localidade mais populosa com o nome).
+#
+# Uso:
+#   pip download --no-deps brutils geonamescache -d /tmp/fontes
+#   (extraia os .whl em /tmp/fontes)
+#   python dados_referencia/gerar_municipios.py \
+#       /tmp/fontes/brutils/data/cities_code.json /tmp/fontes/geonamescache/data/cities500.json
+
+import os
+import re
+import csv
+import sys
+import json
+import unicodedata
+
+# Código admin1 do GeoNames para o Brasil -> UF
+ADMIN1_UF = {
+    "01": "AC", "02": "AL", "03": "AP", "04": "AM", "05": "BA", "06": "CE", "07": "DF", "08": "ES",
+    "11": "MS", "13": "MA", "14": "MT", "15": "MG", "16": "PA", "17": "PB", "18": "PR", "20": "PI",
+    "21": "RJ", "22": "RN", "23": "RS", "24": "RO", "25": "RR", "26": "SC", "27": "SP", "28": "SE",
+    "29": "GO", "30": "PE", "31": "TO",
+}
+
+# Grafias diferentes (ou nomes antigos) conferidas manualmente: nome no IBGE -> nome no GeoNames
+APELIDOS = {
+    ("PA", "eldorado do carajas"): "eldorado dos carajas",
+    ("PA", "santa izabel do para"): "santa isabel do para",
+    ("CE", "tururu"): "turaru",
+    ("RN", "januario cicco"): "boa saude",
+    ("PE", "lagoa de itaenga"): "lagoa do itaenga",
+    ("RJ", "trajano de moraes"): "trajano de morais",
+    ("SC", "presidente castello branco"): "presidente castelo branco",
+    ("RS", "dilermando de aguiar"): "dilermano de aguiar",
+    ("MT", "santo antonio de leverger"): "santo antonio do leverger",
+    ("PE", "iguaracy"): "iguaraci",
+    ("PE", "fernando de noronha"): "fernando de noronha (distrito estadual)",
+}
+
+# Localidades registradas no GeoNames com a UF errada (coordenadas conferidas
+# manualmente): nome no IBGE -> UF no GeoNames
+UF_GEONAMES = {
+    ("AL", "colonia leopoldina"): "PE",
+}
+
+DESTINO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "municipios.csv")
+
+
+def normalizar(nome):
+    nome = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii").lower()
+    return re.sub(r"[^a-z0-9]+", "", nome)
+
+
+def indexar_geonames(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        localidades = [c for c in json.load(arquivo).values() if c["countrycode"] == "BR"]
+    indice = {}
+    for localidade in localidades:
+        uf = ADMIN1_UF.get(localidade["admin1code"])
+        if uf is None:
+            continue
+        principal = normalizar(localidade["name"])
+        nomes = {principal} | {normalizar(nome) for nome in localidade["alternatenames"] if nome}
+        for nome in nomes:
+            prioridade = (nome == principal, localidade["population"])
+            if (uf, nome) not in indice or indice[(uf, nome)][0] < prioridade:
+                indice[(uf, nome)] = (prioridade, localidade)
+    return indice
+
+
+def main():
+    caminho_ibge, caminho_geonames = sys.argv[1:3]
+    with open(caminho_ibge, encoding="utf-8") as arquivo:
+        codigos_por_uf = json.load(arquivo)
+    indice = indexar_geonames(caminho_geonames)
+
+    linhas, sem_coordenadas = [], []
+    for uf, municipios in codigos_por_uf.items():
+        for nome, codigo in municipios.items():
+            chave = normalizar(APELIDOS.get((uf, nome), nome))
+            encontrado = indice.get((UF_GEONAMES.get((uf, nome), uf), chave))
+            if encontrado is None:
+                sem_coordenadas.append(f"{nome}/{uf}")
+                continue
+            localidade = encontrado[1]
+            # O nome com acentos vem do GeoNames quando é o mesmo município
+            nome_exibicao = localidade["name"] if normalizar(localidade["name"]) == normalizar(nome) else nome.title()
+            linhas.append((codigo, uf, nome_exibicao, round(localidade["latitude"], 5), round(localidade["longitude"], 5)))
+
+    linhas.sort()
+    with open(DESTINO, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo, lineterminator="\n")
+        escritor.writerow(["CD_MUNICIPIO_IBGE", "SG_UF", "NM_MUNICIPIO", "LATITUDE", "LONGITUDE"])
+        escritor.writerows(linhas)
+    print(f"{len(linhas)} municípios gravados em '{DESTINO}'")
+    if sem_coordenadas:
+        print(f"{len(sem_coordenadas)} sem coordenadas: {', '.join(sorted(sem_coordenadas))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,84 +1,231 @@
 # dashboard.py
 
+import os
+import shutil
 import streamlit as st
 import pandas as pd
-import os
 
-# Caminho completo para o mapa
-mapa_path = os.path.abspath("resultado_eleicoes_mapa.html")
+from functools import partial
+from arquivos import gravar_atomico
+from base_analitica import CAMINHO_BASE, abrir_base, agregar, valores_distintos
+
+# Caminho para a pasta de saída com os gráficos e tabelas
+output_path = "output/"
+
+# O mapa é servido como arquivo estático (server.enableStaticServing em
+# .streamlit/config.toml): o Streamlit publica a pasta static/ ao lado deste
+# script em app/static/, e o navegador baixa o HTML direto, sem passar pelo
+# websocket a cada rerun
+DIR_ESTATICO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ARQUIVO_MAPA = "resultado_eleicoes_mapa.html"
+
+# Seções do dashboard: gráfico, legenda e tabelas (rótulo, arquivo) de cada insight
+SECOES = [
+    {
+        "titulo": "Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos",
+        "aba": "Bens",
+        "imagem": "total_bens_prefeitos_eleitos.png",
+        "legenda": "Média de Bens Declarados pelos Prefeitos Eleitos e Não Eleitos",
+        "tabelas": [],
+    },
+    {
+        "titulo": "Insight 2: Coligações com Maior Número de Eleitos",
+        "aba": "Coligações",
+        "imagem": "coligacoes_eleitos.png",
+        "legenda": "Número de Eleitos por Coligação x Número de Partidos",
+        "tabelas": [],
+    },
+    {
+        "titulo": "Insight 3: Partido com Maior Quantidade de Candidatos por UF",
+        "aba": "Partidos por UF",
+        "imagem": "partido_maior_por_uf.png",
+        "legenda": "Partido com Maior Quantidade de Candidatos por UF",
+        "tabelas": [("Dados:", "maior_partido_por_uf.csv")],
+    },
+    {
+        "titulo": "Insight 4: Tendência Regional para Candidaturas por Partido",
+        "aba": "Regiões",
+        "imagem": "distribuicao_partido_regiao.png",
+        "legenda": "Distribuição de Candidaturas por Partido e Região",
+        "tabelas": [("Dados:", "distribuicao_partido_regiao.csv")],
+    },
+    {
+        "titulo": "Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)",
+        "aba": "Partido dominante",
+        "imagem": "partido_dominante_por_uf.png",
+        "legenda": "Partido Dominante por UF",
+        "tabelas": [("Dados:", "partido_dominante_uf.csv")],
+    },
+    {
+        "titulo": "Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região",
+        "aba": "Indígenas e quilombolas",
+        "imagem": "indigenas_quilombolas_regiao.png",
+        "legenda": "Número de Candidatos Indígenas e Quilombolas por Região",
+        "tabelas": [
+            ("Candidatos Indígenas por Região:", "indigenas_por_regiao.csv"),
+            ("Candidatos Quilombolas por Região:", "quilombolas_por_regiao.csv"),
+        ],
+    },
+    {
+        "titulo": "Insight 7: Rede Social Preferida dos Candidatos por Partido e UF",
+        "aba": "Redes sociais",
+        "imagem": "rede_social_uf.png",
+        "legenda": "Rede Social Preferida por UF",
+        "tabelas": [("Dados:", "redes_por_partido_uf.csv")],
+    },
+    {
+        "titulo": "Insight 8: Principais Termos nas Propostas de Governo",
+        "aba": "Propostas",
+        "imagem": "nuvem_termos_propostas.png",
+        "legenda": "Nuvem de Palavras das Propostas de Governo",
+        "tabelas": [("Dados:", "termos_propostas.csv")],
+    },
+]
+
+# Filtros da aba de exploração: coluna da base analítica -> rótulo
+FILTROS_BASE = {
+    "sg_uf": "UF",
+    "regiao": "Região",
+    "sg_partido": "Partido",
+    "ds_cargo": "Cargo",
+    "ds_sit_tot_turno": "Situação",
+}
+
+
+def versao_arquivo(caminho):
+    # mtime em nanossegundos: entra na chave do cache, então um artefato
+    # regravado pelo pipeline é relido no próximo rerun
+    try:
+        return os.stat(caminho).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# O cache é compartilhado entre as sessões: com vários usuários, cada versão
+# de um artefato é lida do disco uma única vez
+@st.cache_data(max_entries=64, show_spinner=False)
+def ler_csv(caminho, versao):
+    return pd.read_csv(caminho)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def ler_imagem(caminho, versao):
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def publicar_mapa(caminho, versao):
+    # Copia o mapa para static/ uma vez por versão; a troca atômica evita
+    # que outra sessão baixe um arquivo pela metade
+    gravar_atomico(os.path.join(DIR_ESTATICO, ARQUIVO_MAPA), partial(shutil.copyfile, caminho))
+    return f"app/static/{ARQUIVO_MAPA}?v={versao}"
+
+
+# Consultas à base analítica, em cache pela versão (mtime) da base: o mesmo
+# conjunto de filtros não volta ao SQLite enquanto o pipeline não publicar
+@st.cache_data(max_entries=256, show_spinner=False)
+def consultar_base(tabela, grupos, medidas, filtros, versao):
+    conexao = abrir_base(CAMINHO_BASE)
+    try:
+        return agregar(conexao, tabela, grupos, medidas, filtros)
+    finally:
+        conexao.close()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def opcoes_filtro(coluna, versao):
+    conexao = abrir_base(CAMINHO_BASE)
+    try:
+        return valores_distintos(conexao, "cubo_candidatos", coluna)
+    finally:
+        conexao.close()
+
+
+def mostrar_secao(secao):
+    st.subheader(secao["titulo"])
+    caminho_imagem = os.path.join(output_path, secao["imagem"])
+    versao = versao_arquivo(caminho_imagem)
+    if versao is None:
+        st.info(f"Gráfico '{secao['imagem']}' ainda não foi gerado. Execute analise_eleitoral.py.")
+    else:
+        st.image(ler_imagem(caminho_imagem, versao), caption=secao["legenda"])
+
+    for rotulo, arquivo in secao["tabelas"]:
+        caminho_tabela = os.path.join(output_path, arquivo)
+        versao = versao_arquivo(caminho_tabela)
+        if versao is None:
+            st.info(f"Tabela '{arquivo}' ainda não foi gerada.")
+            continue
+        st.write(rotulo)
+        st.dataframe(ler_csv(caminho_tabela, versao))
+
+
+def mostrar_mapa():
+    st.subheader("Insight 9: Mapeamento do Resultado das Eleições com Folium")
+    caminho_mapa = os.path.join(output_path, ARQUIVO_MAPA)
+    versao = versao_arquivo(caminho_mapa)
+    if versao is None:
+        st.info("Mapa ainda não foi gerado. Execute analise_eleitoral.py.")
+        return
+    url_mapa = publicar_mapa(caminho_mapa, versao)
+    st.write(f"Clique no link abaixo para visualizar o mapa dos resultados das eleições: [abrir mapa]({url_mapa})")
+    st.iframe(url_mapa, height=600)
+    st.write("Este mapa interativo exibe o partido vencedor em cada município, colorido de acordo com a legenda.")
+
+
+def mostrar_exploracao():
+    st.subheader("Explorar candidaturas por UF, região, partido, cargo e situação")
+    versao = versao_arquivo(CAMINHO_BASE)
+    if versao is None:
+        st.info("Base analítica ainda não foi gerada. Execute analise_eleitoral.py (etapa 'base').")
+        return
+
+    filtros = {}
+    for coluna_tela, (coluna, rotulo) in zip(st.columns(len(FILTROS_BASE)), FILTROS_BASE.items()):
+        with coluna_tela:
+            filtros[coluna] = st.multiselect(rotulo, opcoes_filtro(coluna, versao), key=f"filtro_{coluna}")
+
+    por_partido = consultar_base("cubo_candidatos", ["sg_partido"], ["num_candidatos"], filtros, versao)
+    st.write("Candidaturas por partido:")
+    st.bar_chart(por_partido, x="sg_partido", y="num_candidatos")
+
+    st.write("Candidaturas por UF e partido:")
+    st.dataframe(consultar_base("cubo_candidatos", ["sg_uf", "sg_partido"], ["num_candidatos"], filtros, versao))
+
+    st.write("Bens declarados por situação:")
+    st.dataframe(consultar_base(
+        "candidatos", ["ds_sit_tot_turno"], ["num_candidatos", "num_com_bens", "media_bens"], filtros, versao
+    ))
+
+    # A contagem de redes sociais só tem UF (e região)
+    st.write("Rede social preferida (filtros de UF e região):")
+    st.dataframe(consultar_base("redes_por_uf", ["tipo_rede"], ["num_candidatos"], filtros, versao))
+
 
 # Configuração do título e introdução do dashboard
 st.title("Dashboard de Análise das Eleições Municipais 2024")
 st.write("Este dashboard apresenta uma análise dos dados das eleições municipais de 2024, "
          "incluindo insights sobre poder econômico, coligações, redes sociais e propostas de governo.")
 
-# Caminho para a pasta de saída com os gráficos e tabelas
-output_path = "output/"
-
-# Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos
-st.subheader("Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos")
-st.image(output_path + "total_bens_prefeitos_eleitos.png", caption="Média de Bens Declarados pelos Prefeitos Eleitos e Não Eleitos")
-
-# Insight 2: Coligações com Maior Número de Eleitos
-st.subheader("Insight 2: Coligações com Maior Número de Eleitos")
-st.image(output_path + "coligacoes_eleitos.png", caption="Número de Eleitos por Coligação x Número de Partidos")
-
-# Insight 3: Partido com Maior Quantidade de Candidatos por UF
-st.subheader("Insight 3: Partido com Maior Quantidade de Candidatos por UF")
-st.image(output_path + "partido_maior_por_uf.png", caption="Partido com Maior Quantidade de Candidatos por UF")
-st.write("Dados:")
-maior_partido_por_uf = pd.read_csv(output_path + "maior_partido_por_uf.csv")
-st.dataframe(maior_partido_por_uf)
-
-# Insight 4: Tendência Regional para Candidaturas por Partido
-st.subheader("Insight 4: Tendência Regional para Candidaturas por Partido")
-st.image(output_path + "distribuicao_partido_regiao.png", caption="Distribuição de Candidaturas por Partido e Região")
-st.write("Dados:")
-candidatos_por_regiao = pd.read_csv(output_path + "distribuicao_partido_regiao.csv")
-st.dataframe(candidatos_por_regiao)
-
-# Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)
-st.subheader("Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)")
-st.image(output_path + "partido_dominante_por_uf.png", caption="Partido Dominante por UF")
-st.write("Dados:")
-partido_dominante_uf = pd.read_csv(output_path + "partido_dominante_uf.csv")
-st.dataframe(partido_dominante_uf)
-
-# Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região
-st.subheader("Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região")
-st.image(output_path + "indigenas_quilombolas_regiao.png", caption="Número de Candidatos Indígenas e Quilombolas por Região")
-st.write("Dados:")
-indigenas_por_regiao = pd.read_csv(output_path + "indigenas_por_regiao.csv")
-quilombolas_por_regiao = pd.read_csv(output_path + "quilombolas_por_regiao.csv")
-st.write("Candidatos Indígenas por Região:")
-st.dataframe(indigenas_por_regiao)
-st.write("Candidatos Quilombolas por Região:")
-st.dataframe(quilombolas_por_regiao)
-
-# Insight 7: Rede Social Preferida dos Candidatos por Partido e UF
-st.subheader("Insight 7: Rede Social Preferida dos Candidatos por Partido e UF")
-st.image(output_path + "rede_social_uf.png", caption="Rede Social Preferida por UF")
-st.write("Dados:")
-redes_por_partido_uf = pd.read_csv(output_path + "redes_por_partido_uf.csv")
-st.dataframe(redes_por_partido_uf)
-
-# Insight 8: Principais Termos nas Propostas de Governo
-st.subheader("Insight 8: Principais Termos nas Propostas de Governo")
-st.image(output_path + "nuvem_termos_propostas.png", caption="Nuvem de Palavras das Propostas de Governo")
-st.write("Dados:")
-termos_propostas = pd.read_csv(output_path + "termos_propostas.csv")
-st.dataframe(termos_propostas)
-
-# Insight 9: Mapeamento do Resultado das Eleições com Folium
-st.subheader("Insight 9: Mapeamento do Resultado das Eleições com Folium")
-st.write("Clique no link abaixo para visualizar o mapa dos resultados das eleições:")
-# Lê o conteúdo do arquivo HTML e incorpora no Streamlit
-with open("output/resultado_eleicoes_mapa.html", "r", encoding="utf-8") as file:
-    mapa_html = file.read()
-
-st.components.v1.html(mapa_html, height=600, scrolling=True)
-
-st.write("Este mapa interativo exibe o partido vencedor em cada município, colorido de acordo com a legenda.")
+with st.sidebar:
+    if st.button("Recarregar artefatos"):
+        # Invalidação explícita, para arquivos trocados sem mudar o mtime
+        ler_csv.clear()
+        ler_imagem.clear()
+        publicar_mapa.clear()
+        consultar_base.clear()
+        opcoes_filtro.clear()
+
+# Abas com execução preguiçosa: só a aba selecionada lê seus arquivos
+conteudos = {secao["aba"]: partial(mostrar_secao, secao) for secao in SECOES}
+conteudos["Mapa"] = mostrar_mapa
+conteudos["Explorar"] = mostrar_exploracao
+abas = st.tabs(list(conteudos), key="secao", on_change="rerun")
+for aba, mostrar in zip(abas, conteudos.values()):
+    if aba.open:
+        with aba:
+            mostrar()
 
 # Rodapé
 st.write("Fonte: Dados das Eleições 2024")
@@ -0,0 +1,40 @@
+import pandas as pd
+
+# Dimensão de candidatos: uma linha por SQ_CANDIDATO, indexada e ordenada
+# pela chave, com a situação final (linha do último turno). Os demais
+# conjuntos do TSE (bens, informações complementares, redes sociais) se
+# ligam a ela por SQ_CANDIDATO com join pelo índice, e as coligações por
+# SQ_COLIGACAO, sem merges repetidos sobre a tabela bruta de candidatos.
+COLUNAS_DIMENSAO_CANDIDATOS = [
+    'SG_UF', 'SG_UE', 'NM_UE', 'DS_CARGO', 'NM_CANDIDATO', 'SG_PARTIDO', 'SQ_COLIGACAO', 'DS_SIT_TOT_TURNO', 'NR_TURNO'
+]
+
+
+def montar_dimensao_candidatos(dados_candidatos):
+    colunas = [coluna for coluna in COLUNAS_DIMENSAO_CANDIDATOS if coluna in dados_candidatos.columns]
+    candidatos = dados_candidatos[['SQ_CANDIDATO'] + colunas]
+    if 'NR_TURNO' in candidatos.columns:
+        # Ordenação estável: empates de turno mantêm a ordem dos arquivos
+        candidatos = candidatos.sort_values('NR_TURNO', kind='stable')
+    dimensao = candidatos.drop_duplicates('SQ_CANDIDATO', keep='last').set_index('SQ_CANDIDATO')
+    return dimensao.sort_index()
+
+
+def filtrar_candidatos(dimensao, cargo=None, situacao=None):
+    # Comparação sem distinção de maiúsculas, como nos insights
+    mascara = pd.Series(True, index=dimensao.index)
+    if cargo is not None:
+        mascara &= dimensao['DS_CARGO'].str.lower() == cargo
+    if situacao is not None:
+        mascara &= dimensao['DS_SIT_TOT_TURNO'].str.lower() == situacao
+    return dimensao[mascara]
+
+
+def juntar_candidatos(df, dimensao, colunas, how='inner'):
+    # Join pelo índice único da dimensão: cada linha de df recebe no máximo
+    # uma linha de candidato, então o número de linhas nunca cresce
+    return df.join(dimensao[colunas], on='SQ_CANDIDATO', how=how)
+
+
+def total_por_candidato(df, coluna):
+    return df.groupby('SQ_CANDIDATO')[coluna].sum()
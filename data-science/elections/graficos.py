@@ -0,0 +1,277 @@
+import os
+import json
+import hashlib
+import threading
+import time
+import multiprocessing
+import pandas as pd
+
+from functools import lru_cache
+from importlib.metadata import version
+from concurrent.futures import ProcessPoolExecutor
+
+from arquivos import gravar_json
+from cache_dados import CACHE_DIR
+from instrumentacao import avisar, instante, registrar_medicao
+
+# Renderização dos gráficos dos insights. Cada figura é montada pela API
+# orientada a objetos (Figure + canvas Agg), sem o estado global do pyplot,
+# em um pool de processos. Um gráfico só é redesenhado quando o hash dos
+# dados agregados que o alimentam muda (ou quando o PNG sumiu). matplotlib,
+# seaborn e wordcloud são importados dentro das funções de desenho: só quem
+# desenha paga pela importação.
+CAMINHO_MANIFESTO_GRAFICOS = os.path.join(CACHE_DIR, "graficos.json")
+
+# Incremente ao mudar o desenho de qualquer gráfico para invalidar o cache
+VERSAO_GRAFICOS = 1
+
+
+def _total_bens_prefeitos(fig, dados):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=dados, x='NM_CANDIDATO', y='VR_BEM_CANDIDATO', color='blue', ax=ax)
+    ax.set_title("Top 10 Prefeitos Eleitos com Maior Total de Bens Declarados")
+    ax.set_xlabel("Nome do Candidato")
+    ax.set_ylabel("Total de Bens Declarados (R$)")
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+
+
+def _coligacoes_eleitos(fig, dados):
+    import seaborn as sns
+    import matplotlib.ticker as mticker
+
+    ax = fig.subplots()
+    sns.scatterplot(
+        data=dados,
+        x='NUMERO_PARTIDOS',
+        y='NUM_ELEITOS',
+        size='NUM_ELEITOS',
+        hue='SG_UF_x',
+        sizes=(40, 400),
+        alpha=0.7,
+        legend='full',
+        ax=ax
+    )
+    ax.set_title("Coligações: Número de Eleitos por Número de Partidos e UF")
+    ax.set_xlabel("Número de Partidos na Coligação")
+    ax.set_ylabel("Número de Eleitos")
+    ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+
+
+def _partido_maior_por_uf(fig, dados):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=dados, y='SG_UF', x='NUM_CANDIDATOS', hue='SG_PARTIDO', dodge=False, ax=ax)
+    ax.set_title("Partido com Maior Quantidade de Candidatos por UF")
+    ax.set_xlabel("Número de Candidatos")
+    ax.set_ylabel("UF")
+    ax.legend(title="Partido")
+
+
+def _distribuicao_partido_regiao(fig, dados):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=dados, x='REGIAO', y='NUM_CANDIDATOS', hue='SG_PARTIDO', ax=ax)
+    ax.set_title("Distribuição de Candidaturas por Partido e Região")
+    ax.set_xlabel("Região")
+    ax.set_ylabel("Número de Candidatos")
+    ax.legend(title="Partido", bbox_to_anchor=(1.05, 1), loc='upper left')
+
+
+def _partido_dominante_por_uf(fig, dados):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=dados, y='SG_UF', x='TOTAL_CANDIDATOS', hue='SG_PARTIDO', dodge=False, ax=ax)
+    ax.set_title("Partido Dominante por UF (Prefeito, Vice e Vereadores)")
+    ax.set_xlabel("Total de Candidatos")
+    ax.set_ylabel("UF")
+    ax.legend(title="Partido")
+
+
+def _indigenas_quilombolas_regiao(fig, dados):
+    import seaborn as sns
+
+    indigenas_por_regiao, quilombolas_por_regiao = dados
+    ax = fig.subplots(1, 2)
+    sns.barplot(data=indigenas_por_regiao, x='REGIAO', y='NUM_INDIGENAS', ax=ax[0], palette="Blues")
+    ax[0].set_title("Número de Candidatos Indígenas por Região")
+
+    sns.barplot(data=quilombolas_por_regiao, x='REGIAO', y='NUM_QUILOMBOLAS', ax=ax[1], palette="Greens")
+    ax[1].set_title("Número de Candidatos Quilombolas por Região")
+    fig.tight_layout()
+
+
+def _rede_social_uf(fig, dados):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=dados, x='SG_UF', y='NUM_CANDIDATOS', hue='TIPO_REDE',
+                order=sorted(dados['SG_UF'].dropna().unique()), ax=ax)
+    ax.set_title("Rede Social Preferida dos Candidatos por UF")
+    ax.set_xlabel("UF")
+    ax.set_ylabel("Número de Candidatos")
+    ax.legend(title="Rede Social", bbox_to_anchor=(1.05, 1), loc='upper left')
+
+
+def _nuvem_termos_propostas(fig, dados):
+    # A nuvem também é gerada no worker: é a parte mais lenta do gráfico
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(dados))
+    ax = fig.subplots()
+    ax.imshow(wordcloud.to_array(), interpolation='bilinear')
+    ax.axis('off')
+    ax.set_title("Principais Termos nas Propostas de Governo")
+
+
+GRAFICOS = {
+    "total_bens_prefeitos_eleitos": {
+        "funcao": _total_bens_prefeitos, "arquivo": "output/total_bens_prefeitos_eleitos.png", "tamanho": (12, 8),
+    },
+    "coligacoes_eleitos": {
+        "funcao": _coligacoes_eleitos, "arquivo": "output/coligacoes_eleitos.png", "tamanho": (14, 8),
+    },
+    "partido_maior_por_uf": {
+        "funcao": _partido_maior_por_uf, "arquivo": "output/partido_maior_por_uf.png", "tamanho": (10, 8),
+    },
+    "distribuicao_partido_regiao": {
+        "funcao": _distribuicao_partido_regiao, "arquivo": "output/distribuicao_partido_regiao.png", "tamanho": (12, 6),
+    },
+    "partido_dominante_por_uf": {
+        "funcao": _partido_dominante_por_uf, "arquivo": "output/partido_dominante_por_uf.png", "tamanho": (10, 8),
+    },
+    "indigenas_quilombolas_regiao": {
+        "funcao": _indigenas_quilombolas_regiao, "arquivo": "output/indigenas_quilombolas_regiao.png", "tamanho": (14, 6),
+    },
+    "rede_social_uf": {
+        "funcao": _rede_social_uf, "arquivo": "output/rede_social_uf.png", "tamanho": (12, 6),
+    },
+    "nuvem_termos_propostas": {
+        "funcao": _nuvem_termos_propostas, "arquivo": "output/nuvem_termos_propostas.png", "tamanho": (10, 5),
+    },
+}
+
+
+def renderizar(nome, dados):
+    # Devolve o tempo de desenho, registrado no relatório de execução
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    inicio = time.perf_counter()
+    grafico = GRAFICOS[nome]
+    fig = Figure(figsize=grafico["tamanho"])
+    FigureCanvasAgg(fig)
+    grafico["funcao"](fig, dados)
+    fig.savefig(grafico["arquivo"])
+    return time.perf_counter() - inicio
+
+
+@lru_cache(maxsize=1)
+def _versoes_bibliotecas():
+    # Pelos metadados instalados: o processo principal não importa matplotlib
+    # nem seaborn só para calcular o hash
+    return f"{version('matplotlib')}:{version('seaborn')}"
+
+
+def hash_dados(nome, dados):
+    # DataFrames pelo conteúdo, nomes e tipos das colunas; listas/tuplas
+    # (nuvem de termos, pares de DataFrames) item a item
+    digest = hashlib.sha256(f"{nome}:{VERSAO_GRAFICOS}:{_versoes_bibliotecas()}".encode())
+
+    def alimentar(valor):
+        if isinstance(valor, pd.DataFrame):
+            digest.update(repr([(str(coluna), str(tipo)) for coluna, tipo in valor.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(valor, index=False).values.tobytes())
+        elif isinstance(valor, (list, tuple)):
+            digest.update(f"[{len(valor)}]".encode())
+            for item in valor:
+                alimentar(item)
+        else:
+            digest.update(json.dumps(valor, ensure_ascii=False, default=str).encode())
+
+    alimentar(dados)
+    return digest.hexdigest()
+
+
+def _ler_manifesto(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_estado = {"pool": None, "pendentes": {}, "manifesto": None, "recriar": False, "processos": None}
+_trava = threading.Lock()
+
+
+def configurar_renderizacao(processos=None, recriar=False):
+    _estado["processos"] = processos
+    _estado["recriar"] = recriar
+
+
+def agendar_grafico(nome, dados):
+    # Chamado pelos insights (possivelmente de várias threads): só envia ao
+    # pool os gráficos cujo hash de entrada mudou desde o último desenho
+    chave = hash_dados(nome, dados)
+    with _trava:
+        if _estado["manifesto"] is None:
+            _estado["manifesto"] = _ler_manifesto(CAMINHO_MANIFESTO_GRAFICOS)
+        if (not _estado["recriar"] and _estado["manifesto"].get(nome) == chave
+                and os.path.exists(GRAFICOS[nome]["arquivo"])):
+            print(f"Gráfico '{nome}' sem mudanças nos dados; mantido o PNG existente.")
+            return
+        if _estado["processos"] == 0:
+            # Sem pool: desenha na própria thread (benchmarks e depuração)
+            inicio = instante()
+            registrar_medicao(f"grafico_{nome}", {
+                "status": "executada", "inicio": inicio, "segundos": round(renderizar(nome, dados), 4)
+            })
+            _estado["manifesto"][nome] = chave
+            gravar_json(CAMINHO_MANIFESTO_GRAFICOS, _estado["manifesto"], sort_keys=True)
+            return
+        if _estado["pool"] is None:
+            # spawn: os workers importam só este módulo, e o processo pai
+            # tem threads ativas (não é seguro usar fork)
+            _estado["pool"] = ProcessPoolExecutor(
+                max_workers=_estado["processos"] or min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        _estado["pendentes"][_estado["pool"].submit(renderizar, nome, dados)] = (nome, chave)
+
+
+def aguardar_graficos():
+    # Devolve os nomes dos gráficos que falharam: o PNG anterior continua em
+    # output/ e a etapa dona dele não pode ser registrada como em dia
+    with _trava:
+        pool, pendentes = _estado["pool"], _estado["pendentes"]
+        _estado["pool"], _estado["pendentes"] = None, {}
+    if pool is None:
+        return []
+
+    manifesto = _estado["manifesto"]
+    renderizados, falhas = 0, []
+    for futuro, (nome, chave) in pendentes.items():
+        try:
+            # Medido no worker; "inicio" aqui é quando o resultado foi coletado
+            registrar_medicao(f"grafico_{nome}", {
+                "status": "executada", "inicio": instante(), "segundos": round(futuro.result(), 4)
+            })
+            manifesto[nome] = chave
+            renderizados += 1
+        except Exception as e:
+            avisar(f"Erro ao renderizar o gráfico '{nome}': {e}")
+            registrar_medicao(f"grafico_{nome}", {
+                "status": "erro", "inicio": instante(), "erro": {"tipo": type(e).__name__, "mensagem": str(e)}
+            })
+            manifesto.pop(nome, None)
+            falhas.append(nome)
+    pool.shutdown()
+    gravar_json(CAMINHO_MANIFESTO_GRAFICOS, manifesto, sort_keys=True)
+    print(f"Gráficos: {renderizados} renderizados, {len(falhas)} com erro")
+    return falhas
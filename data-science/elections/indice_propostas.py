@@ -0,0 +1,252 @@
+import os
+import re
+import math
+import sqlite3
+import hashlib
+import argparse
+import pandas as pd
+
+from cache_propostas import abrir_cache_propostas, hash_pdf, buscar_extracao
+
+# Índice invertido persistente das propostas de governo: termo -> documentos
+# (com frequência), e cada documento ligado ao candidato, partido, UF e cargo.
+# É alimentado pelas contagens do cache de extração (cache_propostas), então
+# atualizar o índice não reabre PDFs já processados.
+CAMINHO_INDICE = os.path.join("output", "indice_propostas.sqlite")
+
+# Grupos aceitos nas consultas, mapeados para colunas da tabela documentos
+GRUPOS = {"partido": "sg_partido", "uf": "sg_uf", "cargo": "ds_cargo"}
+
+PADRAO_SQ_CANDIDATO = re.compile(r"(\d{10,})")
+
+
+def abrir_indice(caminho=CAMINHO_INDICE):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (
+            chave TEXT PRIMARY KEY,
+            valor TEXT
+        );
+        CREATE TABLE IF NOT EXISTS documentos (
+            doc_id INTEGER PRIMARY KEY,
+            arquivo TEXT NOT NULL UNIQUE,
+            sha256 TEXT NOT NULL,
+            sq_candidato INTEGER,
+            sg_partido TEXT,
+            sg_uf TEXT,
+            ds_cargo TEXT,
+            total_termos INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS termos (
+            termo_id INTEGER PRIMARY KEY,
+            termo TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            termo_id INTEGER NOT NULL,
+            doc_id INTEGER NOT NULL,
+            frequencia INTEGER NOT NULL,
+            PRIMARY KEY (termo_id, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+        CREATE INDEX IF NOT EXISTS idx_documentos_partido ON documentos (sg_partido);
+        CREATE INDEX IF NOT EXISTS idx_documentos_uf ON documentos (sg_uf);
+        CREATE INDEX IF NOT EXISTS idx_documentos_cargo ON documentos (ds_cargo);
+        CREATE INDEX IF NOT EXISTS idx_documentos_candidato ON documentos (sq_candidato);
+    """)
+    return conexao
+
+
+def _assinatura_stop_words(stop_words):
+    return hashlib.sha256("\n".join(sorted(stop_words)).encode("utf-8")).hexdigest()
+
+
+def _remover_documento(conexao, doc_id):
+    conexao.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+    conexao.execute("DELETE FROM documentos WHERE doc_id = ?", (doc_id,))
+
+
+def _ids_termos(conexao, termos):
+    conexao.executemany("INSERT OR IGNORE INTO termos (termo) VALUES (?)", ((termo,) for termo in termos))
+    ids = {}
+    termos = list(termos)
+    # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+    for inicio in range(0, len(termos), 500):
+        bloco = termos[inicio:inicio + 500]
+        marcadores = ",".join("?" * len(bloco))
+        ids.update(conexao.execute(
+            f"SELECT termo, termo_id FROM termos WHERE termo IN ({marcadores})", bloco
+        ).fetchall())
+    return ids
+
+
+def _metadados_candidatos(dados_candidatos):
+    if dados_candidatos is None or dados_candidatos.empty:
+        return {}
+    colunas = ['SQ_CANDIDATO', 'SG_PARTIDO', 'SG_UF', 'DS_CARGO']
+    candidatos = dados_candidatos[colunas].drop_duplicates('SQ_CANDIDATO', keep='last')
+    return {
+        int(linha.SQ_CANDIDATO): (str(linha.SG_PARTIDO), str(linha.SG_UF), str(linha.DS_CARGO))
+        for linha in candidatos.itertuples(index=False)
+    }
+
+
+def sq_candidato_do_arquivo(file_name):
+    encontrado = PADRAO_SQ_CANDIDATO.search(file_name)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def atualizar_indice(path_propostas, stop_words, dados_candidatos=None, caminho=CAMINHO_INDICE):
+    # Incremental: documentos novos ou com hash diferente são (re)indexados,
+    # documentos que sumiram da pasta são removidos e os demais só têm os
+    # metadados de candidato atualizados. Uma lista de stop words diferente
+    # da usada na construção força a reconstrução completa.
+    arquivos = sorted(file_name for file_name in os.listdir(path_propostas) if file_name.endswith(".pdf"))
+    candidatos = _metadados_candidatos(dados_candidatos)
+    assinatura = _assinatura_stop_words(stop_words)
+
+    conexao = abrir_indice(caminho)
+    cache = abrir_cache_propostas()
+    try:
+        linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'stop_words'").fetchone()
+        if linha is None or linha[0] != assinatura:
+            conexao.executescript("DELETE FROM postings; DELETE FROM documentos; DELETE FROM termos;")
+            conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('stop_words', ?)", (assinatura,))
+
+        existentes = {
+            arquivo: (doc_id, sha256)
+            for doc_id, arquivo, sha256 in conexao.execute("SELECT doc_id, arquivo, sha256 FROM documentos")
+        }
+        for arquivo in set(existentes) - set(arquivos):
+            _remover_documento(conexao, existentes[arquivo][0])
+
+        indexados = sem_extracao = 0
+        for file_name in arquivos:
+            sha256 = hash_pdf(cache, os.path.join(path_propostas, file_name))
+            sq_candidato = sq_candidato_do_arquivo(file_name)
+            partido, uf, cargo = candidatos.get(sq_candidato, (None, None, None))
+
+            if file_name in existentes:
+                doc_id, sha_indexado = existentes[file_name]
+                if sha_indexado == sha256:
+                    if not candidatos:
+                        continue
+                    conexao.execute(
+                        "UPDATE documentos SET sq_candidato = ?, sg_partido = ?, sg_uf = ?, ds_cargo = ? WHERE doc_id = ?",
+                        (sq_candidato, partido, uf, cargo, doc_id)
+                    )
+                    continue
+                _remover_documento(conexao, doc_id)
+
+            extracao = buscar_extracao(cache, sha256)
+            if extracao is None or extracao[0] != "ok":
+                sem_extracao += 1
+                continue
+            termos = {termo: frequencia for termo, frequencia in extracao[1].items() if termo not in stop_words}
+
+            cursor = conexao.execute(
+                "INSERT INTO documentos (arquivo, sha256, sq_candidato, sg_partido, sg_uf, ds_cargo, total_termos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_name, sha256, sq_candidato, partido, uf, cargo, sum(termos.values()))
+            )
+            ids = _ids_termos(conexao, termos)
+            conexao.executemany(
+                "INSERT INTO postings (termo_id, doc_id, frequencia) VALUES (?, ?, ?)",
+                ((ids[termo], cursor.lastrowid, frequencia) for termo, frequencia in termos.items())
+            )
+            indexados += 1
+
+        conexao.commit()
+        cache.commit()
+        total = conexao.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+    finally:
+        cache.close()
+        conexao.close()
+
+    print(f"Índice de propostas: {indexados} documentos indexados, {sem_extracao} sem extração válida, "
+          f"{total} documentos no índice")
+
+
+def _filtros_sql(partido=None, uf=None, cargo=None):
+    condicoes, parametros = [], []
+    for coluna, valor in (("sg_partido", partido), ("sg_uf", uf), ("ds_cargo", cargo)):
+        if valor is not None:
+            condicoes.append(f"d.{coluna} = ?")
+            parametros.append(valor)
+    return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+
+def top_termos(conexao, k=10, partido=None, uf=None, cargo=None):
+    where, parametros = _filtros_sql(partido, uf, cargo)
+    return pd.read_sql_query(
+        "SELECT t.termo AS Termo, SUM(p.frequencia) AS Frequência "
+        "FROM postings p JOIN documentos d ON d.doc_id = p.doc_id JOIN termos t ON t.termo_id = p.termo_id"
+        f"{where} GROUP BY p.termo_id ORDER BY Frequência DESC, t.termo LIMIT ?",
+        conexao, params=parametros + [k]
+    )
+
+
+def documentos_com_termo(conexao, termo, k=10, partido=None, uf=None, cargo=None):
+    where, parametros = _filtros_sql(partido, uf, cargo)
+    where = (where + " AND" if where else " WHERE") + " t.termo = ?"
+    return pd.read_sql_query(
+        "SELECT d.arquivo, d.sq_candidato, d.sg_partido, d.sg_uf, d.ds_cargo, p.frequencia "
+        "FROM termos t JOIN postings p ON p.termo_id = t.termo_id JOIN documentos d ON d.doc_id = p.doc_id"
+        f"{where} ORDER BY p.frequencia DESC LIMIT ?",
+        conexao, params=parametros + [termo, k]
+    )
+
+
+def tfidf_por_grupo(conexao, grupo="partido", k=10, partido=None, uf=None, cargo=None):
+    # Cada grupo (partido, UF ou cargo) é tratado como um documento:
+    # tf = frequência do termo no grupo / total de termos do grupo
+    # idf = log(número de grupos / grupos em que o termo aparece)
+    coluna = GRUPOS[grupo]
+    where, parametros = _filtros_sql(partido, uf, cargo)
+    contagens = pd.read_sql_query(
+        f"SELECT d.{coluna} AS grupo, t.termo AS termo, SUM(p.frequencia) AS frequencia "
+        "FROM postings p JOIN documentos d ON d.doc_id = p.doc_id JOIN termos t ON t.termo_id = p.termo_id"
+        f"{where} GROUP BY d.{coluna}, p.termo_id",
+        conexao, params=parametros
+    ).dropna(subset=["grupo"])
+    if contagens.empty:
+        return contagens.assign(tfidf=pd.Series(dtype=float))
+
+    num_grupos = contagens["grupo"].nunique()
+    contagens["tf"] = contagens["frequencia"] / contagens.groupby("grupo")["frequencia"].transform("sum")
+    grupos_por_termo = contagens.groupby("termo")["grupo"].transform("nunique")
+    contagens["tfidf"] = contagens["tf"] * (grupos_por_termo.rdiv(num_grupos)).map(math.log)
+    contagens = contagens.sort_values(["grupo", "tfidf", "termo"], ascending=[True, False, True])
+    return contagens.groupby("grupo").head(k)[["grupo", "termo", "frequencia", "tfidf"]].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas ao índice de termos das propostas de governo")
+    parser.add_argument("consulta", choices=["top", "tfidf", "documentos"])
+    parser.add_argument("--termo", help="Termo procurado (consulta 'documentos')")
+    parser.add_argument("--grupo", default="partido", choices=sorted(GRUPOS), help="Agrupamento da consulta 'tfidf'")
+    parser.add_argument("--partido")
+    parser.add_argument("--uf")
+    parser.add_argument("--cargo")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--indice", default=CAMINHO_INDICE)
+    args = parser.parse_args()
+
+    filtros = {"partido": args.partido, "uf": args.uf, "cargo": args.cargo}
+    conexao = sqlite3.connect(args.indice)
+    try:
+        if args.consulta == "top":
+            resultado = top_termos(conexao, k=args.k, **filtros)
+        elif args.consulta == "tfidf":
+            resultado = tfidf_por_grupo(conexao, grupo=args.grupo, k=args.k, **filtros)
+        else:
+            if not args.termo:
+                parser.error("a consulta 'documentos' exige --termo")
+            resultado = documentos_com_termo(conexao, args.termo.lower(), k=args.k, **filtros)
+    finally:
+        conexao.close()
+    print(resultado.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import traceback
+import pandas as pd
+
+from collections import Counter
+
+from arquivos import gravar_json
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Instrumentação das etapas do pipeline: cada tarefa do agendador é envolvida
+# por instrumentar(), que registra tempo de parede, tempo de CPU da thread e
+# dos processos filhos encerrados durante a etapa (pools de carga e de PDFs),
+# RSS, linhas de entrada e de saída e o erro (se houver). Erros tratados
+# dentro das etapas (um CSV ilegível, um PDF sem texto, um gráfico com erro)
+# entram como avisos via avisar(). No fim da execução, gravar_relatorio()
+# escreve tudo em output/relatorio_execucao.json.
+CAMINHO_RELATORIO = os.path.join("output", "relatorio_execucao.json")
+
+# Modos de perfil de uma única etapa (--perfil ETAPA --perfil-modo MODO)
+MODOS_PERFIL = ["cprofile", "amostragem"]
+
+# Intervalo entre amostras do perfil por amostragem (segundos)
+INTERVALO_AMOSTRAGEM = 0.005
+
+# Intervalo entre leituras do RSS enquanto há etapas em execução (segundos)
+INTERVALO_RSS = 0.05
+
+_relatorio = {"inicio": None, "argumentos": {}, "etapas": {}, "avisos": []}
+_trava = threading.Lock()
+_local = threading.local()
+# Medições das etapas em execução, atualizadas pelo amostrador de RSS
+_em_execucao = {}
+_amostrador_rss = None
+
+
+def rss_atual_mb():
+    # RSS do processo agora (Linux); o pico vem de getrusage
+    try:
+        with open("/proc/self/statm") as arquivo:
+            paginas = int(arquivo.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def rss_pico_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def cpu_filhos_segundos():
+    # CPU (usuário + sistema) dos processos filhos já encerrados e aguardados
+    if resource is None:
+        return None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return uso.ru_utime + uso.ru_stime
+
+
+def _amostrar_rss():
+    # O pico de cada etapa é o maior RSS do processo lido enquanto ela rodava
+    # (com etapas simultâneas, a janela é compartilhada); ru_maxrss só cresce
+    # e repetiria o pico da execução em todas as etapas seguintes
+    while True:
+        time.sleep(INTERVALO_RSS)
+        rss = rss_atual_mb()
+        if rss is None:
+            return
+        with _trava:
+            for medicao in _em_execucao.values():
+                medicao["rss_pico_mb"] = max(medicao["rss_pico_mb"], rss)
+
+
+def _acompanhar_rss(chave, medicao):
+    global _amostrador_rss
+    if medicao["rss_pico_mb"] is None:
+        return
+    with _trava:
+        _em_execucao[chave] = medicao
+        if _amostrador_rss is None:
+            _amostrador_rss = threading.Thread(target=_amostrar_rss, name="amostrador_rss", daemon=True)
+            _amostrador_rss.start()
+
+
+def _encerrar_rss(chave, medicao, rss_fim):
+    with _trava:
+        _em_execucao.pop(chave, None)
+        if medicao["rss_pico_mb"] is not None and rss_fim is not None:
+            medicao["rss_pico_mb"] = max(medicao["rss_pico_mb"], rss_fim)
+
+
+def _arredondar(valor, casas=1):
+    return round(valor, casas) if valor is not None else None
+
+
+def _linhas(valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return len(valor)
+    return None
+
+
+def iniciar_relatorio(argumentos=None):
+    with _trava:
+        _relatorio.update(inicio=time.time(), argumentos=dict(argumentos or {}), etapas={}, avisos=[])
+        _relatorio["_inicio_perf"] = time.perf_counter()
+
+
+def instante():
+    # Segundos desde o início da execução (ordena as etapas no relatório)
+    return round(time.perf_counter() - _relatorio.get("_inicio_perf", 0), 3)
+
+
+def avisar(mensagem):
+    # Erro tratado (a etapa segue): impresso como antes e guardado no relatório
+    print(mensagem)
+    with _trava:
+        _relatorio["avisos"].append({"etapa": getattr(_local, "etapa", None), "mensagem": mensagem})
+
+
+def registrar_medicao(nome, medicao):
+    # Medições feitas fora do agendador (ex.: renderização de cada gráfico)
+    with _trava:
+        _relatorio["etapas"][nome] = medicao
+
+
+def registrar_sem_execucao(nome, status="pulada"):
+    # Etapas descartadas antes do agendador (ex.: em dia no manifesto) não
+    # passam por instrumentar(), mas precisam aparecer no relatório
+    registrar_medicao(nome, {"status": status, "inicio": instante(), "segundos": 0.0})
+
+
+def _perfil_cprofile(nome, funcao, entradas):
+    perfil = cProfile.Profile()
+    try:
+        return perfil.runcall(funcao, *entradas)
+    finally:
+        caminho = os.path.join("output", f"perfil_{nome}.prof")
+        perfil.dump_stats(caminho)
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(20)
+        print(f"Perfil (cProfile) da etapa '{nome}' gravado em '{caminho}':\n{texto.getvalue()}")
+
+
+def _perfil_amostragem(nome, funcao, entradas):
+    # Amostra a pilha da thread da etapa em intervalos fixos; o resultado sai
+    # no formato de pilhas colapsadas ("a;b;c contagem"), aceito por
+    # flamegraph.pl e speedscope
+    alvo = threading.get_ident()
+    pilhas = Counter()
+    parar = threading.Event()
+
+    def amostrar():
+        while not parar.wait(INTERVALO_AMOSTRAGEM):
+            quadro = sys._current_frames().get(alvo)
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                quadro = quadro.f_back
+            if pilha:
+                pilhas[";".join(reversed(pilha))] += 1
+
+    amostrador = threading.Thread(target=amostrar, daemon=True)
+    amostrador.start()
+    try:
+        return funcao(*entradas)
+    finally:
+        parar.set()
+        amostrador.join()
+        caminho = os.path.join("output", f"perfil_{nome}.txt")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, contagem in pilhas.most_common():
+                arquivo.write(f"{pilha} {contagem}\n")
+        folhas = Counter()
+        for pilha, contagem in pilhas.items():
+            folhas[pilha.rsplit(";", 1)[-1]] += contagem
+        total = sum(pilhas.values()) or 1
+        print(f"Perfil (amostragem) da etapa '{nome}': {total} amostras em '{caminho}'. Funções mais amostradas:")
+        for folha, contagem in folhas.most_common(10):
+            print(f"  {contagem / total:6.1%}  {folha}")
+
+
+PERFIS = {"cprofile": _perfil_cprofile, "amostragem": _perfil_amostragem}
+
+
+def instrumentar(nome, funcao, status="executada", perfil=None):
+    # perfil: modo de MODOS_PERFIL para esta etapa, ou None
+    def executar_instrumentado(*entradas):
+        _local.etapa = nome
+        rss_inicio = rss_atual_mb()
+        medicao = {
+            "status": status,
+            "inicio": instante(),
+            "linhas_entrada": sum(_linhas(entrada) or 0 for entrada in entradas),
+            "rss_inicio_mb": _arredondar(rss_inicio),
+        }
+        pico = {"rss_pico_mb": rss_inicio}
+        chave = object()
+        _acompanhar_rss(chave, pico)
+        inicio, inicio_cpu, inicio_cpu_filhos = time.perf_counter(), time.thread_time(), cpu_filhos_segundos()
+        try:
+            if perfil is not None:
+                resultado = PERFIS[perfil](nome, funcao, entradas)
+            else:
+                resultado = funcao(*entradas)
+        except Exception as e:
+            medicao["status"] = "erro"
+            medicao["erro"] = {"tipo": type(e).__name__, "mensagem": str(e), "traceback": traceback.format_exc()}
+            raise
+        else:
+            medicao["linhas_saida"] = _linhas(resultado)
+            return resultado
+        finally:
+            rss_fim = rss_atual_mb()
+            _encerrar_rss(chave, pico, rss_fim)
+            fim_cpu_filhos = cpu_filhos_segundos()
+            medicao.update(
+                segundos=round(time.perf_counter() - inicio, 4),
+                cpu_segundos=round(time.thread_time() - inicio_cpu, 4),
+                cpu_filhos_segundos=(round(fim_cpu_filhos - inicio_cpu_filhos, 4)
+                                     if fim_cpu_filhos is not None else None),
+                rss_fim_mb=_arredondar(rss_fim),
+                rss_pico_mb=_arredondar(pico["rss_pico_mb"]),
+            )
+            registrar_medicao(nome, medicao)
+            _local.etapa = None
+    return executar_instrumentado
+
+
+def instrumentar_tarefas(tarefas, perfil_etapa=None, perfil_modo="cprofile", prefixo=""):
+    # prefixo distingue execuções do mesmo grafo (ex.: um ano no modo comparativo)
+    for nome, tarefa in tarefas.items():
+        status = "pulada" if tarefa.get("pulada") else "reaproveitada" if tarefa.get("reaproveitado") else "executada"
+        perfil = perfil_modo if nome == perfil_etapa else None
+        tarefa["funcao"] = instrumentar(prefixo + nome, tarefa["funcao"], status=status, perfil=perfil)
+    return tarefas
+
+
+def gravar_relatorio(falhas=None, caminho=CAMINHO_RELATORIO):
+    with _trava:
+        etapas = dict(sorted(_relatorio["etapas"].items(), key=lambda item: item[1].get("inicio", float("inf"))))
+        relatorio = {
+            "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_relatorio["inicio"])),
+            "segundos": round(time.perf_counter() - _relatorio["_inicio_perf"], 3),
+            "rss_pico_mb": _arredondar(rss_pico_mb()),
+            "argumentos": _relatorio["argumentos"],
+            "etapas": etapas,
+            "falhas": dict(falhas or {}),
+            "avisos": list(_relatorio["avisos"]),
+        }
+    gravar_json(caminho, relatorio, ensure_ascii=False, default=str)
+    erros = sum(etapa.get("status") == "erro" for etapa in etapas.values())
+    puladas = sum(etapa.get("status") in ("pulada", "reaproveitada") for etapa in etapas.values())
+    print(f"Relatório de execução gravado em '{caminho}': {len(etapas)} etapas ({puladas} puladas ou "
+          f"reaproveitadas), {erros} com erro, {len(relatorio['avisos'])} avisos")
+    return relatorio
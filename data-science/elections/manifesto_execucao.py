@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+
+from glob import glob
+from arquivos import gravar_json
+from cache_dados import impressao_arquivo
+
+# Manifesto da última execução: a impressão (hash) de cada arquivo de entrada
+# e, para cada etapa do pipeline, a impressão das entradas com que ela rodou
+# e o hash dos artefatos que gerou em output/. Uma etapa cuja impressão não
+# mudou e cujos artefatos continuam intactos não precisa rodar de novo.
+CAMINHO_MANIFESTO = os.path.join("output", "manifesto_execucao.json")
+VERSAO_MANIFESTO = 1
+
+
+def carregar_manifesto(caminho=CAMINHO_MANIFESTO):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+        if manifesto.get("versao") == VERSAO_MANIFESTO:
+            return manifesto
+    except (OSError, ValueError):
+        pass
+    return {"versao": VERSAO_MANIFESTO, "entradas": {}, "etapas": {}}
+
+
+def gravar_manifesto(manifesto, caminho=CAMINHO_MANIFESTO):
+    # Arquivos de entrada que deixaram de existir saem do registro
+    manifesto["entradas"] = {
+        entrada: sha256 for entrada, sha256 in manifesto["entradas"].items() if os.path.exists(entrada)
+    }
+    gravar_json(caminho, manifesto, ensure_ascii=False, sort_keys=True)
+
+
+def combinar(*partes):
+    sha = hashlib.sha256()
+    for parte in partes:
+        sha.update(json.dumps(parte, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def impressao_arquivos(manifesto, caminhos):
+    # Registra cada arquivo em "entradas" e devolve a impressão do conjunto
+    impressoes = {}
+    for caminho in sorted(caminhos):
+        impressoes[caminho] = impressao_arquivo(caminho)
+        manifesto["entradas"][caminho] = impressoes[caminho]
+    return combinar(impressoes)
+
+
+def impressao_codigo(diretorio):
+    # Qualquer mudança nos módulos do pipeline invalida todas as etapas
+    return combinar({
+        os.path.basename(caminho): impressao_arquivo(caminho)
+        for caminho in sorted(glob(os.path.join(diretorio, "*.py")))
+    })
+
+
+def calcular_impressoes(tarefas, alvos, impressao_base):
+    # Impressão de cada etapa = nome + impressão própria (arquivos lidos
+    # diretamente, opções) + impressões das dependências, na ordem declarada
+    impressoes = {}
+
+    def calcular(nome):
+        if nome not in impressoes:
+            tarefa = tarefas[nome]
+            propria = tarefa["impressao"]() if tarefa.get("impressao") else None
+            impressoes[nome] = combinar(
+                nome, impressao_base, propria, [calcular(dependencia) for dependencia in tarefa["dependencias"]]
+            )
+        return impressoes[nome]
+
+    for alvo in alvos:
+        calcular(alvo)
+    return impressoes
+
+
+def etapa_em_dia(manifesto, nome, impressao):
+    registro = manifesto["etapas"].get(nome)
+    if registro is None or registro["impressao"] != impressao:
+        return False
+    return all(
+        os.path.exists(caminho) and impressao_arquivo(caminho) == sha256
+        for caminho, sha256 in registro["saidas"].items()
+    )
+
+
+def registrar_etapa(manifesto, nome, impressao, saidas):
+    # Só registra se todos os artefatos esperados foram gerados: os insights
+    # tratam os próprios erros, então "terminou" não implica "gerou a saída"
+    if not all(os.path.exists(caminho) for caminho in saidas):
+        manifesto["etapas"].pop(nome, None)
+        return False
+    manifesto["etapas"][nome] = {
+        "impressao": impressao,
+        "saidas": {caminho: impressao_arquivo(caminho) for caminho in saidas},
+    }
+    return True
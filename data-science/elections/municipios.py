@@ -0,0 +1,110 @@
+import os
+import json
+import pandas as pd
+
+from functools import lru_cache
+
+# Tabela de referência dos municípios (código IBGE, UF, nome e coordenadas da
+# sede), gerada por dados_referencia/gerar_municipios.py. Os arquivos do TSE
+# identificam o município pelo código do TSE (SG_UE), que é diferente do
+# código IBGE. A chave primária do mapa é o SG_UE, pela correspondência
+# TSE -> IBGE em dados_referencia/municipios_tse_ibge.csv (colunas
+# CD_MUNICIPIO_TSE e CD_MUNICIPIO_IBGE), gerada a partir dos próprios
+# arquivos de candidaturas do TSE por dados_referencia/gerar_correspondencia_tse.py.
+# Sem ela, ou para os códigos que ela não cobre, o município é localizado por
+# UF + nome sem acentos. Os que não casam por nenhum dos dois (nomes com
+# grafia diferente ou municípios ausentes da tabela) são listados por
+# municipios_nao_localizados para que a execução os informe.
+DIR_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados_referencia")
+CAMINHO_MUNICIPIOS = os.path.join(DIR_REFERENCIA, "municipios.csv")
+CAMINHO_CORRESPONDENCIA_TSE = os.path.join(DIR_REFERENCIA, "municipios_tse_ibge.csv")
+
+# Casas decimais das coordenadas no GeoJSON (5 casas ~ 1 m)
+PRECISAO_COORDENADAS = 5
+
+
+def normalizar_nomes(nomes):
+    # Sem acentos, minúsculo e sem pontuação: "Olhos-d'Água" -> "olhosdagua"
+    return (
+        nomes.astype(str).str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower().str.replace(r"[^a-z0-9]+", "", regex=True)
+    )
+
+
+@lru_cache(maxsize=1)
+def carregar_municipios(caminho=CAMINHO_MUNICIPIOS):
+    municipios = pd.read_csv(caminho, dtype={"CD_MUNICIPIO_IBGE": "int32", "SG_UF": "category", "NM_MUNICIPIO": str})
+    return municipios.assign(NOME_NORMALIZADO=normalizar_nomes(municipios["NM_MUNICIPIO"]))
+
+
+def carregar_correspondencia_tse(caminho=CAMINHO_CORRESPONDENCIA_TSE):
+    if not os.path.exists(caminho):
+        return None
+    return pd.read_csv(caminho, usecols=["CD_MUNICIPIO_TSE", "CD_MUNICIPIO_IBGE"], dtype="int64")
+
+
+def localizar_municipios(df, municipios, correspondencia=None, coluna_codigo='SG_UE', coluna_uf='SG_UF',
+                         coluna_nome='NM_UE'):
+    # Resolve cada município distinto uma vez (código TSE, depois UF + nome)
+    # e devolve df com CD_MUNICIPIO_IBGE, LATITUDE e LONGITUDE; linhas sem
+    # município localizado ficam de fora
+    chaves = df[[coluna_codigo, coluna_uf, coluna_nome]].drop_duplicates()
+    chaves = chaves.assign(
+        CODIGO_TSE=pd.to_numeric(chaves[coluna_codigo].astype(str), errors="coerce"),
+        UF=chaves[coluna_uf].astype(str).str.upper(),
+        NOME_NORMALIZADO=normalizar_nomes(chaves[coluna_nome]),
+        CD_MUNICIPIO_IBGE=pd.NA,
+    )
+    if correspondencia is not None:
+        por_codigo = chaves["CODIGO_TSE"].map(
+            correspondencia.drop_duplicates("CD_MUNICIPIO_TSE").set_index("CD_MUNICIPIO_TSE")["CD_MUNICIPIO_IBGE"]
+        )
+        chaves["CD_MUNICIPIO_IBGE"] = por_codigo
+
+    indice_nomes = municipios.assign(UF=municipios["SG_UF"].astype(str)).drop_duplicates(
+        ["UF", "NOME_NORMALIZADO"]
+    ).set_index(["UF", "NOME_NORMALIZADO"])["CD_MUNICIPIO_IBGE"]
+    por_nome = pd.Series(
+        indice_nomes.reindex(pd.MultiIndex.from_frame(chaves[["UF", "NOME_NORMALIZADO"]])).to_numpy(),
+        index=chaves.index,
+    )
+    chaves["CD_MUNICIPIO_IBGE"] = chaves["CD_MUNICIPIO_IBGE"].fillna(por_nome)
+    chaves = chaves.dropna(subset=["CD_MUNICIPIO_IBGE"]).astype({"CD_MUNICIPIO_IBGE": "int64"})
+
+    coordenadas = municipios[["CD_MUNICIPIO_IBGE", "LATITUDE", "LONGITUDE"]]
+    chaves = chaves[[coluna_codigo, coluna_uf, coluna_nome, "CD_MUNICIPIO_IBGE"]].merge(
+        coordenadas, on="CD_MUNICIPIO_IBGE", how="inner"
+    )
+    return df.merge(chaves, on=[coluna_codigo, coluna_uf, coluna_nome], how="inner")
+
+
+def municipios_nao_localizados(df, localizados, coluna_codigo='SG_UE', coluna_uf='SG_UF', coluna_nome='NM_UE'):
+    # Municípios distintos de df que localizar_municipios deixou de fora
+    chaves = [coluna_codigo, coluna_uf, coluna_nome]
+    todos = df[chaves].drop_duplicates()
+    encontrados = pd.MultiIndex.from_frame(localizados[chaves].astype(str))
+    return todos[~pd.MultiIndex.from_frame(todos.astype(str)).isin(encontrados)]
+
+
+def geojson_pontos(df, coluna_latitude='LATITUDE', coluna_longitude='LONGITUDE', propriedades=()):
+    # FeatureCollection de pontos montada a partir das colunas inteiras, sem
+    # iterar linha a linha sobre o DataFrame
+    longitudes = df[coluna_longitude].round(PRECISAO_COORDENADAS).tolist()
+    latitudes = df[coluna_latitude].round(PRECISAO_COORDENADAS).tolist()
+    valores = [df[coluna].astype(str).tolist() for coluna in propriedades]
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+                "properties": dict(zip(propriedades, linha)),
+            }
+            for longitude, latitude, *linha in zip(longitudes, latitudes, *valores)
+        ],
+    }
+
+
+def salvar_geojson(geojson, caminho):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(geojson, arquivo, ensure_ascii=False, separators=(",", ":"))
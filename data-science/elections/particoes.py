@@ -0,0 +1,135 @@
+import os
+import re
+import fnmatch
+import pandas as pd
+
+# Os arquivos do TSE vêm particionados por UF e ano no próprio nome
+# (consulta_cand_2024_SC.csv, bem_candidato_2024_BRASIL.csv). Também é aceito
+# um layout particionado em pastas (candidatos/ano=2024/uf=SC/arquivo.csv),
+# que tem precedência sobre o nome do arquivo. Com isso, filtros de UF e ano
+# escolhem os arquivos antes de qualquer leitura.
+PADRAO_NOME_ARQUIVO = re.compile(r"_(?P<ano>\d{4})_(?P<uf>[A-Za-z]{2}|BRASIL)\.[^.]+$", re.IGNORECASE)
+PADRAO_DIRETORIO = re.compile(r"^(?P<chave>ano|uf)=(?P<valor>[^=]+)$", re.IGNORECASE)
+
+# Partição do arquivo nacional, que contém todas as UFs
+UF_NACIONAL = "BRASIL"
+
+# Operadores aceitos nos predicados de coluna, no formato dos filtros do
+# pyarrow: [("DS_CARGO", "==", "prefeito"), ("SG_UF", "in", ["SC", "PR"])]
+OPERADORES = {
+    "==": lambda serie, valor: serie == valor,
+    "!=": lambda serie, valor: serie != valor,
+    "in": lambda serie, valor: serie.isin(valor),
+    "not in": lambda serie, valor: ~serie.isin(valor),
+    "<": lambda serie, valor: serie < valor,
+    "<=": lambda serie, valor: serie <= valor,
+    ">": lambda serie, valor: serie > valor,
+    ">=": lambda serie, valor: serie >= valor,
+}
+
+
+# Tipos do schema (ver schemas.py) comparados como números; os demais são
+# texto, que é como o cache colunar guarda todas as colunas
+TIPOS_NUMERICOS = ("inteiro", "decimal_br")
+
+
+def _normalizar(chave, valor):
+    return int(valor) if chave == "ano" else str(valor).upper()
+
+
+def particao_do_arquivo(caminho, pasta):
+    particao = {"caminho": caminho, "uf": None, "ano": None}
+    encontrado = PADRAO_NOME_ARQUIVO.search(os.path.basename(caminho))
+    if encontrado:
+        particao["uf"] = encontrado.group("uf").upper()
+        particao["ano"] = int(encontrado.group("ano"))
+    for parte in os.path.relpath(os.path.dirname(caminho), pasta).split(os.sep):
+        encontrado = PADRAO_DIRETORIO.match(parte)
+        if encontrado:
+            chave = encontrado.group("chave").lower()
+            particao[chave] = _normalizar(chave, encontrado.group("valor"))
+    return particao
+
+
+def listar_particoes(pasta, padrao="*.csv"):
+    # Desce só em subpastas no formato chave=valor
+    particoes = []
+    for raiz, subpastas, arquivos in os.walk(pasta):
+        subpastas[:] = sorted(subpasta for subpasta in subpastas if PADRAO_DIRETORIO.match(subpasta))
+        for arquivo in sorted(fnmatch.filter(arquivos, padrao)):
+            particoes.append(particao_do_arquivo(os.path.join(raiz, arquivo), pasta))
+    return particoes
+
+
+def _como_conjunto(chave, valor):
+    if valor is None:
+        return None
+    if isinstance(valor, (str, int)):
+        valor = [valor]
+    return {_normalizar(chave, item) for item in valor}
+
+
+def filtrar_particoes(particoes, uf=None, ano=None):
+    # Partições sem UF/ano conhecidos não podem ser descartadas; o arquivo
+    # nacional de um ano só é lido quando não há arquivos por UF desse ano
+    # (senão as linhas seriam contadas duas vezes).
+    ufs, anos = _como_conjunto("uf", uf), _como_conjunto("ano", ano)
+    anos_com_uf = {particao["ano"] for particao in particoes if particao["uf"] not in (None, UF_NACIONAL)}
+    selecionadas = []
+    for particao in particoes:
+        if particao["uf"] == UF_NACIONAL and particao["ano"] in anos_com_uf:
+            continue
+        if anos is not None and particao["ano"] is not None and particao["ano"] not in anos:
+            continue
+        if (ufs is not None and particao["uf"] not in (None, UF_NACIONAL)
+                and particao["uf"] not in ufs):
+            continue
+        selecionadas.append(particao)
+    return selecionadas
+
+
+def arquivos_do_dataset(pasta, padrao="*.csv", uf=None, ano=None):
+    return [particao["caminho"] for particao in filtrar_particoes(listar_particoes(pasta, padrao), uf=uf, ano=ano)]
+
+
+def predicados_de_particao(schema, uf=None):
+    # Arquivos nacionais ou sem UF no nome ainda precisam do filtro por linha
+    ufs = _como_conjunto("uf", uf)
+    if ufs is None or (schema is not None and "SG_UF" not in schema):
+        return []
+    return [("SG_UF", "in", sorted(ufs))]
+
+
+def filtrar_linhas(df, predicados):
+    # Mesmo resultado do filtro aplicado pelo pyarrow na leitura do Parquet
+    if not predicados or df.empty:
+        return df
+    mascara = pd.Series(True, index=df.index)
+    for coluna, operador, valor in predicados:
+        mascara &= OPERADORES[operador](df[coluna], valor)
+    return df[mascara]
+
+
+def _converter_valor(tipo, valor):
+    if isinstance(valor, (list, tuple, set)):
+        return [_converter_valor(tipo, item) for item in valor]
+    if tipo not in TIPOS_NUMERICOS:
+        return str(valor)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        return float(valor.replace(".", "").replace(",", ".")) if "," in valor else pd.to_numeric(valor).item()
+    return valor
+
+
+def dividir_predicados(predicados, schema=None):
+    # Converte o valor de cada predicado para o tipo declarado da coluna e
+    # separa os de texto (aplicáveis ao CSV cru e ao Parquet do cache, com
+    # pushdown) dos numéricos, aplicados depois da conversão pelo schema.
+    # Assim ("NR_TURNO", ">=", 1) e ("NR_TURNO", "==", "1") têm o mesmo
+    # resultado com e sem o cache.
+    texto, numericos = [], []
+    for coluna, operador, valor in predicados or []:
+        tipo = (schema or {}).get(coluna, "texto")
+        destino = numericos if tipo in TIPOS_NUMERICOS else texto
+        destino.append((coluna, operador, _converter_valor(tipo, valor)))
+    return texto, numericos
@@ -0,0 +1,105 @@
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Classificação das URLs de redes sociais dos candidatos pelo host. A tabela
+# é consultada do domínio mais específico para o mais genérico, então
+# "m.facebook.com" e "pt-br.facebook.com" caem em "facebook.com". Para
+# reconhecer uma nova rede (ou um novo domínio de uma rede), basta incluir o
+# host aqui. URLs digitadas pelos candidatos nem sempre são válidas: esquemas
+# quebrados ("https//", "https:/") são corrigidos, domínios de país da rede
+# ("facebook.com.br") contam como o domínio principal, e entradas sem host
+# reconhecível ("facebook/fulano") caem na busca pelo nome da rede no texto.
+HOSTS_REDES = {
+    "facebook.com": "facebook",
+    "fb.com": "facebook",
+    "fb.me": "facebook",
+    "instagram.com": "instagram",
+    "instagr.am": "instagram",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "t.co": "twitter",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "linkedin.com": "linkedin",
+    "lnkd.in": "linkedin",
+    "tiktok.com": "tiktok",
+    "wa.me": "whatsapp",
+    "whatsapp.com": "whatsapp",
+    "api.whatsapp.com": "whatsapp",
+    "t.me": "telegram",
+    "telegram.me": "telegram",
+    "threads.net": "threads",
+    "kwai.com": "kwai",
+}
+
+REDE_OUTROS = "outros"
+
+# Incremente ao mudar a lógica de classificação; mudanças na tabela de hosts
+# já alteram a assinatura (usada na chave dos parciais em cache)
+VERSAO_CLASSIFICACAO = 2
+
+# Esquema no início da URL, inclusive com ":" ou "/" faltando ou sobrando
+PADRAO_ESQUEMA = re.compile(r"^\s*(?:https?(?:[:;]+/*|/+))?/*")
+
+# Rótulos genéricos de segundo nível em domínios de país ("com" em "com.br")
+SEGUNDO_NIVEL_PAIS = {"com", "net", "org"}
+
+
+def assinatura_classificacao(hosts_redes=HOSTS_REDES):
+    return hashlib.sha256(
+        json.dumps([VERSAO_CLASSIFICACAO, sorted(hosts_redes.items())]).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def host_da_url(url):
+    # URLs sem esquema ("instagram.com/fulano") viram netloc com "//"
+    url = "//" + PADRAO_ESQUEMA.sub("", url.strip().lower(), count=1)
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    return host.rstrip(".")
+
+
+def rede_do_host(host, hosts_redes=HOSTS_REDES):
+    partes = host.split(".")
+    # "facebook.com.br" -> "facebook.com"
+    if len(partes) >= 3 and len(partes[-1]) == 2 and partes[-2] in SEGUNDO_NIVEL_PAIS:
+        partes = partes[:-1]
+    for inicio in range(len(partes) - 1):
+        rede = hosts_redes.get(".".join(partes[inicio:]))
+        if rede is not None:
+            return rede
+    return REDE_OUTROS
+
+
+@lru_cache(maxsize=8)
+def _padrao_nomes_redes(redes):
+    return re.compile("|".join(sorted(redes, key=len, reverse=True)))
+
+
+def classificar_url(url, hosts_redes=HOSTS_REDES):
+    host = host_da_url(url)
+    if "." in host:
+        return rede_do_host(host, hosts_redes)
+    # Sem host com domínio: o nome da rede no texto, como na regex antiga
+    encontrado = _padrao_nomes_redes(frozenset(hosts_redes.values())).search(url.lower())
+    return encontrado.group(0) if encontrado else REDE_OUTROS
+
+
+def classificar_urls(urls, hosts_redes=HOSTS_REDES):
+    # Fatora a coluna e classifica cada URL distinta uma única vez; o rótulo
+    # volta para as linhas pelos códigos. URLs nulas viram "outros".
+    codigos, distintas = pd.factorize(urls, use_na_sentinel=True)
+    redes = [classificar_url(str(url), hosts_redes) for url in distintas]
+    categorias = sorted(set(redes) | {REDE_OUTROS})
+    posicao = {rede: i for i, rede in enumerate(categorias)}
+    # Última posição do mapa: código dos nulos (sentinela -1)
+    mapa = np.array([posicao[rede] for rede in redes] + [posicao[REDE_OUTROS]], dtype=np.int32)
+    return pd.Categorical.from_codes(mapa[codigos], categories=categorias)
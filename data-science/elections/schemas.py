@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Colunas efetivamente usadas pelos insights, por conjunto de dados.
+# Tipos:
+#   "categoria"  -> strings de baixa cardinalidade, armazenadas como category
+#   "texto"      -> strings livres (nomes, URLs)
+#   "inteiro"    -> inteiros reduzidos ao menor tipo que comporta os valores
+#   "decimal_br" -> valores monetários no formato brasileiro ("1.234,56")
+SCHEMAS = {
+    "candidatos": {
+        "NR_TURNO": "inteiro",
+        "SG_UF": "categoria",
+        "SG_UE": "categoria",
+        "NM_UE": "categoria",
+        "DS_CARGO": "categoria",
+        "SQ_CANDIDATO": "inteiro",
+        "NM_CANDIDATO": "texto",
+        "SG_PARTIDO": "categoria",
+        "SQ_COLIGACAO": "inteiro",
+        "DS_SIT_TOT_TURNO": "categoria",
+    },
+    "candidatos_bens": {
+        "SG_UF": "categoria",
+        "SQ_CANDIDATO": "inteiro",
+        "VR_BEM_CANDIDATO": "decimal_br",
+    },
+    "candidatos_info_complementar": {
+        "SG_UF": "categoria",
+        "SQ_CANDIDATO": "inteiro",
+        "CD_ETNIA_INDIGENA": "inteiro",
+        "ST_QUILOMBOLA": "categoria",
+    },
+    "candidatos_redes_sociais": {
+        "SG_UF": "categoria",
+        "SQ_CANDIDATO": "inteiro",
+        "DS_URL": "texto",
+    },
+    "coligacoes": {
+        "SG_UF": "categoria",
+        "SQ_COLIGACAO": "inteiro",
+        "DS_COMPOSICAO_FEDERACAO": "categoria",
+    },
+    "motivo_cassacao": {
+        "SG_UF": "categoria",
+        "SQ_CANDIDATO": "inteiro",
+        "DS_MOTIVO_CASSACAO": "categoria",
+    },
+    "vagas": {
+        "SG_UF": "categoria",
+        "SG_UE": "categoria",
+        "DS_CARGO": "categoria",
+        "QT_VAGA": "inteiro",
+    },
+}
+
+
+def opcoes_read_csv(schema):
+    # Argumentos de pd.read_csv que aplicam a projeção já na leitura.
+    if schema is None:
+        return {}
+    dtypes = {}
+    for coluna, tipo in schema.items():
+        if tipo == "categoria":
+            dtypes[coluna] = "category"
+        elif tipo in ("texto", "decimal_br"):
+            dtypes[coluna] = str
+    return {"usecols": lambda coluna: coluna in schema, "dtype": dtypes}
+
+
+def converter_decimal_br(serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    texto = serie.astype(str).str.strip()
+    # "1.234,56" -> "1234.56"; valores já com ponto decimal são mantidos
+    tem_virgula = texto.str.contains(",", regex=False)
+    texto = pd.Series(
+        np.where(tem_virgula, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False), texto),
+        index=serie.index,
+    )
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def aplicar_schema(df, schema):
+    # Idempotente: pode ser aplicado a cada arquivo e de novo após o concat.
+    if schema is None or df.empty:
+        return df
+    df = df[[coluna for coluna in df.columns if coluna in schema]]
+    convertidas = {}
+    for coluna in df.columns:
+        tipo = schema[coluna]
+        serie = df[coluna]
+        if tipo == "categoria":
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype("category")
+            categorias = serie.cat.categories
+            if not categorias.is_monotonic_increasing:
+                serie = serie.cat.set_categories(categorias.sort_values())
+        elif tipo == "inteiro":
+            # O cache colunar guarda texto; a leitura direta do CSV já infere números
+            if not (pd.api.types.is_integer_dtype(serie) or pd.api.types.is_float_dtype(serie)):
+                serie = pd.to_numeric(serie, errors="coerce")
+            serie = pd.to_numeric(serie, downcast="integer")
+        elif tipo == "decimal_br":
+            serie = converter_decimal_br(serie)
+        convertidas[coluna] = serie
+    return pd.DataFrame(convertidas, index=df.index)
+
+
+def remover_categorias_nao_usadas(df):
+    # Agregados pequenos não devem carregar todas as categorias do dataset
+    # original (os gráficos do seaborn listariam categorias sem dados).
+    for coluna in df.select_dtypes("category").columns:
+        df[coluna] = df[coluna].cat.remove_unused_categories()
+    return df
+
+
+def uso_memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)